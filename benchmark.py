@@ -0,0 +1,195 @@
+"""
+Runs the benchmark scenarios implemented in
+``machinelearningext/TestProfileBenchmark`` and compares the results
+to a baseline.
+
+::
+
+    python benchmark.py list
+    python benchmark.py run --size 10000 --output bench.json
+    python benchmark.py run --scenarios dataframe_sort,kdtree_query --baseline baseline.json
+    python benchmark.py compare bench.json baseline.json --threshold 0.1
+
+The script exits with code 1 if a regression is detected.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+this = os.path.abspath(os.path.dirname(__file__))
+project = os.path.join(this, "machinelearningext", "TestProfileBenchmark")
+
+
+def find_benchmark(configuration):
+    """
+    Returns the path to the compiled benchmark.
+    """
+    name = os.path.join(this, "machinelearningext", "bin", "AnyCPU.%s" % configuration,
+                        "TestProfileBenchmark", "netcoreapp2.1", "TestProfileBenchmark.dll")
+    if not os.path.exists(name):
+        raise FileNotFoundError(
+            "Unable to find '{0}', build it with --build or build.sh.".format(name))
+    return name
+
+
+def build(configuration):
+    """
+    Builds the benchmark.
+    """
+    cmd = ["dotnet", "build", "-c", configuration, project]
+    print("[benchmark] " + " ".join(cmd))
+    subprocess.check_call(cmd)
+
+
+def run_benchmark(configuration, scenarios=None, size=10000, repeat=5,
+                  warmup=1, seed=0):
+    """
+    Runs the benchmark and returns the results as a dictionary.
+    """
+    dll = find_benchmark(configuration)
+    with tempfile.TemporaryDirectory() as temp:
+        output = os.path.join(temp, "bench.json")
+        cmd = ["dotnet", dll, "--size", str(size), "--repeat", str(repeat),
+               "--warmup", str(warmup), "--seed", str(seed), "--output", output]
+        if scenarios:
+            cmd.extend(["--scenarios", ",".join(scenarios)])
+        print("[benchmark] " + " ".join(cmd))
+        # The process returns 1 if a scenario fails, the results are still written.
+        subprocess.call(cmd)
+        if not os.path.exists(output):
+            raise RuntimeError("The benchmark did not produce any result.")
+        with open(output, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+def compare(results, baseline, threshold=0.1, alloc_threshold=0.1):
+    """
+    Compares results to a baseline, returns a list of rows
+    ``(name, metric, baseline, current, ratio, status)``.
+    A scenario regresses if its median time or its allocations
+    increase by more than the threshold.
+    """
+    base = {r["name"]: r for r in baseline["results"]}
+    rows = []
+    for res in results["results"]:
+        name = res["name"]
+        if res.get("error"):
+            rows.append((name, "error", None, None, None, "FAILED"))
+            continue
+        if name not in base or base[name].get("error"):
+            rows.append((name, "time_median", None, res["time_median"], None, "NEW"))
+            continue
+        ref = base[name]
+        if ref.get("size") != res.get("size"):
+            rows.append((name, "size", ref.get("size"), res.get("size"), None, "SKIPPED"))
+            continue
+        for metric, thr in [("time_median", threshold), ("allocated_bytes", alloc_threshold)]:
+            before, after = ref[metric], res[metric]
+            ratio = after / before if before else None
+            if ratio is None:
+                status = "OK"
+            elif ratio > 1 + thr:
+                status = "REGRESSION"
+            elif ratio < 1 - thr:
+                status = "IMPROVEMENT"
+            else:
+                status = "OK"
+            rows.append((name, metric, before, after, ratio, status))
+    return rows
+
+
+def print_results(results):
+    print("{0:20} {1:>10} {2:>12} {3:>12} {4:>14} {5:>14}".format(
+        "scenario", "size", "median(s)", "min(s)", "items/s", "bytes"))
+    for res in results["results"]:
+        if res.get("error"):
+            print("{0:20} {1:>10} FAILED: {2}".format(res["name"], res["size"], res["error"]))
+            continue
+        print("{0:20} {1:>10} {2:>12.5f} {3:>12.5f} {4:>14.1f} {5:>14}".format(
+            res["name"], res["size"], res["time_median"], res["time_min"],
+            res["throughput"], res["allocated_bytes"]))
+
+
+def print_comparison(rows):
+    print("{0:20} {1:16} {2:>14} {3:>14} {4:>8} {5}".format(
+        "scenario", "metric", "baseline", "current", "ratio", "status"))
+
+    def fmt(v):
+        return "" if v is None else "{0:.5g}".format(v)
+
+    for name, metric, before, after, ratio, status in rows:
+        print("{0:20} {1:16} {2:>14} {3:>14} {4:>8} {5}".format(
+            name, metric, fmt(before), fmt(after), fmt(ratio), status))
+    return any(r[-1] in ("REGRESSION", "FAILED") for r in rows)
+
+
+def load(filename):
+    with open(filename, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip(),
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command")
+
+    p = sub.add_parser("list", help="lists the available scenarios")
+    p.add_argument("--configuration", default="Release")
+
+    p = sub.add_parser("run", help="runs scenarios")
+    p.add_argument("--configuration", default="Release")
+    p.add_argument("--build", action="store_true", help="builds the benchmark first")
+    p.add_argument("--scenarios", default=None,
+                   help="comma separated list of scenarios, all if empty")
+    p.add_argument("--size", type=int, default=10000, help="number of generated rows or points")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--warmup", type=int, default=1)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--output", default=None, help="saves the results in this JSON file")
+    p.add_argument("--baseline", default=None, help="compares the results to this JSON file")
+    p.add_argument("--threshold", type=float, default=0.1,
+                   help="relative increase of the median time considered as a regression")
+    p.add_argument("--alloc-threshold", type=float, default=0.1,
+                   help="relative increase of the allocations considered as a regression")
+
+    p = sub.add_parser("compare", help="compares results to a baseline")
+    p.add_argument("results")
+    p.add_argument("baseline")
+    p.add_argument("--threshold", type=float, default=0.1)
+    p.add_argument("--alloc-threshold", type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        return subprocess.call(["dotnet", find_benchmark(args.configuration), "--list"])
+
+    if args.command == "run":
+        if args.build:
+            build(args.configuration)
+        scenarios = args.scenarios.split(",") if args.scenarios else None
+        results = run_benchmark(args.configuration, scenarios=scenarios, size=args.size,
+                                repeat=args.repeat, warmup=args.warmup, seed=args.seed)
+        print_results(results)
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+        failed = any(r.get("error") for r in results["results"])
+        if args.baseline:
+            rows = compare(results, load(args.baseline), args.threshold, args.alloc_threshold)
+            failed = print_comparison(rows) or failed
+        return 1 if failed else 0
+
+    if args.command == "compare":
+        rows = compare(load(args.results), load(args.baseline),
+                       args.threshold, args.alloc_threshold)
+        return 1 if print_comparison(rows) else 0
+
+    parser.print_help()
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
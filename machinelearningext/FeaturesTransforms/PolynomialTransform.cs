@@ -3,6 +3,7 @@
 using System;
 using System.Collections.Generic;
 using System.Linq;
+using System.Threading.Tasks;
 using Microsoft.ML;
 using Microsoft.ML.CommandLine;
 using Microsoft.ML.Data;
@@ -274,6 +275,7 @@ namespace Scikit.ML.FeaturesTransforms
             readonly Arguments _args;
             readonly DataViewSchema.Column _inputCol;
             readonly Func<TInput, TInput, TInput> _multiplication;
+            readonly PolynomialPlan<TInput> _plan;
 
             // Unused fo the time begin. This might be required if the transform has a training steps.
             // We want this step to be executed only once when the next transform in the pipeline 
@@ -283,6 +285,11 @@ namespace Scikit.ML.FeaturesTransforms
             public DataViewSchema Schema => _schema;
             public IHost Host => _host;
 
+            /// <summary>
+            /// Plan shared by all cursors, null if the dimension of the input is unknown.
+            /// </summary>
+            public PolynomialPlan<TInput> Plan => _plan;
+
             public PolynomialState(IHostEnvironment host, IDataView input, Arguments args, Func<TInput, TInput, TInput> multiplication)
             {
                 _host = host.Register("PolynomialState");
@@ -304,7 +311,10 @@ namespace Scikit.ML.FeaturesTransforms
                         throw _host.Except("Input column type must be a vector of one dimension.");
                     int size = dim > 0 ? type.AsVector().GetDim(0) : 0;
                     if (size > 0)
-                        size = TotalCumulated[_args.degree](size);
+                    {
+                        _plan = new PolynomialPlan<TInput>(size, _args.degree, multiplication);
+                        size = _plan.OutputLength;
+                    }
                     ch.Trace("PolynomialTransform {0}->{1}.", dim, size);
 
                     // We extend the input schema. The new type has the same type as the input.
@@ -430,127 +440,246 @@ namespace Scikit.ML.FeaturesTransforms
 
             /// <summary>
             /// We compute the polynomial features.
+            /// The plan is built once if the dimension is known, the buffers of the output are reused.
             /// </summary>
             private ValueGetter<VBuffer<TInput>> PolynomialBuilder()
             {
-                // VBuffer<TInput> is the internal representation of a vector.
-                // It can be dense (TInput[]) or sparse.
-                // If there are n features, we can expect sum(i=1, d) n^i / i! polynomial features.
                 VBuffer<TInput> features = new VBuffer<TInput>();
-                int degree = _args.degree;
-                var values = new List<TInput>();
-                var indices = new List<int>();
-                int[] tempIndices = new int[3];
+                var plan = _view.Plan;
 
-                Func<IEnumerable<int>, int, int> computeIndex = (IEnumerable<int> sparseIndices, int nbFeatures) =>
+                return (ref VBuffer<TInput> polyfeat) =>
                 {
-                    int nb = 0;
-                    foreach (var i in sparseIndices)
-                    {
-                        tempIndices[nb] = i;
-                        nb += 1;
-                    }
-                    switch (nb)
+                    _inputGetter(ref features);
+                    // The dimension of the input is not known when the vector has a variable size.
+                    if (plan == null || plan.NbFeatures != features.Length)
+                        plan = new PolynomialPlan<TInput>(features.Length, _args.degree, _multiplication);
+                    plan.Apply(in features, ref polyfeat);
+                };
+            }
+        }
+
+        #endregion
+
+        #region Plan
+
+        /// <summary>
+        /// Precomputed positions of the polynomial features for a given number of features.
+        /// The output contains the features x_i, then the products x_i x_j (i &lt;= j),
+        /// then the products x_i x_j x_k (i &lt;= j &lt;= k) in lexicographic order.
+        /// The plan is read-only once built and can be shared across cursors and threads.
+        /// For a sparse input, only products of non null features are computed
+        /// and the output remains sparse.
+        /// </summary>
+        public class PolynomialPlan<TInput>
+        {
+            readonly int _nbFeatures;
+            readonly int _degree;
+            readonly int _outputLength;
+            readonly Func<TInput, TInput, TInput> _multiplication;
+
+            // position(i, j) = _offset2[i] + j, position(i, j, k) = _offset3i[i] + _offset3j[j] + k.
+            readonly int[] _offset2;
+            readonly int[] _offset3i;
+            readonly int[] _offset3j;
+
+            public int NbFeatures => _nbFeatures;
+            public int Degree => _degree;
+            public int OutputLength => _outputLength;
+
+            public PolynomialPlan(int nbFeatures, int degree, Func<TInput, TInput, TInput> multiplication)
+            {
+                Contracts.CheckParam(nbFeatures >= 0, nameof(nbFeatures), "must be >= 0");
+                Contracts.CheckValue(multiplication, nameof(multiplication));
+                if (degree >= 4)
+                    throw Contracts.ExceptNotImpl("Not implemented for a degree >= 4");
+                Contracts.CheckParam(degree >= 1, nameof(degree), "must be >= 1");
+                _nbFeatures = nbFeatures;
+                _degree = degree;
+                _multiplication = multiplication;
+
+                long n = nbFeatures;
+                long total = n + (degree >= 2 ? T2(n) : 0) + (degree >= 3 ? T3(n) : 0);
+                if (total > int.MaxValue)
+                    throw Contracts.Except("Too many polynomial features ({0}) for {1} features and degree {2}.", total, nbFeatures, degree);
+                _outputLength = (int)total;
+
+                if (degree >= 2)
+                {
+                    _offset2 = new int[nbFeatures];
+                    for (int i = 0; i < nbFeatures; ++i)
+                        _offset2[i] = (int)(n + T2(n) - T2(n - i) - i);
+                }
+                if (degree >= 3)
+                {
+                    _offset3i = new int[nbFeatures];
+                    _offset3j = new int[nbFeatures];
+                    for (int i = 0; i < nbFeatures; ++i)
                     {
-                        case 1:
-                            return tempIndices[0];
-                        case 2:
-                            int d1 = Total[1](nbFeatures);
-                            int d2 = Total[2](nbFeatures);
-                            return d1 + (d2 - Total[2](nbFeatures - tempIndices[0])) + (tempIndices[1] - tempIndices[0]);
-                        case 3:
-                            int d1_ = Total[1](nbFeatures);
-                            int d2_ = Total[2](nbFeatures);
-                            int d3_ = Total[3](nbFeatures);
-                            int d1d = Total[2](nbFeatures - tempIndices[0]);
-                            int d2d = Total[2](nbFeatures - tempIndices[1]);
-                            return d1_ + d2_ +
-                                   d1d - d2d + tempIndices[2] - tempIndices[1] + // part with N^2
-                                   d3_ - Total[3](nbFeatures - tempIndices[0]);  // part with N^3
-
-                        default:
-                            throw Contracts.ExceptNotSupp("Level should be in [1, 3].");
+                        _offset3i[i] = (int)(n + T2(n) + T2(n - i) + T3(n) - T3(n - i));
+                        _offset3j[i] = (int)(-T2(n - i) - i);
                     }
-                };
+                }
+            }
 
-                return (ref VBuffer<TInput> polyfeat) =>
+            static long T2(long k) { return k * (k + 1) / 2; }
+            static long T3(long k) { return k * (k * k + 3 * k + 2) / 6; }
+
+            /// <summary>
+            /// Returns the number of polynomial features computed from <paramref name="count"/> features.
+            /// </summary>
+            public int OutputCount(int count)
+            {
+                return TotalCumulated[_degree](count);
+            }
+
+            public int Position(int i) { return i; }
+            public int Position(int i, int j) { return _offset2[i] + j; }
+            public int Position(int i, int j, int k) { return _offset3i[i] + _offset3j[j] + k; }
+
+            /// <summary>
+            /// Computes the polynomial features of one vector, the buffers of <paramref name="dst"/>
+            /// are reused if they are big enough.
+            /// </summary>
+            public void Apply(in VBuffer<TInput> src, ref VBuffer<TInput> dst)
+            {
+                if (src.Length != _nbFeatures)
+                    throw Contracts.Except("Dimension mismatch {0} != {1}.", src.Length, _nbFeatures);
+                var values = dst.Values;
+                if (src.IsDense)
                 {
-                    _inputGetter(ref features);
-                    int total;
+                    if (values == null || values.Length < _outputLength)
+                        values = new TInput[_outputLength];
+                    ApplyDense(src.Values, 0, values, 0);
+                    dst = new VBuffer<TInput>(_outputLength, values, dst.Indices);
+                }
+                else
+                {
+                    int count = OutputCount(src.Count);
+                    var indices = dst.Indices;
+                    if (values == null || values.Length < count)
+                        values = new TInput[count];
+                    if (indices == null || indices.Length < count)
+                        indices = new int[count];
+                    ApplySparse(src.Count, src.Values, src.Indices, values, indices);
+                    dst = new VBuffer<TInput>(_outputLength, count, values, indices);
+                }
+            }
 
-                    if (features.IsDense)
+            /// <summary>
+            /// Computes the polynomial features for many vectors.
+            /// <paramref name="dst"/> must have the same length as <paramref name="src"/>,
+            /// its buffers are reused.
+            /// </summary>
+            public void Apply(VBuffer<TInput>[] src, VBuffer<TInput>[] dst, int numThreads = 1)
+            {
+                Contracts.CheckValue(src, nameof(src));
+                Contracts.CheckValue(dst, nameof(dst));
+                Contracts.CheckParam(src.Length == dst.Length, nameof(dst), "src and dst must have the same length");
+                if (numThreads <= 1)
+                {
+                    for (int i = 0; i < src.Length; ++i)
+                        Apply(in src[i], ref dst[i]);
+                }
+                else
+                    Parallel.For(0, src.Length, new ParallelOptions() { MaxDegreeOfParallelism = numThreads },
+                                 i => Apply(in src[i], ref dst[i]));
+            }
+
+            /// <summary>
+            /// Computes the polynomial features for a dense matrix stored row by row,
+            /// <paramref name="src"/> contains <paramref name="nbRows"/> x <see cref="NbFeatures"/> values,
+            /// <paramref name="dst"/> contains <paramref name="nbRows"/> x <see cref="OutputLength"/> values.
+            /// </summary>
+            public void Apply(TInput[] src, TInput[] dst, int nbRows)
+            {
+                Contracts.CheckValue(src, nameof(src));
+                Contracts.CheckValue(dst, nameof(dst));
+                Contracts.CheckParam(src.Length >= (long)nbRows * _nbFeatures, nameof(src), "too short");
+                Contracts.CheckParam(dst.Length >= (long)nbRows * _outputLength, nameof(dst), "too short");
+                for (int r = 0; r < nbRows; ++r)
+                    ApplyDense(src, r * _nbFeatures, dst, r * _outputLength);
+            }
+
+            void ApplyDense(TInput[] x, int offset, TInput[] res, int resOffset)
+            {
+                int n = _nbFeatures;
+                if (n == 0)
+                    return;
+                int pos = resOffset;
+                Array.Copy(x, offset, res, pos, n);
+                pos += n;
+                if (_degree >= 2)
+                {
+                    for (int i = 0; i < n; ++i)
                     {
-                        var poly = EnumeratePosition(features.Count, degree)
-                                            .Select(pos => pos.Select(p => features.Values[p]).Aggregate((a, b) => _multiplication(a, b)))
-                                            .ToArray();
-                        polyfeat = new VBuffer<TInput>(poly.Length, poly);
+                        var xi = x[offset + i];
+                        for (int j = i; j < n; ++j)
+                            res[pos++] = _multiplication(xi, x[offset + j]);
                     }
-                    else
+                }
+                if (_degree >= 3)
+                {
+                    for (int i = 0; i < n; ++i)
                     {
-                        values.Clear();
-                        indices.Clear();
-
-                        foreach (var pos in EnumeratePosition(features.Count, degree))
+                        var xi = x[offset + i];
+                        for (int j = i; j < n; ++j)
                         {
-                            values.Add(pos.Select(p => features.Values[p]).Aggregate((a, b) => _multiplication(a, b)));
-                            indices.Add(computeIndex(pos.Select(p => features.Indices[p]), features.Length));
-#if (DEBUG)
-                            if (indices.Count > 1)
-                            {
-                                if (indices[indices.Count - 1] <= indices[indices.Count - 2])
-                                    throw Contracts.Except("Inconsistency");
-                            }
-#endif
+                            var xij = _multiplication(xi, x[offset + j]);
+                            for (int k = j; k < n; ++k)
+                                res[pos++] = _multiplication(xij, x[offset + k]);
                         }
-                        total = TotalCumulated[_args.degree](features.Length);
-                        polyfeat = new VBuffer<TInput>(total, values.Count, values.ToArray(), indices.ToArray());
                     }
-                };
+                }
             }
 
-            static IEnumerable<int[]> EnumeratePosition(int nbfeatures, int degree)
+            /// <summary>
+            /// Only the non null features are multiplied, the output indices are sorted.
+            /// </summary>
+            void ApplySparse(int count, TInput[] x, int[] ind, TInput[] res, int[] resIndices)
             {
-                if (degree >= 1)
-                {
-                    var position = new int[1];
-                    for (int i = 0; i < nbfeatures; ++i)
-                    {
-                        position[0] = i;
-                        yield return position;
-                    }
-                }
-                if (degree >= 2)
+                // An empty sparse vector may have null buffers.
+                if (count == 0)
+                    return;
+                int pos = 0;
+                Array.Copy(x, res, count);
+                Array.Copy(ind, resIndices, count);
+                pos += count;
+                if (_degree >= 2)
                 {
-                    var position = new int[2];
-                    for (int i = 0; i < nbfeatures; ++i)
+                    for (int i = 0; i < count; ++i)
                     {
-                        position[0] = i;
-                        for (int j = i; j < nbfeatures; ++j)
+                        var xi = x[i];
+                        int off = _offset2[ind[i]];
+                        for (int j = i; j < count; ++j)
                         {
-                            position[1] = j;
-                            yield return position;
+                            res[pos] = _multiplication(xi, x[j]);
+                            resIndices[pos++] = off + ind[j];
                         }
                     }
                 }
-                if (degree >= 3)
+                if (_degree >= 3)
                 {
-                    var position = new int[3];
-                    for (int i = 0; i < nbfeatures; ++i)
+                    for (int i = 0; i < count; ++i)
                     {
-                        position[0] = i;
-                        for (int j = i; j < nbfeatures; ++j)
+                        var xi = x[i];
+                        int offi = _offset3i[ind[i]];
+                        for (int j = i; j < count; ++j)
                         {
-                            position[1] = j;
-                            for (int k = j; k < nbfeatures; ++k)
+                            var xij = _multiplication(xi, x[j]);
+                            int offij = offi + _offset3j[ind[j]];
+                            for (int k = j; k < count; ++k)
                             {
-                                position[2] = k;
-                                yield return position;
+                                res[pos] = _multiplication(xij, x[k]);
+                                resIndices[pos++] = offij + ind[k];
                             }
                         }
                     }
                 }
-                if (degree >= 4)
-                    throw Contracts.ExceptNotImpl("Not implemented for a degree >= 4");
+#if (DEBUG)
+                for (int i = 1; i < pos; ++i)
+                    if (resIndices[i] <= resIndices[i - 1])
+                        throw Contracts.Except("Inconsistency");
+#endif
             }
         }
 
@@ -3,6 +3,8 @@
 using System;
 using System.Collections.Generic;
 using System.Linq;
+using System.Numerics;
+using System.Threading.Tasks;
 using Microsoft.ML;
 using Microsoft.ML.CommandLine;
 using Microsoft.ML.Data;
@@ -44,8 +46,8 @@ namespace Scikit.ML.FeaturesTransforms
         {
             return new VersionInfo(
                 modelSignature: "SCALETNS",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(ScalerTransform).Assembly.FullName);
@@ -68,10 +70,14 @@ namespace Scikit.ML.FeaturesTransforms
             [Argument(ArgumentType.AtMostOnce, HelpText = "Scaling strategy.", ShortName = "scale")]
             public ScalerStrategy scaling = ScalerStrategy.meanVar;
 
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of threads used to compute the statistics, null for the default value.", ShortName = "nt")]
+            public int? numThreads;
+
             public void Write(ModelSaveContext ctx, IHost host)
             {
                 ctx.Writer.Write(Column1x1.ArrayToLine(columns));
                 ctx.Writer.Write((int)scaling);
+                ctx.Writer.Write(numThreads ?? -1);
             }
 
             public void Read(ModelLoadContext ctx, IHost host)
@@ -79,6 +85,11 @@ namespace Scikit.ML.FeaturesTransforms
                 string sr = ctx.Reader.ReadString();
                 columns = Column1x1.ParseMulti(sr);
                 scaling = (ScalerStrategy)ctx.Reader.ReadInt32();
+                if (ctx.Header.ModelVerWritten >= 0x00010002)
+                {
+                    int nt = ctx.Reader.ReadInt32();
+                    numThreads = nt < 0 ? (int?)null : nt;
+                }
             }
 
             public void PostProcess()
@@ -244,7 +255,6 @@ namespace Scikit.ML.FeaturesTransforms
                         var indexesCol = new List<int>();
 
                         var textCols = _args.columns.Select(c => c.Source).ToArray();
-                        _scalingStat = new Dictionary<string, List<ColumnStatObs>>();
 
                         for (int i = 0; i < textCols.Length; ++i)
                         {
@@ -257,91 +267,30 @@ namespace Scikit.ML.FeaturesTransforms
                         }
 
                         // Computation
-                        var required = new HashSet<int>(indexesCol);
-                        var requiredIndexes = required.OrderBy(c => c).ToArray();
-                        using (var cur = _input.GetRowCursor(Schema.Where(c => required.Contains(c.Index))))
-                        {
-                            bool[] isText = requiredIndexes.Select(c => sch[c].Type == TextDataViewType.Instance).ToArray();
-                            bool[] isBool = requiredIndexes.Select(c => sch[c].Type == BooleanDataViewType.Instance).ToArray();
-                            bool[] isFloat = requiredIndexes.Select(c => sch[c].Type == NumberDataViewType.Single).ToArray();
-                            bool[] isUint = requiredIndexes.Select(c => sch[c].Type == NumberDataViewType.UInt32 || sch[c].Type.RawKind() == DataKind.UInt32).ToArray();
-                            ValueGetter<bool>[] boolGetters = requiredIndexes.Select(i => sch[i].Type == BooleanDataViewType.Instance || sch[i].Type.RawKind() == DataKind.Boolean ? cur.GetGetter<bool>(SchemaHelper._dc(i, cur)) : null).ToArray();
-                            ValueGetter<uint>[] uintGetters = requiredIndexes.Select(i => sch[i].Type == NumberDataViewType.UInt32 || sch[i].Type.RawKind() == DataKind.UInt32 ? cur.GetGetter<uint>(SchemaHelper._dc(i, cur)) : null).ToArray();
-                            ValueGetter<ReadOnlyMemory<char>>[] textGetters = requiredIndexes.Select(i => sch[i].Type == TextDataViewType.Instance ? cur.GetGetter<ReadOnlyMemory<char>>(SchemaHelper._dc(i, cur)) : null).ToArray();
-                            ValueGetter<float>[] floatGetters = requiredIndexes.Select(i => sch[i].Type == NumberDataViewType.Single ? cur.GetGetter<float>(SchemaHelper._dc(i, cur)) : null).ToArray();
-                            ValueGetter<VBuffer<float>>[] vectorGetters = requiredIndexes.Select(i => sch[i].Type.IsVector() ? cur.GetGetter<VBuffer<float>>(SchemaHelper._dc(i, cur)) : null).ToArray();
-
-                            var schema = _input.Schema;
-                            for (int i = 0; i < schema.Count; ++i)
-                            {
-                                string name = schema[i].Name;
-                                if (!required.Contains(i))
-                                    continue;
-                                _scalingStat[name] = new List<ColumnStatObs>();
-                                var t = _scalingStat[name];
-                                switch (_args.scaling)
-                                {
-                                    case ScalerStrategy.meanVar:
-                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.sum));
-                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.sum2));
-                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.nb));
-                                        break;
-                                    case ScalerStrategy.minMax:
-                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.min));
-                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.max));
-                                        break;
-                                    default:
-                                        throw _host.ExceptNotSupp($"Unsupported scaling strategy: {_args.scaling}.");
-                                }
-                            }
+                        var requiredIndexes = new HashSet<int>(indexesCol).OrderBy(c => c).ToArray();
+                        var slotStats = ComputeSlotStatistics(ch, requiredIndexes);
 
-                            float value = 0;
-                            var tvalue = new ReadOnlyMemory<char>();
-                            VBuffer<float> vector = new VBuffer<float>();
-                            uint uvalue = 0;
-                            bool bvalue = true;
-                            var curschema = cur.Schema;
-
-                            while (cur.MoveNext())
+                        var scalingStat = new Dictionary<string, List<ColumnStatObs>>();
+                        for (int i = 0; i < requiredIndexes.Length; ++i)
+                        {
+                            var t = new List<ColumnStatObs>();
+                            switch (_args.scaling)
                             {
-                                for (int i = 0; i < requiredIndexes.Length; ++i)
-                                {
-                                    string name = curschema[requiredIndexes[i]].Name;
-                                    if (!_scalingStat.ContainsKey(name))
-                                        continue;
-                                    if (isFloat[i])
-                                    {
-                                        floatGetters[i](ref value);
-                                        foreach (var t in _scalingStat[name])
-                                            t.Update(value);
-                                    }
-                                    else if (isBool[i])
-                                    {
-                                        boolGetters[i](ref bvalue);
-                                        foreach (var t in _scalingStat[name])
-                                            t.Update(bvalue);
-                                    }
-                                    else if (isText[i])
-                                    {
-                                        textGetters[i](ref tvalue);
-                                        foreach (var t in _scalingStat[name])
-                                            t.Update(tvalue.ToString());
-                                    }
-                                    else if (isUint[i])
-                                    {
-                                        uintGetters[i](ref uvalue);
-                                        foreach (var t in _scalingStat[name])
-                                            t.Update(uvalue);
-                                    }
-                                    else
-                                    {
-                                        vectorGetters[i](ref vector);
-                                        foreach (var t in _scalingStat[name])
-                                            t.Update(vector);
-                                    }
-                                }
+                                case ScalerStrategy.meanVar:
+                                    t.Add(slotStats[i].ToColumnStatObs(ColumnStatObs.StatKind.mean));
+                                    t.Add(slotStats[i].ToColumnStatObs(ColumnStatObs.StatKind.m2));
+                                    t.Add(slotStats[i].ToColumnStatObs(ColumnStatObs.StatKind.nb));
+                                    break;
+                                case ScalerStrategy.minMax:
+                                    t.Add(slotStats[i].ToColumnStatObs(ColumnStatObs.StatKind.min));
+                                    t.Add(slotStats[i].ToColumnStatObs(ColumnStatObs.StatKind.max));
+                                    break;
+                                default:
+                                    throw _host.ExceptNotSupp($"Unsupported scaling strategy: {_args.scaling}.");
                             }
+                            scalingStat[sch[requiredIndexes[i]].Name] = t;
                         }
+                        _scalingStat = scalingStat;
 
                         _scalingFactors = GetScalingParameters();
                         _revIndex = ComputeRevIndex();
@@ -350,6 +299,84 @@ namespace Scikit.ML.FeaturesTransforms
             }
         }
 
+        /// <summary>
+        /// Computes the statistics of every slot of every column. Each cursor
+        /// of a cursor set fills its own accumulators, they are merged at the end.
+        /// </summary>
+        SlotStatistics[] ComputeSlotStatistics(IChannel ch, int[] requiredIndexes)
+        {
+            var required = new HashSet<int>(requiredIndexes);
+            int nt = DataViewUtils.GetThreadCount(_args.numThreads ?? 0);
+            var cursors = _input.GetRowCursorSet(_input.Schema.Where(c => required.Contains(c.Index)), nt);
+            ch.Info("Computing scaling statistics with {0} cursors.", cursors.Length);
+
+            var partials = new SlotStatistics[cursors.Length][];
+            var ops = new Action[cursors.Length];
+            for (int i = 0; i < ops.Length; ++i)
+            {
+                int chunkId = i;
+                ops[i] = new Action(() =>
+                {
+                    using (var cursor = cursors[chunkId])
+                    {
+                        var stats = requiredIndexes.Select(c => new SlotStatistics()).ToArray();
+                        var updates = requiredIndexes.Select((c, k) => GetStatisticsUpdate(cursor, c, stats[k]))
+                                                     .Where(c => c != null).ToArray();
+                        while (cursor.MoveNext())
+                        {
+                            for (int k = 0; k < updates.Length; ++k)
+                                updates[k]();
+                        }
+                        partials[chunkId] = stats;
+                    }
+                });
+            }
+            Parallel.Invoke(new ParallelOptions() { MaxDegreeOfParallelism = ops.Length }, ops);
+
+            var res = partials[0];
+            for (int i = 1; i < partials.Length; ++i)
+                for (int k = 0; k < res.Length; ++k)
+                    res[k].Merge(partials[i][k]);
+            return res;
+        }
+
+        /// <summary>
+        /// Returns a function which reads the current value of a column and updates its statistics,
+        /// null for a text column (no statistics).
+        /// </summary>
+        static Action GetStatisticsUpdate(DataViewRowCursor cursor, int col, SlotStatistics stats)
+        {
+            var ty = cursor.Schema[col].Type;
+            var column = SchemaHelper._dc(col, cursor);
+            if (ty == TextDataViewType.Instance)
+                return null;
+            if (ty.IsVector())
+            {
+                var getter = cursor.GetGetter<VBuffer<float>>(column);
+                var value = new VBuffer<float>();
+                return () => { getter(ref value); stats.Update(in value); };
+            }
+            if (ty == BooleanDataViewType.Instance)
+            {
+                var getter = cursor.GetGetter<bool>(column);
+                bool value = false;
+                return () => { getter(ref value); stats.Update(value ? 1 : 0); };
+            }
+            if (ty == NumberDataViewType.Single)
+            {
+                var getter = cursor.GetGetter<float>(column);
+                float value = 0;
+                return () => { getter(ref value); stats.Update(value); };
+            }
+            if (ty.RawKind() == DataKind.UInt32)
+            {
+                var getter = cursor.GetGetter<uint>(column);
+                uint value = 0;
+                return () => { getter(ref value); stats.Update(value); };
+            }
+            throw Contracts.Except("Unsupported type {0} for column '{1}'.", ty, cursor.Schema[col].Name);
+        }
+
         Dictionary<int, int> ComputeRevIndex()
         {
             var revIndex = new Dictionary<int, int>();
@@ -372,12 +399,17 @@ namespace Scikit.ML.FeaturesTransforms
             public VBuffer<float> mean;
             public VBuffer<float> scale;
 
+            // Dense copies of mean and scale, a null scale is replaced by 1.
+            float[] _offset;
+            float[] _factor;
+
             public ScalingFactor(int colid, ScalingMethod method, VBuffer<float> mean, VBuffer<float> scale)
             {
                 scalingMethod = method;
                 columnId = colid;
                 this.mean = mean;
                 this.scale = scale;
+                PrepareAffine();
             }
 
             public ScalingFactor(IHost host, int colid, ScalerStrategy strategy, List<ColumnStatObs> obs)
@@ -394,35 +426,67 @@ namespace Scikit.ML.FeaturesTransforms
                     default:
                         throw host.ExceptNotSupp($"Unknown scaling strategy {strategy}.");
                 }
+                PrepareAffine();
+            }
+
+            void PrepareAffine()
+            {
+                _offset = mean.DenseValues().ToArray();
+                _factor = scale.DenseValues().Select(c => c == 0f ? 1f : c).ToArray();
             }
 
             ScalingMethod ComputeMeanVar(IHost host, List<ColumnStatObs> stats,
                                          out VBuffer<float> mean, out VBuffer<float> variance)
             {
                 var nb = stats.Where(c => c.kind == ColumnStatObs.StatKind.nb).ToArray();
-                var sum = stats.Where(c => c.kind == ColumnStatObs.StatKind.sum).ToArray();
-                var sum2 = stats.Where(c => c.kind == ColumnStatObs.StatKind.sum2).ToArray();
                 if (nb.Length != 1)
                     throw host.Except("nb is null");
-                if (sum.Length != 1)
-                    throw host.Except("sum is null");
-                if (sum2.Length != 1)
-                    throw host.Except("sum2 is null");
                 var dnb = nb[0].stat.DenseValues().ToArray();
-                var dsum = sum[0].stat.DenseValues().ToArray();
-                var dsum2 = sum2[0].stat.DenseValues().ToArray();
-                if (dnb.Length != dsum.Length)
-                    throw host.Except("{0} != {1}", dnb.Length, dsum.Length);
-                if (dnb.Length != dsum2.Length)
-                    throw host.Except("{0} != {1}", dnb.Length, dsum2.Length);
                 var dmean = new float[dnb.Length];
                 var dvar = new float[dnb.Length];
-                for (int i = 0; i < dmean.Length; ++i)
+
+                var m1 = stats.Where(c => c.kind == ColumnStatObs.StatKind.mean).ToArray();
+                var m2 = stats.Where(c => c.kind == ColumnStatObs.StatKind.m2).ToArray();
+                if (m1.Length == 1 && m2.Length == 1)
+                {
+                    // Mean and sum of squared deviations (Welford).
+                    var dm1 = m1[0].stat.DenseValues().ToArray();
+                    var dm2 = m2[0].stat.DenseValues().ToArray();
+                    if (dnb.Length != dm1.Length)
+                        throw host.Except("{0} != {1}", dnb.Length, dm1.Length);
+                    if (dnb.Length != dm2.Length)
+                        throw host.Except("{0} != {1}", dnb.Length, dm2.Length);
+                    for (int i = 0; i < dmean.Length; ++i)
+                    {
+                        dmean[i] = dnb[i] == 0 ? 0 : (float)dm1[i];
+                        dvar[i] = dnb[i] == 0 ? 0 : (float)Math.Sqrt(Math.Max(0, dm2[i] / dnb[i]));
+                        if (dvar[i] != 0)
+                            dvar[i] = 1f / dvar[i];
+                    }
+                }
+                else
                 {
-                    dmean[i] = (float)(dnb[i] == 0 ? 0 : dsum[i] / dnb[i]);
-                    dvar[i] = dnb[i] == 0 ? 0 : (float)Math.Sqrt(dsum2[i] / dnb[i] - dmean[i] * dmean[i]);
-                    if (dvar[i] != 0)
-                        dvar[i] = 1f / dvar[i];
+                    // Models saved before the statistics were computed with Welford's method.
+                    var sum = stats.Where(c => c.kind == ColumnStatObs.StatKind.sum).ToArray();
+                    var sum2 = stats.Where(c => c.kind == ColumnStatObs.StatKind.sum2).ToArray();
+                    if (sum.Length != 1)
+                        throw host.Except("sum is null");
+                    if (sum2.Length != 1)
+                        throw host.Except("sum2 is null");
+                    var dsum = sum[0].stat.DenseValues().ToArray();
+                    var dsum2 = sum2[0].stat.DenseValues().ToArray();
+                    if (dnb.Length != dsum.Length)
+                        throw host.Except("{0} != {1}", dnb.Length, dsum.Length);
+                    if (dnb.Length != dsum2.Length)
+                        throw host.Except("{0} != {1}", dnb.Length, dsum2.Length);
+                    for (int i = 0; i < dmean.Length; ++i)
+                    {
+                        double m = dnb[i] == 0 ? 0 : dsum[i] / dnb[i];
+                        dmean[i] = (float)m;
+                        dvar[i] = dnb[i] == 0 ? 0 : (float)Math.Sqrt(Math.Max(0, dsum2[i] / dnb[i] - m * m));
+                        if (dvar[i] != 0)
+                            dvar[i] = 1f / dvar[i];
+                    }
                 }
                 mean = new VBuffer<float>(dmean.Length, dmean);
                 variance = new VBuffer<float>(dvar.Length, dvar);
@@ -462,21 +526,13 @@ namespace Scikit.ML.FeaturesTransforms
                 {
                     case ScalingMethod.Affine:
                         if (dst.IsDense)
-                        {
-                            for (int i = 0; i < dst.Count; ++i)
-                            {
-                                dst.Values[i] -= mean.Values[i];
-                                if (scale.Values[i] != 0f)
-                                    dst.Values[i] *= scale.Values[i];
-                            }
-                        }
+                            ApplyAffine(dst.Values, _offset, _factor, dst.Count);
                         else
                         {
                             for (int i = 0; i < dst.Count; ++i)
                             {
-                                dst.Values[i] -= mean.Values[dst.Indices[i]];
-                                if (scale.Values[dst.Indices[i]] != 0f)
-                                    dst.Values[i] *= scale.Values[dst.Indices[i]];
+                                int j = dst.Indices[i];
+                                dst.Values[i] = (dst.Values[i] - _offset[j]) * _factor[j];
                             }
                         }
                         break;
@@ -486,6 +542,28 @@ namespace Scikit.ML.FeaturesTransforms
             }
         }
 
+        /// <summary>
+        /// Computes <pre>values[i] = (values[i] - offset[i]) * factor[i]</pre>
+        /// for the first <i>count</i> values, with SIMD instructions if available.
+        /// </summary>
+        public static void ApplyAffine(float[] values, float[] offset, float[] factor, int count)
+        {
+            if (count > offset.Length || count > factor.Length)
+                throw Contracts.Except("Mismatch dimension {0} for values != {1} for scaling vectors.", count, offset.Length);
+            int i = 0;
+            if (Vector.IsHardwareAccelerated)
+            {
+                int width = Vector<float>.Count;
+                for (; i <= count - width; i += width)
+                {
+                    var v = (new Vector<float>(values, i) - new Vector<float>(offset, i)) * new Vector<float>(factor, i);
+                    v.CopyTo(values, i);
+                }
+            }
+            for (; i < count; ++i)
+                values[i] = (values[i] - offset[i]) * factor[i];
+        }
+
         Dictionary<int, ScalingFactor> GetScalingParameters()
         {
             var res = new Dictionary<int, ScalingFactor>();
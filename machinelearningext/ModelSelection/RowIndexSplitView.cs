@@ -0,0 +1,265 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using Microsoft.ML;
+using Microsoft.ML.Data;
+using Microsoft.ML.Runtime;
+using Scikit.ML.PipelineHelper;
+
+
+namespace Scikit.ML.ModelSelection
+{
+    /// <summary>
+    /// Stores in which part every row of a cached view belongs to.
+    /// The membership is indexed by the row id, one byte per row.
+    /// It assumes the row id of the cached view is the row index,
+    /// which is true for <see cref="CacheDataView"/> or a binary loader.
+    /// </summary>
+    public class RowIndexSplit
+    {
+        /// <summary>
+        /// Maximum number of parts or folds.
+        /// </summary>
+        public const int MaxParts = byte.MaxValue;
+
+        readonly byte[] _membership;
+        readonly long[] _counts;
+
+        /// <summary>
+        /// Number of parts or folds.
+        /// </summary>
+        public int NbParts => _counts.Length;
+
+        /// <summary>
+        /// Number of rows.
+        /// </summary>
+        public long Length => _membership.Length;
+
+        /// <summary>
+        /// Number of rows in every part.
+        /// </summary>
+        public long[] Counts => _counts;
+
+        /// <summary>
+        /// Returns the part of a row.
+        /// </summary>
+        public int this[long row] => _membership[row];
+
+        RowIndexSplit(byte[] membership, int nbParts)
+        {
+            _membership = membership;
+            _counts = new long[nbParts];
+            for (int i = 0; i < membership.Length; ++i)
+                ++_counts[membership[i]];
+        }
+
+        /// <summary>
+        /// Randomly splits <i>nbRows</i> rows into parts following ratios.
+        /// Every part gets exactly <i>ratios[i] * nbRows</i> rows (rounded).
+        /// </summary>
+        public static RowIndexSplit FromRatios(float[] ratios, long nbRows, int seed)
+        {
+            Contracts.CheckValue(ratios, nameof(ratios));
+            Contracts.CheckParam(ratios.Length > 0 && ratios.Length <= MaxParts, nameof(ratios), "Unexpected number of ratios.");
+            var permutation = Permutation(nbRows, seed);
+            var membership = new byte[permutation.Length];
+            double cum = 0;
+            int begin = 0;
+            for (int p = 0; p < ratios.Length; ++p)
+            {
+                cum += ratios[p];
+                int end = p == ratios.Length - 1
+                            ? permutation.Length
+                            : Math.Min(permutation.Length, (int)Math.Round(cum * permutation.Length));
+                for (int i = begin; i < end; ++i)
+                    membership[permutation[i]] = (byte)p;
+                begin = Math.Max(begin, end);
+            }
+            return new RowIndexSplit(membership, ratios.Length);
+        }
+
+        /// <summary>
+        /// Randomly splits <i>nbRows</i> rows into <i>folds</i> folds,
+        /// fold sizes differ by one row at most.
+        /// </summary>
+        public static RowIndexSplit FromFolds(int folds, long nbRows, int seed)
+        {
+            Contracts.CheckParam(folds > 1 && folds <= MaxParts, nameof(folds), "Unexpected number of folds.");
+            var permutation = Permutation(nbRows, seed);
+            var membership = new byte[permutation.Length];
+            for (int i = 0; i < permutation.Length; ++i)
+                membership[permutation[i]] = (byte)(i % folds);
+            return new RowIndexSplit(membership, folds);
+        }
+
+        static int[] Permutation(long nbRows, int seed)
+        {
+            Contracts.CheckParam(nbRows >= 0 && nbRows <= int.MaxValue, nameof(nbRows), "Too many rows.");
+            var permutation = new int[nbRows];
+            for (int i = 0; i < permutation.Length; ++i)
+                permutation[i] = i;
+            var rand = new Random(seed);
+            for (int i = permutation.Length - 1; i > 0; --i)
+            {
+                int j = rand.Next(i + 1);
+                int t = permutation[i];
+                permutation[i] = permutation[j];
+                permutation[j] = t;
+            }
+            return permutation;
+        }
+
+        /// <summary>
+        /// Returns the part of a row from its id.
+        /// </summary>
+        public int GetPart(ref DataViewRowId id)
+        {
+            if (id.High != 0 || id.Low >= (ulong)_membership.Length)
+                throw Contracts.Except("Row id {0} is out of range [0, {1}[, the source must be a cache.", id, _membership.Length);
+            return _membership[id.Low];
+        }
+    }
+
+    /// <summary>
+    /// Exposes the rows of a cached view which belong to one part
+    /// (or all parts but one) of a <see cref="RowIndexSplit"/>.
+    /// No row is copied, the cursor skips the rows which are not selected.
+    /// It can also add a column holding the part of every row.
+    /// </summary>
+    public class RowIndexSplitView : IDataView
+    {
+        readonly IHost _host;
+        readonly IDataView _source;
+        readonly RowIndexSplit _split;
+        readonly int _part;
+        readonly bool _complement;
+        readonly DataViewSchema _schema;
+        readonly int _partColumn;
+
+        /// <summary>
+        /// Constructor.
+        /// </summary>
+        /// <param name="env">environment</param>
+        /// <param name="source">cached view, row ids must be row indices</param>
+        /// <param name="split">membership</param>
+        /// <param name="part">selected part, -1 for all rows</param>
+        /// <param name="complement">select all rows but the part</param>
+        /// <param name="partColumn">adds a column with the part if not null</param>
+        public RowIndexSplitView(IHostEnvironment env, IDataView source, RowIndexSplit split,
+                                 int part = -1, bool complement = false, string partColumn = null)
+        {
+            Contracts.CheckValue(env, nameof(env));
+            _host = env.Register("RowIndexSplitView");
+            _host.CheckValue(source, nameof(source));
+            _host.CheckValue(split, nameof(split));
+            _host.CheckParam(part >= -1 && part < split.NbParts, nameof(part), "Unexpected part.");
+            _host.CheckParam(part >= 0 || !complement, nameof(complement), "complement requires a part.");
+            var count = source.GetRowCount();
+            if (count.HasValue && count.Value != split.Length)
+                throw _host.Except("Row count mismatch {0} != {1}.", count.Value, split.Length);
+            _source = source;
+            _split = split;
+            _part = part;
+            _complement = complement;
+            if (string.IsNullOrEmpty(partColumn))
+            {
+                _schema = source.Schema;
+                _partColumn = -1;
+            }
+            else
+            {
+                _schema = ExtendedSchema.Create(new ExtendedSchema(source.Schema, new[] { partColumn },
+                                                                   new[] { NumberDataViewType.Int32 }));
+                _partColumn = source.Schema.Count;
+            }
+        }
+
+        public IDataView Source => _source;
+        public DataViewSchema Schema => _schema;
+        public bool CanShuffle => _source.CanShuffle;
+
+        public long? GetRowCount()
+        {
+            if (_part == -1)
+                return _split.Length;
+            return _complement ? _split.Length - _split.Counts[_part] : _split.Counts[_part];
+        }
+
+        public DataViewRowCursor GetRowCursor(IEnumerable<DataViewSchema.Column> columnsNeeded, Random rand = null)
+        {
+            var cols = SchemaHelper.ColumnsNeeded(columnsNeeded, _source.Schema, new int[0]);
+            return new RowIndexSplitCursor(this, _source.GetRowCursor(cols, rand));
+        }
+
+        public DataViewRowCursor[] GetRowCursorSet(IEnumerable<DataViewSchema.Column> columnsNeeded, int n, Random rand = null)
+        {
+            var cols = SchemaHelper.ColumnsNeeded(columnsNeeded, _source.Schema, new int[0]);
+            return _source.GetRowCursorSet(cols, n, rand)
+                          .Select(c => (DataViewRowCursor)new RowIndexSplitCursor(this, c))
+                          .ToArray();
+        }
+
+        class RowIndexSplitCursor : DataViewRowCursor
+        {
+            readonly RowIndexSplitView _view;
+            readonly DataViewRowCursor _inputCursor;
+            readonly ValueGetter<DataViewRowId> _idGetter;
+            DataViewRowId _id;
+            int _currentPart;
+            long _position;
+
+            public RowIndexSplitCursor(RowIndexSplitView view, DataViewRowCursor cursor)
+            {
+                _view = view;
+                _inputCursor = cursor;
+                _idGetter = cursor.GetIdGetter();
+                _position = -1;
+            }
+
+            public override ValueGetter<DataViewRowId> GetIdGetter() { return _idGetter; }
+            public override bool IsColumnActive(DataViewSchema.Column col)
+            {
+                return col.Index == _view._partColumn || _inputCursor.IsColumnActive(col);
+            }
+
+            public override long Batch { get { return _inputCursor.Batch; } }
+            public override long Position { get { return _position; } }
+            public override DataViewSchema Schema { get { return _view.Schema; } }
+
+            public override bool MoveNext()
+            {
+                while (_inputCursor.MoveNext())
+                {
+                    _idGetter(ref _id);
+                    _currentPart = _view._split.GetPart(ref _id);
+                    if (_view._part == -1 || (_currentPart == _view._part) != _view._complement)
+                    {
+                        ++_position;
+                        return true;
+                    }
+                }
+                return false;
+            }
+
+            protected override void Dispose(bool disposing)
+            {
+                if (disposing)
+                    _inputCursor.Dispose();
+                GC.SuppressFinalize(this);
+            }
+
+            public override ValueGetter<TValue> GetGetter<TValue>(DataViewSchema.Column col)
+            {
+                if (col.Index != _view._partColumn)
+                    return _inputCursor.GetGetter<TValue>(col);
+                ValueGetter<int> getter = (ref int dst) => { dst = _currentPart; };
+                var res = getter as ValueGetter<TValue>;
+                if (res == null)
+                    throw Contracts.Except("Column '{0}' is Int32 not {1}.", col.Name, typeof(TValue));
+                return res;
+            }
+        }
+    }
+}
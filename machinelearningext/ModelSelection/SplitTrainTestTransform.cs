@@ -34,6 +34,10 @@ namespace Scikit.ML.ModelSelection
     /// a column which tells in which part the data belongs to.
     /// The transform can save the result if requested in that case, the added
     /// column will be removed before the data is saved.
+    /// With <tt>inMemory</tt> or <tt>folds</tt>, the data is cached once,
+    /// the membership is computed once as an array indexed by row ids
+    /// and every part or fold is a view on the cache (see <see cref="RowIndexSplitView"/>),
+    /// no row is copied.
     /// </summary>
     public class SplitTrainTestTransform : TransformBase, ITaggedDataView
     {
@@ -47,8 +51,8 @@ namespace Scikit.ML.ModelSelection
         {
             return new VersionInfo(
                 modelSignature: "SPLTTRTE",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(SplitTrainTestTransform).Assembly.FullName);
@@ -99,6 +103,12 @@ namespace Scikit.ML.ModelSelection
                       SignatureType = typeof(SignatureDataSaver))]
             public IComponentFactory<IDataSaver> saverSettings = new ScikitSubComponent<IDataSaver, SignatureDataSaver>("binary");
 
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Caches the data once and exposes every part as a view on the cache based on row indices.", ShortName = "mem")]
+            public bool inMemory = false;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of folds (k-fold), ratios are ignored if > 0. It implies inMemory.", ShortName = "k")]
+            public int folds = 0;
+
             public void PostProcess()
             {
                 if (tag != null && tag.Length == 1 && tag[0].Contains(","))
@@ -133,12 +143,26 @@ namespace Scikit.ML.ModelSelection
         readonly string _cacheFile;
         readonly bool _reuse;
         readonly string[] _tags;
-        IDataTransform _pipedTransform;
+        IDataView _pipedTransform;
         readonly string _saverSettings;
+        readonly bool _inMemory;
+        readonly int _folds;
+        IDataView _cached;
+        RowIndexSplit _split;
 
         public override DataViewSchema OutputSchema { get { return _pipedTransform.Schema; } }
         public IPredictor TaggedPredictor { get { return null; } }
 
+        /// <summary>
+        /// Number of parts (or folds).
+        /// </summary>
+        public int NbParts => _folds > 0 ? _folds : _ratios.Length;
+
+        /// <summary>
+        /// Membership of every row, null if the transform does not run in memory.
+        /// </summary>
+        public RowIndexSplit Split => _split;
+
         #endregion
 
         #region public constructor / serialization / load / save
@@ -155,8 +179,10 @@ namespace Scikit.ML.ModelSelection
             Host.CheckUserArg(!string.IsNullOrEmpty(args.newColumn), "newColumn cannot be empty");
             Host.CheckUserArg(args.ratios != null, "ratios cannot be null");
             Host.CheckUserArg(args.ratios.Length > 1, "Number of ratios must be > 1");
-            Host.CheckUserArg(args.filename == null || args.tag != null || args.filename.Length == args.ratios.Length, "filenames must be either empty either an array of the same size as ratios");
-            Host.CheckUserArg(args.tag == null || args.filename != null || args.tag.Length == args.ratios.Length, "filenames must be either empty either an array of the same size as ratios");
+            Host.CheckUserArg(args.folds == 0 || (args.folds > 1 && args.folds <= RowIndexSplit.MaxParts), "folds must be 0 or in [2, 255]");
+            int nbParts = args.folds > 0 ? args.folds : args.ratios.Length;
+            Host.CheckUserArg(args.filename == null || args.tag != null || args.filename.Length == nbParts, "filenames must be either empty either an array of the same size as ratios");
+            Host.CheckUserArg(args.tag == null || args.filename != null || args.tag.Length == nbParts, "filenames must be either empty either an array of the same size as ratios");
             Host.CheckUserArg(!args.numThreads.HasValue || args.numThreads.Value > 0, "numThreads cannot be negative.");
             var sum = args.fratios.Sum();
             Host.CheckUserArg(Math.Abs(sum - 1f) < 1e-5, "Sum of ratios must be 1.");
@@ -173,6 +199,8 @@ namespace Scikit.ML.ModelSelection
             _cacheFile = args.cacheFile;
             _reuse = args.reuse;
             _tags = args.tag;
+            _folds = args.folds;
+            _inMemory = args.inMemory || args.folds > 0;
 
             var saveSettings = args.saverSettings as ICommandLineComponentFactory;
             Host.CheckValue(saveSettings, nameof(saveSettings));
@@ -240,6 +268,8 @@ namespace Scikit.ML.ModelSelection
             ctx.Writer.Write(_numThreads.HasValue ? _numThreads.Value : -1);
             ctx.Writer.Write(_tags == null ? "" : string.Join(",", _tags));
             ctx.Writer.Write(_saverSettings);
+            ctx.Writer.Write(_inMemory);
+            ctx.Writer.Write(_folds);
         }
 
         private SplitTrainTestTransform(IHost host, ModelLoadContext ctx, IDataView input) :
@@ -268,6 +298,12 @@ namespace Scikit.ML.ModelSelection
             string tags = ctx.Reader.ReadString();
             _tags = string.IsNullOrEmpty(tags) ? null : tags.Split(',');
             _saverSettings = ctx.Reader.ReadString();
+            if (ctx.Header.ModelVerWritten >= 0x00010002)
+            {
+                _inMemory = ctx.Reader.ReadBoolean();
+                _folds = ctx.Reader.ReadInt32();
+                Host.CheckDecode(_folds >= 0 && _folds <= RowIndexSplit.MaxParts);
+            }
 
             var saver = ComponentCreation.CreateSaver(Host, _saverSettings);
             if (saver == null)
@@ -317,10 +353,54 @@ namespace Scikit.ML.ModelSelection
 
         #endregion
 
+        #region views on parts
+
+        /// <summary>
+        /// Returns the rows of one part, it requires <tt>inMemory</tt> or <tt>folds</tt>.
+        /// </summary>
+        public IDataView GetPart(int part)
+        {
+            CheckInMemory();
+            Host.CheckParam(part >= 0 && part < NbParts, nameof(part));
+            return new RowIndexSplitView(Host, _cached, _split, part);
+        }
+
+        /// <summary>
+        /// Returns the training (every fold but <i>fold</i>) or the test set (<i>fold</i>)
+        /// of a k-fold, it requires <tt>inMemory</tt> or <tt>folds</tt>.
+        /// </summary>
+        public IDataView GetFold(int fold, bool train)
+        {
+            CheckInMemory();
+            Host.CheckParam(fold >= 0 && fold < NbParts, nameof(fold));
+            return new RowIndexSplitView(Host, _cached, _split, fold, complement: train);
+        }
+
+        /// <summary>
+        /// Enumerates every pair (train, test) of a k-fold.
+        /// </summary>
+        public IEnumerable<Tuple<IDataView, IDataView>> EnumerateFolds()
+        {
+            CheckInMemory();
+            for (int i = 0; i < NbParts; ++i)
+                yield return new Tuple<IDataView, IDataView>(GetFold(i, true), GetFold(i, false));
+        }
+
+        void CheckInMemory()
+        {
+            if (_split == null)
+                throw Host.Except("Parts are only available with inMemory or folds.");
+        }
+
+        #endregion
+
         #region transform own logic
 
-        IDataTransform AppendToPipeline(IDataView input)
+        IDataView AppendToPipeline(IDataView input)
         {
+            if (_inMemory)
+                return AppendIndexSplitToPipeline(input);
+
             IDataView current = input;
             if (_shuffleInput)
             {
@@ -434,6 +514,86 @@ namespace Scikit.ML.ModelSelection
                 }
             }
 
+            return TagViews(finalTr, taggedViews);
+        }
+
+        /// <summary>
+        /// Caches the data once and computes the membership of every row.
+        /// </summary>
+        IDataView AppendIndexSplitToPipeline(IDataView input)
+        {
+            IDataView current = input;
+            if (_shuffleInput)
+            {
+                var args1 = new RowShufflingTransformer.Options()
+                {
+                    ForceShuffle = false,
+                    ForceShuffleSeed = _seedShuffle,
+                    PoolRows = _poolRows,
+                    PoolOnly = false,
+                };
+                current = new RowShufflingTransformer(Host, args1, current);
+            }
+
+            // Row ids of the cache are row indices.
+            if (string.IsNullOrEmpty(_cacheFile))
+                _cached = new CacheDataView(Host, current, null);
+            else
+            {
+                var args3 = new ExtendedCacheTransform.Arguments()
+                {
+                    inDataFrame = false,
+                    numTheads = _numThreads,
+                    cacheFile = _cacheFile,
+                    reuse = _reuse,
+                };
+                _cached = new ExtendedCacheTransform(Host, args3, current);
+            }
+
+            long nbRows = DataViewUtils.ComputeRowCount(_cached);
+            int seed = (int)(_seed ?? 42);
+            _split = _folds > 0
+                        ? RowIndexSplit.FromFolds(_folds, nbRows, seed)
+                        : RowIndexSplit.FromRatios(_ratios, nbRows, seed);
+
+            var taggedViews = new List<Tuple<string, ITaggedDataView>>();
+            if (_filenames != null || _tags != null)
+            {
+                int nbf = _filenames == null ? 0 : _filenames.Length;
+                if (nbf > 0 && nbf != NbParts)
+                    throw Host.Except("Different number of filenames and parts ({0} != {1}).", nbf, NbParts);
+                int nbt = _tags == null ? 0 : _tags.Length;
+                if (nbt > 0 && nbt != NbParts)
+                    throw Host.Except("Different number of tags and parts ({0} != {1}).", nbt, NbParts);
+
+                using (var ch = Host.Start("Split the datasets and stores each part."))
+                {
+                    for (int i = 0; i < NbParts; ++i)
+                    {
+                        var part = GetPart(i);
+                        ch.Info("Create part {0}: {1} rows", i + 1, _split.Counts[i]);
+                        if (_filenames != null && _filenames.Any())
+                        {
+                            var saver = ComponentCreation.CreateSaver(Host, _saverSettings);
+                            using (var fs0 = Host.CreateOutputFile(_filenames[i]))
+                                DataSaverUtils.SaveDataView(ch, saver, part, fs0, true);
+                        }
+                        if (_tags != null && _tags.Any())
+                        {
+                            var ar = new TagViewTransform.Arguments { tag = _tags[i] };
+                            var tar = new TagViewTransform(Host, ar, part);
+                            taggedViews.Add(new Tuple<string, ITaggedDataView>(_tags[i], tar));
+                        }
+                    }
+                }
+            }
+
+            var view = new RowIndexSplitView(Host, _cached, _split, partColumn: _newColumn);
+            return TagViews(view, taggedViews);
+        }
+
+        IDataView TagViews(IDataView finalTr, List<Tuple<string, ITaggedDataView>> taggedViews)
+        {
             if (taggedViews == null)
                 return finalTr;
             else
@@ -208,6 +208,7 @@ namespace Scikit.ML.Multiclass
                 .Prepend(RoleMappedSchema.ColumnRole.Feature.Bind(newFeatures))
                 .Prepend(RoleMappedSchema.ColumnRole.Label.Bind(dstName));
             var trainer_input = new RoleMappedData(after_concatenation, roles);
+            trainer_input = CacheTrainingData(ch, trainer_input, _args);
 
             ch.Info("New Features: {0}:{1}", trainer_input.Schema.Feature.Value.Name, trainer_input.Schema.Feature.Value.Type);
             ch.Info("New Label: {0}:{1}", trainer_input.Schema.Label.Value.Name, trainer_input.Schema.Label.Value.Type);
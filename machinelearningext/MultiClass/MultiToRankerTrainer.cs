@@ -269,6 +269,7 @@ namespace Scikit.ML.Multiclass
                 .Prepend(RoleMappedSchema.ColumnRole.Label.Bind(dstName))
                 .Prepend(RoleMappedSchema.ColumnRole.Group.Bind(groupColumn));
             var trainer_input = new RoleMappedData(after_concatenation_key_label, roles);
+            trainer_input = CacheTrainingData(ch, trainer_input, _args);
 
             #endregion
 
@@ -1,6 +1,7 @@
 ﻿// See the LICENSE file in the project root for more information.
 
 using System;
+using System.Collections.Generic;
 using System.Linq;
 using Microsoft.ML;
 using Microsoft.ML.CommandLine;
@@ -54,6 +55,9 @@ namespace Scikit.ML.Multiclass
                 SortOrder = 1, SignatureType = typeof(SignatureTrainer))]
             public IComponentFactory<ITrainer> reclassicationPredictor = null;
 
+            [Argument(ArgumentType.LastOccurrenceWins, HelpText = "Cache the multiplied rows once before training the learner.", ShortName = "ctd")]
+            public bool cacheTrainingData = false;
+
             #endregion
         }
 
@@ -375,6 +379,33 @@ namespace Scikit.ML.Multiclass
 #endif
         #endregion
 
+        /// <summary>
+        /// Caches the given columns only. The cache is filled on the first pass
+        /// and then shared by every cursor, the other columns are never materialized.
+        /// </summary>
+        public static IDataView CacheColumns(IHostEnvironment env, IDataView view, IEnumerable<string> columns)
+        {
+            Contracts.CheckValue(env, nameof(env));
+            env.CheckValue(view, nameof(view));
+            env.CheckValue(columns, nameof(columns));
+            var prefetch = columns.Where(c => c != null).Distinct()
+                                  .Select(c => SchemaHelper.GetColumnIndex(view.Schema, c))
+                                  .ToArray();
+            return new CacheDataView(env, view, prefetch);
+        }
+
+        /// <summary>
+        /// Caches the columns used by the trainer if <tt>cacheTrainingData</tt> is true.
+        /// </summary>
+        protected RoleMappedData CacheTrainingData(IChannel ch, RoleMappedData data, Arguments args)
+        {
+            if (!args.cacheTrainingData)
+                return data;
+            ch.Info("Caching training data");
+            var columns = data.Schema.GetColumnRoleNames().Select(kvp => kvp.Value);
+            return new RoleMappedData(CacheColumns(Host, data.Data, columns), data.Schema.GetColumnRoleNames());
+        }
+
         protected IDataView FilterNA(IDataView view, string label, bool dropNALabel)
         {
             if (dropNALabel)
@@ -2,6 +2,7 @@
 
 using System;
 using System.Linq;
+using System.Threading.Tasks;
 using Microsoft.ML;
 using Microsoft.ML.CommandLine;
 using Microsoft.ML.Data;
@@ -60,6 +61,14 @@ namespace Scikit.ML.Multiclass
             [Argument(ArgumentType.Multiple, HelpText = "Add a cache transform before training. That might required if cursor happen to be in an unstable state",
                 ShortName = "cache", NullName = "<None>", SignatureType = typeof(SignatureDataTransform))]
             public IComponentFactory<IDataTransform> cacheTransform = null;
+
+            [Argument(ArgumentType.LastOccurrenceWins, HelpText = "Cache the features, the label and the weight once before training all the sub-models.", ShortName = "ctd")]
+            public bool cacheTrainingData = false;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of sub-models trained in parallel, 1 if not specified. " +
+                "Every sub-model runs its own learner: if the learner is already multi-threaded (FastTree, LightGBM, ...), " +
+                "the training uses nt times the learner's threads, one of them should be reduced.", ShortName = "nt")]
+            public int? numThreads;
         }
 
         private readonly Arguments _args;
@@ -96,29 +105,72 @@ namespace Scikit.ML.Multiclass
 
             using (var ch = Host.Start("Training"))
             {
-                // Train one-vs-all models.
-                _predictors = new TScalarPredictor[count];
-                for (int i = 0; i < _predictors.Length; i++)
+                // The input is filtered and cached once, every sub-model
+                // only adds its own label on top of the shared view.
+                data = PrepareSharedData(ch, data);
+
+                // We may have instantiated the first trainer to use already. If so capture it;
+                // otherwise create a new one. Trainers are created here because sub-models
+                // trained in parallel cannot share the same instance.
+                var trainers = new TScalarTrainer[count];
+                for (int i = 0; i < trainers.Length; i++)
                 {
-                    ch.Info("Training learner {0}", i);
-
-                    // We may have instantiated the first trainer to use already. If so capture it;
-                    // otherwise create a new one.
-                    TScalarTrainer trainer;
                     if (_trainer != null)
-                        trainer = _trainer;
+                        trainers[i] = _trainer;
                     else
                     {
                         var temp = ScikitSubComponent<ITrainer, SignatureBinaryClassifierTrainer>.AsSubComponent(_args.predictorType);
-                        trainer = temp.CreateInstance(Host) as TScalarTrainer;
+                        trainers[i] = temp.CreateInstance(Host) as TScalarTrainer;
+                        Host.CheckValue(trainers[i], nameof(trainers));
                     }
                     _trainer = null;
-                    _predictors[i] = TrainOne(ch, trainer, data, i);
+                }
+
+                // Train one-vs-all models.
+                _predictors = new TScalarPredictor[count];
+                int nt = Math.Min(_args.numThreads ?? 1, count);
+                if (nt > Environment.ProcessorCount)
+                {
+                    ch.Warning("{0} sub-models in parallel exceeds the number of cores {1}.", nt, Environment.ProcessorCount);
+                    nt = Environment.ProcessorCount;
+                }
+                if (nt <= 1)
+                {
+                    for (int i = 0; i < _predictors.Length; i++)
+                    {
+                        ch.Info("Training learner {0}", i);
+                        _predictors[i] = TrainOne(ch, trainers[i], data, i);
+                    }
+                }
+                else
+                {
+                    ch.Info("Training {0} learners with {1} threads", count, nt);
+                    Parallel.For(0, count, new ParallelOptions() { MaxDegreeOfParallelism = nt }, i =>
+                    {
+                        using (var chi = Host.Start(string.Format("Training learner {0}", i)))
+                            _predictors[i] = TrainOne(chi, trainers[i], data, i);
+                    });
                 }
             }
             return CreatePredictor();
         }
 
+        /// <summary>
+        /// Removes missing labels and caches the columns used by the sub-models
+        /// so that the pipeline producing the features runs only once.
+        /// </summary>
+        private RoleMappedData PrepareSharedData(IChannel ch, RoleMappedData data)
+        {
+            var view = FilterNA(data.Data, data.Schema.Label.Value.Name);
+            if (_args.cacheTrainingData)
+            {
+                ch.Info("Caching training data for all sub-models");
+                var columns = data.Schema.GetColumnRoleNames().Select(kvp => kvp.Value);
+                view = MultiToTrainerCommon.CacheColumns(Host, view, columns);
+            }
+            return new RoleMappedData(view, data.Schema.GetColumnRoleNames());
+        }
+
         // cls is the "class id", zero-based.
         private TScalarPredictor TrainOne(IChannel ch, TScalarTrainer trainer, RoleMappedData data, int cls)
         {
@@ -178,7 +230,7 @@ namespace Scikit.ML.Multiclass
                 if (_args.downsampling > 0)
                     return CreateTrainingView(data, key, 1f, -1f, 0f, NumberDataViewType.UInt32, NumberDataViewType.Single, ch);
                 else
-                    return LambdaColumnMapper.Create(Host, "LabelColumnMapper in oOVA (1)", FilterNA(data.Data, lab.Name),
+                    return LambdaColumnMapper.Create(Host, "LabelColumnMapper in oOVA (1)", data.Data,
                         lab.Name, dstName, NumberDataViewType.UInt32, NumberDataViewType.Single,
                         (in uint src, ref float dst) => { dst = src == key ? 1 : default(float); });
             }
@@ -188,7 +240,7 @@ namespace Scikit.ML.Multiclass
                 if (_args.downsampling > 0)
                     return CreateTrainingView(data, key, 1f, -1f, 0f, NumberDataViewType.Single, NumberDataViewType.Single, ch);
                 else
-                    return LambdaColumnMapper.Create(Host, "LabelColumnMapper in oOVA (2)", FilterNA(data.Data, lab.Name),
+                    return LambdaColumnMapper.Create(Host, "LabelColumnMapper in oOVA (2)", data.Data,
                         lab.Name, dstName, NumberDataViewType.Single, NumberDataViewType.Single,
                         (in float src, ref float dst) => { dst = src == key ? 1 : default(float); });
             }
@@ -198,7 +250,7 @@ namespace Scikit.ML.Multiclass
                 if (_args.downsampling > 0)
                     return CreateTrainingView(data, key, 1f, -1f, 0f, NumberDataViewType.Double, NumberDataViewType.Single, ch);
                 else
-                    return LambdaColumnMapper.Create(Host, "LabelColumnMapper in oOVA (3)", FilterNA(data.Data, lab.Name),
+                    return LambdaColumnMapper.Create(Host, "LabelColumnMapper in oOVA (3)", data.Data,
                         lab.Name, dstName, NumberDataViewType.Double, NumberDataViewType.Single,
                         (in double src, ref float dst) => { dst = src == key ? 1 : default(float); });
             }
@@ -213,7 +265,7 @@ namespace Scikit.ML.Multiclass
             var dstName = data.Schema.Schema.GetTempColumnName();
             var lab = data.Schema.Label.Value;
             T1 key = cls;
-            var labelMapper = LambdaColumnMapper.Create<T1, T2>(Host, "LabelColumnMapper in oOVA (4)", FilterNA(data.Data, lab.Name),
+            var labelMapper = LambdaColumnMapper.Create<T1, T2>(Host, "LabelColumnMapper in oOVA (4)", data.Data,
                 lab.Name, dstName, c1, c2,
                 (in T1 src, ref T2 dst) =>
                 {
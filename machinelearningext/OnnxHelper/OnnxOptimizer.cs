@@ -0,0 +1,866 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Microsoft.ML.Runtime;
+using OnnxCSharpToProtoWrapper = Microsoft.ML.Model.OnnxConverter.OnnxCSharpToProtoWrapper;
+
+
+namespace Scikit.ML.OnnxHelper
+{
+    /// <summary>
+    /// Summary of the modifications made by <see cref="OnnxOptimizer"/>.
+    /// </summary>
+    public class OnnxOptimizationReport
+    {
+        /// <summary>
+        /// Number of nodes before the optimization.
+        /// </summary>
+        public int NodesBefore;
+
+        /// <summary>
+        /// Number of nodes after the optimization.
+        /// </summary>
+        public int NodesAfter;
+
+        /// <summary>
+        /// Number of removed initializers.
+        /// </summary>
+        public int RemovedInitializers;
+
+        /// <summary>
+        /// Number of iterations over all passes.
+        /// </summary>
+        public int Iterations;
+
+        /// <summary>
+        /// Number of removed nodes per pass.
+        /// </summary>
+        public Dictionary<string, int> RemovedByPass = new Dictionary<string, int>();
+
+        /// <summary>
+        /// Removed nodes, <i>pass: name (op_type)</i>.
+        /// </summary>
+        public List<string> RemovedNodes = new List<string>();
+
+        internal void Add(string pass, OnnxCSharpToProtoWrapper.NodeProto node)
+        {
+            int n;
+            RemovedByPass[pass] = RemovedByPass.TryGetValue(pass, out n) ? n + 1 : 1;
+            RemovedNodes.Add($"{pass}: {node.Name} ({node.OpType})");
+        }
+
+        public override string ToString()
+        {
+            var sb = new StringBuilder();
+            sb.Append($"nodes: {NodesBefore} -> {NodesAfter}, initializers removed: {RemovedInitializers}, iterations: {Iterations}");
+            foreach (var pair in RemovedByPass.OrderBy(c => c.Key))
+                sb.Append($"\n{pair.Key}: {pair.Value}");
+            return sb.ToString();
+        }
+    }
+
+    /// <summary>
+    /// Simplifies an ONNX graph produced by <see cref="Convert2Onnx"/>.
+    /// Every transform is converted independently and the graph usually contains
+    /// identity nodes, chains of casts, consecutive scaling nodes or nodes
+    /// which only depend on constants. The optimizer runs the following passes
+    /// until the graph does not change anymore:
+    /// <list type="bullet">
+    /// <item><i>ConstantFolding</i>: nodes whose inputs are all initializers are replaced by an initializer
+    /// (Identity, Cast to float or double, Add, Sub, Mul, Div on float or double tensors),</item>
+    /// <item><i>Identity</i>: Identity nodes are removed, consumers are directly connected to the input,</item>
+    /// <item><i>Cast</i>: casts to the input type are removed, a cast following a lossless cast
+    /// is directly connected to the original variable,</item>
+    /// <item><i>ScaleOffset</i>: two consecutive nodes Scaler, Mul, Add, Sub, Div with constant
+    /// coefficients along the last axis are merged into one node (results may differ up to float rounding),</item>
+    /// <item><i>DeadNodes</i>: nodes not contributing to any output are removed.</item>
+    /// </list>
+    /// Unused initializers and intermediate values are removed at the end.
+    /// Graph inputs and outputs are never renamed.
+    /// </summary>
+    public static class OnnxOptimizer
+    {
+        public const string PassConstantFolding = "ConstantFolding";
+        public const string PassIdentity = "Identity";
+        public const string PassCast = "Cast";
+        public const string PassScaleOffset = "ScaleOffset";
+        public const string PassDeadNodes = "DeadNodes";
+
+        /// <summary>
+        /// Optimizes a model inplace.
+        /// </summary>
+        /// <param name="model">model to optimize</param>
+        /// <param name="maxIterations">maximum number of iterations over all passes</param>
+        /// <returns>report</returns>
+        public static OnnxOptimizationReport Optimize(OnnxCSharpToProtoWrapper.ModelProto model, int maxIterations = 10)
+        {
+            Contracts.CheckValue(model, nameof(model));
+            Contracts.CheckValue(model.Graph, nameof(model.Graph));
+            return Optimize(model.Graph, maxIterations);
+        }
+
+        /// <summary>
+        /// Optimizes a graph inplace.
+        /// </summary>
+        /// <param name="graph">graph to optimize</param>
+        /// <param name="maxIterations">maximum number of iterations over all passes</param>
+        /// <returns>report</returns>
+        public static OnnxOptimizationReport Optimize(OnnxCSharpToProtoWrapper.GraphProto graph, int maxIterations = 10)
+        {
+            Contracts.CheckValue(graph, nameof(graph));
+            Contracts.CheckParam(maxIterations > 0, nameof(maxIterations), "must be > 0");
+
+            var report = new OnnxOptimizationReport() { NodesBefore = graph.Node.Count };
+            while (report.Iterations < maxIterations)
+            {
+                ++report.Iterations;
+                int changes = FoldConstants(graph, report) +
+                              RemoveIdentities(graph, report) +
+                              RemoveCasts(graph, report) +
+                              FuseScaleOffset(graph, report) +
+                              RemoveDeadNodes(graph, report);
+                if (changes == 0)
+                    break;
+            }
+            report.RemovedInitializers = RemoveUnusedValues(graph);
+            report.NodesAfter = graph.Node.Count;
+            return report;
+        }
+
+        #region graph index
+
+        /// <summary>
+        /// Producers, consumers and types of every variable in a graph.
+        /// The index is rebuilt after every modification, graphs produced
+        /// by the converter are small.
+        /// </summary>
+        class GraphIndex
+        {
+            public readonly Dictionary<string, OnnxCSharpToProtoWrapper.NodeProto> Producers;
+            public readonly Dictionary<string, int> Consumers;
+            public readonly Dictionary<string, OnnxCSharpToProtoWrapper.TensorProto> Initializers;
+            public readonly Dictionary<string, int> ElemTypes;
+            public readonly HashSet<string> Inputs;
+            public readonly HashSet<string> Outputs;
+            // Variables used inside subgraphs (If, Loop, Scan), they cannot be renamed.
+            public readonly HashSet<string> Pinned;
+
+            public GraphIndex(OnnxCSharpToProtoWrapper.GraphProto graph)
+            {
+                Producers = new Dictionary<string, OnnxCSharpToProtoWrapper.NodeProto>();
+                Consumers = new Dictionary<string, int>();
+                Initializers = new Dictionary<string, OnnxCSharpToProtoWrapper.TensorProto>();
+                ElemTypes = new Dictionary<string, int>();
+                Inputs = new HashSet<string>(graph.Input.Select(c => c.Name));
+                Outputs = new HashSet<string>(graph.Output.Select(c => c.Name));
+                Pinned = new HashSet<string>();
+
+                foreach (var init in graph.Initializer)
+                {
+                    Initializers[init.Name] = init;
+                    ElemTypes[init.Name] = init.DataType;
+                }
+                foreach (var val in graph.Input.Concat(graph.Output).Concat(graph.ValueInfo))
+                {
+                    if (val.Type != null && val.Type.TensorType != null && val.Type.TensorType.ElemType != 0)
+                        ElemTypes[val.Name] = val.Type.TensorType.ElemType;
+                }
+                foreach (var node in graph.Node)
+                {
+                    foreach (var name in node.Input)
+                    {
+                        int n;
+                        Consumers[name] = Consumers.TryGetValue(name, out n) ? n + 1 : 1;
+                    }
+                    foreach (var name in node.Output)
+                        Producers[name] = node;
+                    if (node.OpType == "Cast" && node.Output.Count == 1)
+                    {
+                        var to = GetAttribute(node, "to");
+                        if (to != null)
+                            ElemTypes[node.Output[0]] = (int)to.I;
+                    }
+                    foreach (var att in node.Attribute)
+                    {
+                        if (att.G != null)
+                            CollectNames(att.G, Pinned);
+                        foreach (var g in att.Graphs)
+                            CollectNames(g, Pinned);
+                    }
+                }
+            }
+
+            static void CollectNames(OnnxCSharpToProtoWrapper.GraphProto graph, HashSet<string> names)
+            {
+                foreach (var node in graph.Node)
+                {
+                    foreach (var name in node.Input)
+                        names.Add(name);
+                    foreach (var att in node.Attribute)
+                    {
+                        if (att.G != null)
+                            CollectNames(att.G, names);
+                        foreach (var g in att.Graphs)
+                            CollectNames(g, names);
+                    }
+                }
+            }
+
+            public int Uses(string name)
+            {
+                int n;
+                return Consumers.TryGetValue(name, out n) ? n : 0;
+            }
+
+            public int ElemType(string name)
+            {
+                int t;
+                return ElemTypes.TryGetValue(name, out t) ? t : 0;
+            }
+
+            /// <summary>
+            /// Tells if a variable can be renamed or removed.
+            /// </summary>
+            public bool IsInternal(string name)
+            {
+                return !Outputs.Contains(name) && !Inputs.Contains(name) && !Pinned.Contains(name);
+            }
+
+            /// <summary>
+            /// Tells if a variable is an initializer which cannot be overwritten by an input.
+            /// </summary>
+            public bool IsConstant(string name)
+            {
+                return Initializers.ContainsKey(name) && !Inputs.Contains(name);
+            }
+
+            public bool Exists(string name)
+            {
+                return Producers.ContainsKey(name) || Initializers.ContainsKey(name) ||
+                       Inputs.Contains(name) || Outputs.Contains(name) || Pinned.Contains(name);
+            }
+
+            public string UniqueName(string prefix)
+            {
+                if (!Exists(prefix))
+                    return prefix;
+                int k = 0;
+                while (Exists(prefix + k))
+                    ++k;
+                return prefix + k;
+            }
+        }
+
+        static OnnxCSharpToProtoWrapper.AttributeProto GetAttribute(OnnxCSharpToProtoWrapper.NodeProto node, string name)
+        {
+            foreach (var att in node.Attribute)
+                if (att.Name == name)
+                    return att;
+            return null;
+        }
+
+        static void ReplaceInputs(OnnxCSharpToProtoWrapper.GraphProto graph, string from, string to)
+        {
+            foreach (var node in graph.Node)
+            {
+                for (int i = 0; i < node.Input.Count; ++i)
+                    if (node.Input[i] == from)
+                        node.Input[i] = to;
+            }
+        }
+
+        /// <summary>
+        /// Removes a node with one input and one output computing the identity.
+        /// If the output is a graph output, the node producing the input is renamed.
+        /// </summary>
+        static bool Bypass(OnnxCSharpToProtoWrapper.GraphProto graph, GraphIndex index, OnnxCSharpToProtoWrapper.NodeProto node)
+        {
+            var x = node.Input[0];
+            var y = node.Output[0];
+            if (index.IsInternal(y))
+            {
+                graph.Node.Remove(node);
+                ReplaceInputs(graph, y, x);
+                return true;
+            }
+
+            OnnxCSharpToProtoWrapper.NodeProto producer;
+            if (index.Outputs.Contains(y) && !index.Pinned.Contains(y) && index.IsInternal(x) &&
+                index.Producers.TryGetValue(x, out producer))
+            {
+                graph.Node.Remove(node);
+                for (int i = 0; i < producer.Output.Count; ++i)
+                    if (producer.Output[i] == x)
+                        producer.Output[i] = y;
+                ReplaceInputs(graph, x, y);
+                return true;
+            }
+            return false;
+        }
+
+        #endregion
+
+        #region tensors
+
+        static long[] GetDims(OnnxCSharpToProtoWrapper.TensorProto tensor)
+        {
+            return tensor.Dims.ToArray();
+        }
+
+        static long Size(long[] dims)
+        {
+            long n = 1;
+            foreach (var d in dims)
+                n *= d;
+            return n;
+        }
+
+        /// <summary>
+        /// Returns the values of a numerical tensor as doubles, null if the type is not supported.
+        /// </summary>
+        static double[] GetValues(OnnxCSharpToProtoWrapper.TensorProto tensor)
+        {
+            long size = Size(GetDims(tensor));
+            var raw = tensor.RawData == null || tensor.RawData.Length == 0 ? null : tensor.RawData.ToByteArray();
+            double[] res;
+            switch ((OnnxCSharpToProtoWrapper.TensorProto.Types.DataType)tensor.DataType)
+            {
+                case OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Float:
+                    if (raw != null)
+                        res = Enumerable.Range(0, raw.Length / 4).Select(i => (double)BitConverter.ToSingle(raw, i * 4)).ToArray();
+                    else
+                        res = tensor.FloatData.Select(c => (double)c).ToArray();
+                    break;
+                case OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Double:
+                    if (raw != null)
+                        res = Enumerable.Range(0, raw.Length / 8).Select(i => BitConverter.ToDouble(raw, i * 8)).ToArray();
+                    else
+                        res = tensor.DoubleData.ToArray();
+                    break;
+                case OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Int32:
+                    if (raw != null)
+                        res = Enumerable.Range(0, raw.Length / 4).Select(i => (double)BitConverter.ToInt32(raw, i * 4)).ToArray();
+                    else
+                        res = tensor.Int32Data.Select(c => (double)c).ToArray();
+                    break;
+                case OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Int64:
+                    if (raw != null)
+                        res = Enumerable.Range(0, raw.Length / 8).Select(i => (double)BitConverter.ToInt64(raw, i * 8)).ToArray();
+                    else
+                        res = tensor.Int64Data.Select(c => (double)c).ToArray();
+                    break;
+                default:
+                    return null;
+            }
+            return res.Length == size ? res : null;
+        }
+
+        static OnnxCSharpToProtoWrapper.TensorProto MakeTensor(string name, int dataType, double[] values, long[] dims)
+        {
+            var tensor = new OnnxCSharpToProtoWrapper.TensorProto();
+            tensor.Name = name;
+            tensor.DataType = dataType;
+            switch ((OnnxCSharpToProtoWrapper.TensorProto.Types.DataType)dataType)
+            {
+                case OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Float:
+                    tensor.FloatData.AddRange(values.Select(c => (float)c));
+                    break;
+                case OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Double:
+                    tensor.DoubleData.AddRange(values);
+                    break;
+                default:
+                    throw Contracts.ExceptNotSupp($"Unable to create a tensor of type {dataType}.");
+            }
+            tensor.Dims.AddRange(dims);
+            return tensor;
+        }
+
+        /// <summary>
+        /// Applies a binary operator with numpy broadcasting restricted to
+        /// tensors of the same shape or a tensor with a single element.
+        /// </summary>
+        static double[] Broadcast(double[] a, long[] da, double[] b, long[] db, Func<double, double, double> op, out long[] dims)
+        {
+            dims = null;
+            double[] res;
+            if (a.Length == b.Length && (da.SequenceEqual(db) || a.Length == 1))
+            {
+                dims = da.Length >= db.Length ? da : db;
+                res = new double[a.Length];
+                for (int i = 0; i < res.Length; ++i)
+                    res[i] = op(a[i], b[i]);
+            }
+            else if (b.Length == 1 && db.Length <= da.Length)
+            {
+                dims = da;
+                res = a.Select(c => op(c, b[0])).ToArray();
+            }
+            else if (a.Length == 1 && da.Length <= db.Length)
+            {
+                dims = db;
+                res = b.Select(c => op(a[0], c)).ToArray();
+            }
+            else
+                return null;
+            return res;
+        }
+
+        #endregion
+
+        #region passes
+
+        static readonly HashSet<string> _foldableBinary = new HashSet<string>() { "Add", "Sub", "Mul", "Div" };
+
+        /// <summary>
+        /// Replaces nodes whose inputs are constant by an initializer.
+        /// </summary>
+        static int FoldConstants(OnnxCSharpToProtoWrapper.GraphProto graph, OnnxOptimizationReport report)
+        {
+            int count = 0;
+            bool changed = true;
+            while (changed)
+            {
+                changed = false;
+                var index = new GraphIndex(graph);
+                foreach (var node in graph.Node)
+                {
+                    if (node.Input.Count == 0 || node.Output.Count != 1 || !index.IsInternal(node.Output[0]))
+                        continue;
+                    if (node.Input.Any(c => !index.IsConstant(c)))
+                        continue;
+                    var folded = Fold(node, index);
+                    if (folded == null)
+                        continue;
+                    graph.Node.Remove(node);
+                    graph.Initializer.Add(folded);
+                    report.Add(PassConstantFolding, node);
+                    ++count;
+                    changed = true;
+                    break;
+                }
+            }
+            return count;
+        }
+
+        static OnnxCSharpToProtoWrapper.TensorProto Fold(OnnxCSharpToProtoWrapper.NodeProto node, GraphIndex index)
+        {
+            var name = node.Output[0];
+            var inputs = node.Input.Select(c => index.Initializers[c]).ToArray();
+            int floatType = (int)OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Float;
+            int doubleType = (int)OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Double;
+
+            if (node.OpType == "Identity" && inputs.Length == 1)
+            {
+                var res = inputs[0].Clone();
+                res.Name = name;
+                return res;
+            }
+            if (node.OpType == "Cast" && inputs.Length == 1)
+            {
+                var to = GetAttribute(node, "to");
+                if (to == null || (to.I != floatType && to.I != doubleType))
+                    return null;
+                var values = GetValues(inputs[0]);
+                return values == null ? null : MakeTensor(name, (int)to.I, values, GetDims(inputs[0]));
+            }
+            if (_foldableBinary.Contains(node.OpType) && inputs.Length == 2)
+            {
+                if (inputs[0].DataType != inputs[1].DataType ||
+                    (inputs[0].DataType != floatType && inputs[0].DataType != doubleType))
+                    return null;
+                var a = GetValues(inputs[0]);
+                var b = GetValues(inputs[1]);
+                if (a == null || b == null)
+                    return null;
+                Func<double, double, double> op;
+                switch (node.OpType)
+                {
+                    case "Add": op = (x, y) => x + y; break;
+                    case "Sub": op = (x, y) => x - y; break;
+                    case "Mul": op = (x, y) => x * y; break;
+                    case "Div": op = (x, y) => x / y; break;
+                    default: return null;
+                }
+                if (inputs[0].DataType == floatType)
+                {
+                    // Results are rounded to float after every operation.
+                    var inner = op;
+                    op = (x, y) => (float)inner(x, y);
+                }
+                long[] dims;
+                var res = Broadcast(a, GetDims(inputs[0]), b, GetDims(inputs[1]), op, out dims);
+                return res == null ? null : MakeTensor(name, inputs[0].DataType, res, dims);
+            }
+            return null;
+        }
+
+        /// <summary>
+        /// Removes Identity nodes.
+        /// </summary>
+        static int RemoveIdentities(OnnxCSharpToProtoWrapper.GraphProto graph, OnnxOptimizationReport report)
+        {
+            int count = 0;
+            bool changed = true;
+            while (changed)
+            {
+                changed = false;
+                var index = new GraphIndex(graph);
+                foreach (var node in graph.Node)
+                {
+                    if (node.OpType != "Identity" || node.Input.Count != 1 || node.Output.Count != 1)
+                        continue;
+                    if (Bypass(graph, index, node))
+                    {
+                        report.Add(PassIdentity, node);
+                        ++count;
+                        changed = true;
+                        break;
+                    }
+                }
+            }
+            return count;
+        }
+
+        // Conversions (from, to) which do not lose any information.
+        static readonly HashSet<Tuple<OnnxCSharpToProtoWrapper.TensorProto.Types.DataType, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType>> _losslessCasts = CreateLosslessCasts();
+
+        static HashSet<Tuple<OnnxCSharpToProtoWrapper.TensorProto.Types.DataType, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType>> CreateLosslessCasts()
+        {
+            var res = new HashSet<Tuple<OnnxCSharpToProtoWrapper.TensorProto.Types.DataType, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType>>();
+            var order = new[]
+            {
+                new[] { OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Int8, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Int16,
+                        OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Int32, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Int64 },
+                new[] { OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Uint8, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Uint16,
+                        OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Uint32, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Uint64 },
+                new[] { OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Uint8, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Int16,
+                        OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Float, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Double },
+                new[] { OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Int8, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Int16,
+                        OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Int32, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Double },
+                new[] { OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Uint16, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Int32,
+                        OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Int64 },
+                new[] { OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Uint32, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Int64 },
+                new[] { OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Uint32, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Double },
+                new[] { OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Float16, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Float,
+                        OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Double },
+            };
+            foreach (var chain in order)
+            {
+                for (int i = 0; i < chain.Length; ++i)
+                    for (int j = i + 1; j < chain.Length; ++j)
+                        res.Add(new Tuple<OnnxCSharpToProtoWrapper.TensorProto.Types.DataType, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType>(chain[i], chain[j]));
+            }
+            return res;
+        }
+
+        static bool IsLossless(int from, int to)
+        {
+            return _losslessCasts.Contains(new Tuple<OnnxCSharpToProtoWrapper.TensorProto.Types.DataType, OnnxCSharpToProtoWrapper.TensorProto.Types.DataType>(
+                (OnnxCSharpToProtoWrapper.TensorProto.Types.DataType)from, (OnnxCSharpToProtoWrapper.TensorProto.Types.DataType)to));
+        }
+
+        /// <summary>
+        /// Removes casts to the same type and shortcuts lossless casts followed by another cast.
+        /// </summary>
+        static int RemoveCasts(OnnxCSharpToProtoWrapper.GraphProto graph, OnnxOptimizationReport report)
+        {
+            int count = 0;
+            bool changed = true;
+            while (changed)
+            {
+                changed = false;
+                var index = new GraphIndex(graph);
+                foreach (var node in graph.Node)
+                {
+                    if (node.OpType != "Cast" || node.Input.Count != 1 || node.Output.Count != 1)
+                        continue;
+                    var to = GetAttribute(node, "to");
+                    if (to == null)
+                        continue;
+                    var x = node.Input[0];
+                    int xType = index.ElemType(x);
+
+                    if (xType != 0 && xType == to.I)
+                    {
+                        // Cast to the same type.
+                        if (Bypass(graph, index, node))
+                        {
+                            report.Add(PassCast, node);
+                            ++count;
+                            changed = true;
+                            break;
+                        }
+                        continue;
+                    }
+
+                    OnnxCSharpToProtoWrapper.NodeProto previous;
+                    if (!index.Producers.TryGetValue(x, out previous) || previous.OpType != "Cast" || previous.Input.Count != 1)
+                        continue;
+                    int origin = index.ElemType(previous.Input[0]);
+                    if (origin == 0 || !IsLossless(origin, xType))
+                        continue;
+
+                    // Cast(Cast(z, lossless), to) is Cast(z, to).
+                    node.Input[0] = previous.Input[0];
+                    if (index.Uses(x) == 1 && index.IsInternal(x))
+                    {
+                        graph.Node.Remove(previous);
+                        report.Add(PassCast, previous);
+                        ++count;
+                    }
+                    changed = true;
+                    break;
+                }
+            }
+            return count;
+        }
+
+        /// <summary>
+        /// Coefficients of <i>y = (x - offset) * scale</i>, every coefficient
+        /// has one value or one value per element of the last axis.
+        /// </summary>
+        class Affine
+        {
+            public string input;
+            public double[] offset;
+            public double[] scale;
+            public bool isScaler;
+            public long[] dims;
+        }
+
+        static Affine GetAffine(OnnxCSharpToProtoWrapper.NodeProto node, GraphIndex index)
+        {
+            if (node.Output.Count != 1)
+                return null;
+            if (node.OpType == "Scaler" && node.Input.Count == 1)
+            {
+                var offset = GetAttribute(node, "offset");
+                var scale = GetAttribute(node, "scale");
+                return new Affine()
+                {
+                    input = node.Input[0],
+                    offset = offset == null || offset.Floats.Count == 0 ? new double[] { 0 } : offset.Floats.Select(c => (double)c).ToArray(),
+                    scale = scale == null || scale.Floats.Count == 0 ? new double[] { 1 } : scale.Floats.Select(c => (double)c).ToArray(),
+                    isScaler = true,
+                    dims = null
+                };
+            }
+            if (!_foldableBinary.Contains(node.OpType) || node.Input.Count != 2)
+                return null;
+
+            int pos;
+            if (index.IsConstant(node.Input[1]) && !index.IsConstant(node.Input[0]))
+                pos = 1;
+            else if ((node.OpType == "Add" || node.OpType == "Mul") &&
+                     index.IsConstant(node.Input[0]) && !index.IsConstant(node.Input[1]))
+                pos = 0;
+            else
+                return null;
+
+            var cst = index.Initializers[node.Input[pos]];
+            if (cst.DataType != (int)OnnxCSharpToProtoWrapper.TensorProto.Types.DataType.Float)
+                return null;
+            var dims = GetDims(cst);
+            // Only coefficients along the last axis can be expressed with a Scaler.
+            for (int i = 0; i < dims.Length - 1; ++i)
+                if (dims[i] != 1)
+                    return null;
+            var values = GetValues(cst);
+            if (values == null || values.Length == 0)
+                return null;
+
+            var res = new Affine() { input = node.Input[1 - pos], dims = dims, isScaler = false };
+            var zero = new double[] { 0 };
+            var one = new double[] { 1 };
+            switch (node.OpType)
+            {
+                case "Add":
+                    res.offset = values.Select(c => -c).ToArray();
+                    res.scale = one;
+                    break;
+                case "Sub":
+                    res.offset = values;
+                    res.scale = one;
+                    break;
+                case "Mul":
+                    res.offset = zero;
+                    res.scale = values;
+                    break;
+                case "Div":
+                    if (values.Any(c => c == 0))
+                        return null;
+                    res.offset = zero;
+                    res.scale = values.Select(c => 1.0 / c).ToArray();
+                    break;
+                default:
+                    return null;
+            }
+            return res;
+        }
+
+        static double Get(double[] values, int i)
+        {
+            return values.Length == 1 ? values[0] : values[i];
+        }
+
+        /// <summary>
+        /// Composes two affine functions, returns null if the coefficients cannot be broadcasted.
+        /// </summary>
+        static Affine Compose(Affine first, Affine second)
+        {
+            var lengths = new[] { first.offset.Length, first.scale.Length, second.offset.Length, second.scale.Length };
+            int n = lengths.Max();
+            if (lengths.Any(c => c != 1 && c != n))
+                return null;
+            var offset = new double[n];
+            var scale = new double[n];
+            for (int i = 0; i < n; ++i)
+            {
+                // ((x - o1) * s1 - o2) * s2 = (x - (o1 + o2 / s1)) * (s1 * s2)
+                double s1 = Get(first.scale, i);
+                if (s1 == 0)
+                    return null;
+                offset[i] = Get(first.offset, i) + Get(second.offset, i) / s1;
+                scale[i] = s1 * Get(second.scale, i);
+            }
+
+            long[] dims;
+            if (first.dims == null)
+                dims = second.dims;
+            else if (second.dims == null)
+                dims = first.dims;
+            else
+                dims = Size(first.dims) > Size(second.dims) ||
+                       (Size(first.dims) == Size(second.dims) && first.dims.Length >= second.dims.Length)
+                            ? first.dims : second.dims;
+            if (dims == null || Size(dims) != n)
+                dims = new long[] { n };
+
+            return new Affine()
+            {
+                input = first.input,
+                offset = offset,
+                scale = scale,
+                isScaler = first.isScaler || second.isScaler,
+                dims = dims
+            };
+        }
+
+        /// <summary>
+        /// Merges consecutive nodes computing a scaling or an offset.
+        /// The second node is replaced by a Mul, an Add or a Scaler if one of them was a Scaler
+        /// (Scaler always returns floats).
+        /// </summary>
+        static int FuseScaleOffset(OnnxCSharpToProtoWrapper.GraphProto graph, OnnxOptimizationReport report)
+        {
+            int count = 0;
+            bool changed = true;
+            while (changed)
+            {
+                changed = false;
+                var index = new GraphIndex(graph);
+                foreach (var node in graph.Node)
+                {
+                    var second = GetAffine(node, index);
+                    if (second == null)
+                        continue;
+                    OnnxCSharpToProtoWrapper.NodeProto previous;
+                    if (!index.IsInternal(second.input) || index.Uses(second.input) != 1 ||
+                        !index.Producers.TryGetValue(second.input, out previous))
+                        continue;
+                    var first = GetAffine(previous, index);
+                    if (first == null)
+                        continue;
+                    var fused = Compose(first, second);
+                    if (fused == null)
+                        continue;
+
+                    node.Input.Clear();
+                    node.Attribute.Clear();
+                    node.Input.Add(fused.input);
+                    if (!fused.isScaler && fused.offset.All(c => c == 0))
+                    {
+                        node.OpType = "Mul";
+                        node.Domain = "";
+                        var name = index.UniqueName(node.Output[0] + "_scale");
+                        graph.Initializer.Add(OnnxUtils.MakeFloats(name, fused.scale.Select(c => (float)c), fused.dims));
+                        node.Input.Add(name);
+                    }
+                    else if (!fused.isScaler && fused.scale.All(c => c == 1))
+                    {
+                        node.OpType = "Add";
+                        node.Domain = "";
+                        var name = index.UniqueName(node.Output[0] + "_offset");
+                        graph.Initializer.Add(OnnxUtils.MakeFloats(name, fused.offset.Select(c => (float)(-c)), fused.dims));
+                        node.Input.Add(name);
+                    }
+                    else
+                    {
+                        node.OpType = "Scaler";
+                        node.Domain = "ai.onnx.ml";
+                        OnnxUtils.NodeAddAttributes(node, "offset", fused.offset.Select(c => (float)c));
+                        OnnxUtils.NodeAddAttributes(node, "scale", fused.scale.Select(c => (float)c));
+                    }
+
+                    graph.Node.Remove(previous);
+                    report.Add(PassScaleOffset, previous);
+                    ++count;
+                    changed = true;
+                    break;
+                }
+            }
+            return count;
+        }
+
+        /// <summary>
+        /// Removes nodes which do not contribute to any output.
+        /// Nodes are assumed to be sorted in topological order.
+        /// </summary>
+        static int RemoveDeadNodes(OnnxCSharpToProtoWrapper.GraphProto graph, OnnxOptimizationReport report)
+        {
+            var index = new GraphIndex(graph);
+            var needed = new HashSet<string>(index.Outputs);
+            needed.UnionWith(index.Pinned);
+            var dead = new List<OnnxCSharpToProtoWrapper.NodeProto>();
+            for (int i = graph.Node.Count - 1; i >= 0; --i)
+            {
+                var node = graph.Node[i];
+                if (node.Output.Any(c => needed.Contains(c)))
+                {
+                    foreach (var name in node.Input)
+                        needed.Add(name);
+                }
+                else
+                    dead.Add(node);
+            }
+            foreach (var node in dead)
+            {
+                graph.Node.Remove(node);
+                report.Add(PassDeadNodes, node);
+            }
+            return dead.Count;
+        }
+
+        /// <summary>
+        /// Removes unused initializers and intermediate values which are not produced anymore.
+        /// Returns the number of removed initializers.
+        /// </summary>
+        static int RemoveUnusedValues(OnnxCSharpToProtoWrapper.GraphProto graph)
+        {
+            var index = new GraphIndex(graph);
+            var unused = graph.Initializer.Where(c => index.Uses(c.Name) == 0 && !index.Outputs.Contains(c.Name) &&
+                                                      !index.Pinned.Contains(c.Name)).ToArray();
+            foreach (var init in unused)
+                graph.Initializer.Remove(init);
+            var values = graph.ValueInfo.Where(c => !index.Producers.ContainsKey(c.Name) && !index.Initializers.ContainsKey(c.Name)).ToArray();
+            foreach (var val in values)
+                graph.ValueInfo.Remove(val);
+            return unused.Length;
+        }
+
+        #endregion
+    }
+}
@@ -433,15 +433,36 @@ namespace Scikit.ML.OnnxHelper
         /// </summary>
         public override OnnxVersion GetOnnxVersion() => _onnxVersion;
 
-        public void Save(string filename)
+        /// <summary>
+        /// Makes the ONNX model based on the context and optionally simplifies it
+        /// with <see cref="OnnxOptimizer"/>, the report is stored in <see cref="OptimizationReport"/>.
+        /// </summary>
+        public OnnxCSharpToProtoWrapper.ModelProto MakeModel(bool optimize)
+        {
+            var model = MakeModel();
+            if (optimize)
+            {
+                // The optimizer modifies the nodes, they are shared with the context.
+                model = model.Clone();
+                OptimizationReport = OnnxOptimizer.Optimize(model);
+            }
+            return model;
+        }
+
+        /// <summary>
+        /// Report of the last optimization, null if the model was never optimized.
+        /// </summary>
+        public OnnxOptimizationReport OptimizationReport { get; private set; }
+
+        public void Save(string filename, bool optimize = false)
         {
             using (var f = File.OpenWrite(filename))
-                Save(f);
+                Save(f, optimize);
         }
 
-        public void Save(Stream stream)
+        public void Save(Stream stream, bool optimize = false)
         {
-            var model = MakeModel();
+            var model = MakeModel(optimize);
             Google.Protobuf.MessageExtensions.WriteTo(model, stream);
         }
     }
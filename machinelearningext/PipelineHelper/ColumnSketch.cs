@@ -0,0 +1,154 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Globalization;
+using System.Linq;
+using Microsoft.ML.Data;
+using Microsoft.ML.Runtime;
+
+
+namespace Scikit.ML.PipelineHelper
+{
+    /// <summary>
+    /// Statistics of a column computed in one pass with bounded memory:
+    /// moments (<see cref="MomentsSketch"/>), quantiles (<see cref="KllQuantileSketch"/>)
+    /// and distinct values (<see cref="HyperLogLogSketch"/>).
+    /// Every thread can fill its own sketch, they are merged at the end.
+    /// Vectors are described as if all their values were in the same column.
+    /// Text columns only get a count and a distinct count.
+    /// </summary>
+    public class ColumnSketch
+    {
+        readonly string _name;
+        readonly bool _isText;
+        readonly MomentsSketch _moments;
+        readonly KllQuantileSketch _quantiles;
+        readonly HyperLogLogSketch _distinct;
+        long _count;
+        long _missing;
+
+        public string Name => _name;
+        public bool IsText => _isText;
+
+        /// <summary>
+        /// Number of values (missing included).
+        /// </summary>
+        public long Count => _count;
+
+        /// <summary>
+        /// Number of missing values (NaN).
+        /// </summary>
+        public long Missing => _missing;
+        public MomentsSketch Moments => _moments;
+        public KllQuantileSketch Quantiles => _quantiles;
+        public HyperLogLogSketch Distinct => _distinct;
+
+        public ColumnSketch(string name, bool isText, int k = 200, int precision = 12, int seed = 0)
+        {
+            _name = name;
+            _isText = isText;
+            _distinct = new HyperLogLogSketch(precision);
+            if (!isText)
+            {
+                _moments = new MomentsSketch();
+                _quantiles = new KllQuantileSketch(k, seed);
+            }
+        }
+
+        public void Update(double value)
+        {
+            ++_count;
+            if (double.IsNaN(value))
+            {
+                ++_missing;
+                return;
+            }
+            _moments.Update(value);
+            _quantiles.Update(value);
+            _distinct.Update(value);
+        }
+
+        public void Update(ReadOnlyMemory<char> value)
+        {
+            ++_count;
+            _distinct.Update(value.Span);
+        }
+
+        public void Update(in VBuffer<float> value)
+        {
+            if (value.IsDense)
+            {
+                for (int i = 0; i < value.Length; ++i)
+                    Update(value.Values[i]);
+            }
+            else
+            {
+                for (int i = 0; i < value.Count; ++i)
+                    Update(value.Values[i]);
+                long zeros = value.Length - value.Count;
+                if (zeros > 0)
+                {
+                    _count += zeros;
+                    _moments.Update(0, zeros);
+                    _quantiles.Update(0, zeros);
+                    _distinct.Update(0);
+                }
+            }
+        }
+
+        public void Merge(ColumnSketch other)
+        {
+            Contracts.Check(other._isText == _isText, "Cannot merge sketches of different kinds.");
+            _count += other._count;
+            _missing += other._missing;
+            _distinct.Merge(other._distinct);
+            if (!_isText)
+            {
+                _moments.Merge(other._moments);
+                _quantiles.Merge(other._quantiles);
+            }
+        }
+
+        /// <summary>
+        /// Returns the statistics as a list of (name, value).
+        /// </summary>
+        public List<KeyValuePair<string, double>> GetStatistics(double[] quantiles)
+        {
+            var res = new List<KeyValuePair<string, double>>();
+            res.Add(new KeyValuePair<string, double>("count", _count));
+            res.Add(new KeyValuePair<string, double>("missing", _missing));
+            res.Add(new KeyValuePair<string, double>("distinct", Math.Round(_distinct.Estimate())));
+            if (!_isText)
+            {
+                res.Add(new KeyValuePair<string, double>("mean", _moments.Mean));
+                res.Add(new KeyValuePair<string, double>("std", _moments.Std));
+                res.Add(new KeyValuePair<string, double>("min", _moments.Min));
+                res.Add(new KeyValuePair<string, double>("max", _moments.Max));
+                res.Add(new KeyValuePair<string, double>("skewness", _moments.Skewness));
+                res.Add(new KeyValuePair<string, double>("kurtosis", _moments.Kurtosis));
+                if (quantiles != null)
+                {
+                    var values = _quantiles.Quantiles(quantiles);
+                    for (int i = 0; i < quantiles.Length; ++i)
+                        res.Add(new KeyValuePair<string, double>(QuantileName(quantiles[i]), values[i]));
+                }
+            }
+            return res;
+        }
+
+        public static string QuantileName(double q)
+        {
+            return string.Format(CultureInfo.InvariantCulture, "q{0}", q);
+        }
+
+        public string ToString(bool jsonFormat, double[] quantiles)
+        {
+            var stats = GetStatistics(quantiles);
+            if (jsonFormat)
+                return string.Format("{{{0}}}", string.Join(", ", stats.Select(c => string.Format(CultureInfo.InvariantCulture,
+                                        "\"{0}\": {1}", c.Key, double.IsNaN(c.Value) ? "null" : c.Value.ToString("R", CultureInfo.InvariantCulture)))));
+            return string.Join(", ", stats.Select(c => string.Format(CultureInfo.InvariantCulture, "{0}: {1}", c.Key, c.Value)));
+        }
+    }
+}
@@ -23,7 +23,10 @@ namespace Scikit.ML.PipelineHelper
             sum = 3,
             nb = 4,
             sum2 = 5,
-            hist = 6
+            hist = 6,
+            // Only filled by SlotStatistics, m2 is the sum of squared deviations from the mean.
+            mean = 7,
+            m2 = 8
         }
 
         public StatKind kind;
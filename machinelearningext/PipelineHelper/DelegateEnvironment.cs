@@ -382,6 +382,29 @@ namespace Scikit.ML.PipelineHelper
 
         public int VerboseLevel => _verbose;
 
+        private volatile PipelineProfiler _profiler;
+
+        /// <summary>
+        /// Returns the profiler if profiling is enabled, null otherwise.
+        /// </summary>
+        public PipelineProfiler Profiler => Root._profiler;
+
+        /// <summary>
+        /// Enables profiling and returns the profiler. Only pipelines instrumented
+        /// after this call are measured (see <see cref="PipelineProfiler.Instrument"/>).
+        /// </summary>
+        public PipelineProfiler EnableProfiling()
+        {
+            if (Root._profiler == null)
+                Root._profiler = new PipelineProfiler();
+            return Root._profiler;
+        }
+
+        public void DisableProfiling()
+        {
+            Root._profiler = null;
+        }
+
         public DelegateEnvironment(HostEnvironmentBase<DelegateEnvironment> source,
             int? seed = null, int verbose = 0,
             MessageSensitivity sensitivity = MessageSensitivity.All,
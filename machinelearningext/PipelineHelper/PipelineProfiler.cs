@@ -0,0 +1,410 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Globalization;
+using System.Linq;
+using System.Reflection;
+using System.Text;
+using System.Threading;
+using Microsoft.ML;
+using Microsoft.ML.Data;
+using Microsoft.ML.Runtime;
+
+
+namespace Scikit.ML.PipelineHelper
+{
+    using Stopwatch = System.Diagnostics.Stopwatch;
+
+    /// <summary>
+    /// Counters collected for one step of a pipeline.
+    /// Times are inclusive: they include the time spent in the previous steps.
+    /// </summary>
+    public class StepProfile
+    {
+        public readonly int Index;
+        public readonly string Name;
+
+        /// <summary>
+        /// Previous step in the pipeline, null for the first one.
+        /// </summary>
+        public readonly StepProfile Upstream;
+
+        private long _rows;
+        private long _cursors;
+        private long _cursorTicks;
+        private long _moveNextTicks;
+        private long _getterCalls;
+        private long _getterTicks;
+        private long _allocated;
+
+        public StepProfile(int index, string name, StepProfile upstream)
+        {
+            Index = index;
+            Name = name;
+            Upstream = upstream;
+        }
+
+        public long Rows => Interlocked.Read(ref _rows);
+        public long CursorCreations => Interlocked.Read(ref _cursors);
+        public long GetterCalls => Interlocked.Read(ref _getterCalls);
+
+        /// <summary>
+        /// Allocated bytes, 0 if the runtime does not expose allocations per thread.
+        /// </summary>
+        public long AllocatedBytes => Interlocked.Read(ref _allocated);
+
+        public double CursorTime => (double)Interlocked.Read(ref _cursorTicks) / Stopwatch.Frequency;
+        public double MoveNextTime => (double)Interlocked.Read(ref _moveNextTicks) / Stopwatch.Frequency;
+        public double GetterTime => (double)Interlocked.Read(ref _getterTicks) / Stopwatch.Frequency;
+        public double TotalTime => CursorTime + MoveNextTime + GetterTime;
+
+        internal void AddCursor(long ticks, long allocated)
+        {
+            Interlocked.Increment(ref _cursors);
+            Interlocked.Add(ref _cursorTicks, ticks);
+            Interlocked.Add(ref _allocated, allocated);
+        }
+
+        internal void AddMoveNext(bool row, long ticks, long allocated)
+        {
+            if (row)
+                Interlocked.Increment(ref _rows);
+            Interlocked.Add(ref _moveNextTicks, ticks);
+            Interlocked.Add(ref _allocated, allocated);
+        }
+
+        internal void AddGetter(long ticks, long allocated)
+        {
+            Interlocked.Increment(ref _getterCalls);
+            Interlocked.Add(ref _getterTicks, ticks);
+            Interlocked.Add(ref _allocated, allocated);
+        }
+
+        internal void Reset()
+        {
+            Interlocked.Exchange(ref _rows, 0);
+            Interlocked.Exchange(ref _cursors, 0);
+            Interlocked.Exchange(ref _cursorTicks, 0);
+            Interlocked.Exchange(ref _moveNextTicks, 0);
+            Interlocked.Exchange(ref _getterCalls, 0);
+            Interlocked.Exchange(ref _getterTicks, 0);
+            Interlocked.Exchange(ref _allocated, 0);
+        }
+    }
+
+    /// <summary>
+    /// One row of the profiling report. Self values are the inclusive values
+    /// minus the inclusive values of the previous step.
+    /// </summary>
+    public class StepProfileReport
+    {
+        public int Index;
+        public string Name;
+        public long Rows;
+        public long CursorCreations;
+        public long GetterCalls;
+        public double CursorTime;
+        public double MoveNextTime;
+        public double GetterTime;
+        public double TotalTime;
+        public double SelfTime;
+        public long AllocatedBytes;
+        public long SelfAllocatedBytes;
+    }
+
+    /// <summary>
+    /// Collects per step counters on a pipeline of transforms.
+    /// The profiler is opt-in: it only measures views returned by <see cref="Instrument"/>,
+    /// every step is wrapped into a <see cref="ProfiledDataTransform"/> which times
+    /// cursor creations, calls to MoveNext and calls to getters.
+    /// Instrumenting the same pipeline twice accumulates the counters into the same steps.
+    /// </summary>
+    public class PipelineProfiler
+    {
+        private readonly object _lock;
+        private readonly List<StepProfile> _steps;
+        private readonly Dictionary<string, StepProfile> _map;
+
+        public PipelineProfiler()
+        {
+            _lock = new object();
+            _steps = new List<StepProfile>();
+            _map = new Dictionary<string, StepProfile>();
+        }
+
+        /// <summary>
+        /// Returns the profiler attached to an environment, null if profiling is disabled.
+        /// </summary>
+        public static PipelineProfiler GetProfiler(IHostEnvironment env)
+        {
+            return (env as DelegateEnvironment)?.Profiler;
+        }
+
+        /// <summary>
+        /// Returns a copy of the current steps.
+        /// </summary>
+        public StepProfile[] Steps
+        {
+            get
+            {
+                lock (_lock)
+                    return _steps.ToArray();
+            }
+        }
+
+        /// <summary>
+        /// Sets all counters to zero.
+        /// </summary>
+        public void Reset()
+        {
+            lock (_lock)
+                foreach (var step in _steps)
+                    step.Reset();
+        }
+
+        /// <summary>
+        /// Returns the step for a given position, creates it if it does not exist.
+        /// </summary>
+        public StepProfile GetStep(int index, string name, StepProfile upstream)
+        {
+            var key = string.Format("{0}:{1}", index, name);
+            lock (_lock)
+            {
+                StepProfile step;
+                if (!_map.TryGetValue(key, out step))
+                {
+                    step = new StepProfile(index, name, upstream);
+                    _map[key] = step;
+                    _steps.Add(step);
+                }
+                return step;
+            }
+        }
+
+        /// <summary>
+        /// Rebuilds the pipeline ending with <paramref name="view"/> with every step wrapped
+        /// into a profiled view. The walk stops at <paramref name="firstView"/> or at the first view
+        /// which is not a transform if <paramref name="firstView"/> is null. Every transform
+        /// is applied again on the profiled view of its source
+        /// (see <see cref="ApplyTransformUtils.ApplyTransformToData"/>).
+        /// </summary>
+        public IDataTransform Instrument(IHostEnvironment env, IDataView view, IDataView firstView = null)
+        {
+            Contracts.CheckValue(env, nameof(env));
+            env.CheckValue(view, nameof(view));
+
+            var transforms = new List<IDataTransform>();
+            var current = view;
+            while (current != firstView)
+            {
+                var tr = current as IDataTransform;
+                if (tr == null)
+                {
+                    if (firstView != null)
+                        throw env.Except("Unable to find the first view of the pipeline.");
+                    break;
+                }
+                // A view already instrumented is not instrumented twice.
+                if (!(tr is ProfiledDataTransform))
+                    transforms.Add(tr);
+                current = tr.Source;
+            }
+            transforms.Reverse();
+
+            var source = current is ProfiledDataTransform ? ((ProfiledDataTransform)current).Source : current;
+            var step = GetStep(0, source.GetType().Name, null);
+            var res = new ProfiledDataTransform(env, source, step);
+            for (int i = 0; i < transforms.Count; ++i)
+            {
+                step = GetStep(i + 1, transforms[i].GetType().Name, step);
+                var applied = ApplyTransformUtils.ApplyTransformToData(env, transforms[i], res);
+                res = new ProfiledDataTransform(env, applied, step);
+            }
+            return res;
+        }
+
+        /// <summary>
+        /// Returns the counters for every step, self values are computed
+        /// by substracting the values of the previous step.
+        /// </summary>
+        public StepProfileReport[] Report()
+        {
+            return Steps.OrderBy(c => c.Index).Select(step =>
+            {
+                var up = step.Upstream;
+                var total = step.TotalTime;
+                return new StepProfileReport()
+                {
+                    Index = step.Index,
+                    Name = step.Name,
+                    Rows = step.Rows,
+                    CursorCreations = step.CursorCreations,
+                    GetterCalls = step.GetterCalls,
+                    CursorTime = step.CursorTime,
+                    MoveNextTime = step.MoveNextTime,
+                    GetterTime = step.GetterTime,
+                    TotalTime = total,
+                    SelfTime = up == null ? total : Math.Max(0, total - up.TotalTime),
+                    AllocatedBytes = step.AllocatedBytes,
+                    SelfAllocatedBytes = up == null ? step.AllocatedBytes : Math.Max(0, step.AllocatedBytes - up.AllocatedBytes)
+                };
+            }).ToArray();
+        }
+
+        /// <summary>
+        /// Returns the report as a JSON array (one object per step).
+        /// </summary>
+        public string ToJson()
+        {
+            var sb = new StringBuilder();
+            sb.Append("[");
+            bool first = true;
+            foreach (var r in Report())
+            {
+                if (!first)
+                    sb.Append(",");
+                first = false;
+                sb.Append("{");
+                sb.Append(string.Format(CultureInfo.InvariantCulture,
+                    "\"index\":{0},\"name\":\"{1}\",\"rows\":{2},\"cursor_creations\":{3},\"getter_calls\":{4}," +
+                    "\"cursor_time\":{5:R},\"movenext_time\":{6:R},\"getter_time\":{7:R},\"total_time\":{8:R}," +
+                    "\"self_time\":{9:R},\"allocated_bytes\":{10},\"self_allocated_bytes\":{11}",
+                    r.Index, EscapeJson(r.Name), r.Rows, r.CursorCreations, r.GetterCalls,
+                    r.CursorTime, r.MoveNextTime, r.GetterTime, r.TotalTime, r.SelfTime,
+                    r.AllocatedBytes, r.SelfAllocatedBytes));
+                sb.Append("}");
+            }
+            sb.Append("]");
+            return sb.ToString();
+        }
+
+        static string EscapeJson(string text)
+        {
+            return text.Replace("\\", "\\\\").Replace("\"", "\\\"");
+        }
+
+        #region allocations
+
+        // GC.GetAllocatedBytesForCurrentThread is not part of netstandard2.0,
+        // it is retrieved at runtime when available.
+        private static readonly Func<long> _allocatedBytes = GetAllocatedBytesFunction();
+
+        static Func<long> GetAllocatedBytesFunction()
+        {
+            var meth = typeof(GC).GetMethod("GetAllocatedBytesForCurrentThread",
+                                            BindingFlags.Public | BindingFlags.Static, null, Type.EmptyTypes, null);
+            if (meth == null)
+                return () => 0;
+            return (Func<long>)meth.CreateDelegate(typeof(Func<long>));
+        }
+
+        /// <summary>
+        /// Returns the number of bytes allocated by the current thread
+        /// or 0 if the runtime does not support it.
+        /// </summary>
+        public static long AllocatedBytesForCurrentThread() => _allocatedBytes();
+
+        #endregion
+    }
+
+    /// <summary>
+    /// Wraps a view and measures the time spent in its cursors.
+    /// </summary>
+    public class ProfiledDataTransform : ADataTransform, ITransformTemplate
+    {
+        readonly IHost _host;
+        readonly StepProfile _profile;
+
+        public StepProfile Profile => _profile;
+
+        public ProfiledDataTransform(IHostEnvironment env, IDataView input, StepProfile profile)
+        {
+            Contracts.CheckValue(env, nameof(env));
+            _host = env.Register("ProfiledDataTransform");
+            _host.CheckValue(input, nameof(input));
+            _host.CheckValue(profile, nameof(profile));
+            _input = input;
+            _profile = profile;
+        }
+
+        public void Save(ModelSaveContext ctx)
+        {
+            throw _host.ExceptNotSupp("A profiled pipeline cannot be saved, profiling must be disabled first.");
+        }
+
+        public IDataTransform ApplyToData(IHostEnvironment env, IDataView newSource)
+        {
+            return new ProfiledDataTransform(env, newSource, _profile);
+        }
+
+        public DataViewSchema Schema { get { return _input.Schema; } }
+        public bool CanShuffle { get { return _input.CanShuffle; } }
+        public long? GetRowCount() { return _input.GetRowCount(); }
+
+        public DataViewRowCursor GetRowCursor(IEnumerable<DataViewSchema.Column> columnsNeeded, Random rand = null)
+        {
+            long alloc = PipelineProfiler.AllocatedBytesForCurrentThread();
+            long start = Stopwatch.GetTimestamp();
+            var cursor = _input.GetRowCursor(columnsNeeded, rand);
+            _profile.AddCursor(Stopwatch.GetTimestamp() - start, PipelineProfiler.AllocatedBytesForCurrentThread() - alloc);
+            return new ProfiledCursor(cursor, _profile);
+        }
+
+        public DataViewRowCursor[] GetRowCursorSet(IEnumerable<DataViewSchema.Column> columnsNeeded, int n, Random rand = null)
+        {
+            long alloc = PipelineProfiler.AllocatedBytesForCurrentThread();
+            long start = Stopwatch.GetTimestamp();
+            var cursors = _input.GetRowCursorSet(columnsNeeded, n, rand);
+            _profile.AddCursor(Stopwatch.GetTimestamp() - start, PipelineProfiler.AllocatedBytesForCurrentThread() - alloc);
+            return cursors.Select(c => (DataViewRowCursor)new ProfiledCursor(c, _profile)).ToArray();
+        }
+
+        class ProfiledCursor : DataViewRowCursor
+        {
+            readonly DataViewRowCursor _cursor;
+            readonly StepProfile _profile;
+
+            public ProfiledCursor(DataViewRowCursor cursor, StepProfile profile)
+            {
+                _cursor = cursor;
+                _profile = profile;
+            }
+
+            public override DataViewSchema Schema { get { return _cursor.Schema; } }
+            public override bool IsColumnActive(DataViewSchema.Column col) { return _cursor.IsColumnActive(col); }
+            public override ValueGetter<DataViewRowId> GetIdGetter() { return _cursor.GetIdGetter(); }
+            public override long Batch { get { return _cursor.Batch; } }
+            public override long Position { get { return _cursor.Position; } }
+
+            public override bool MoveNext()
+            {
+                long alloc = PipelineProfiler.AllocatedBytesForCurrentThread();
+                long start = Stopwatch.GetTimestamp();
+                var res = _cursor.MoveNext();
+                _profile.AddMoveNext(res, Stopwatch.GetTimestamp() - start, PipelineProfiler.AllocatedBytesForCurrentThread() - alloc);
+                return res;
+            }
+
+            public override ValueGetter<TValue> GetGetter<TValue>(DataViewSchema.Column col)
+            {
+                var getter = _cursor.GetGetter<TValue>(col);
+                var profile = _profile;
+                return (ref TValue value) =>
+                {
+                    long alloc = PipelineProfiler.AllocatedBytesForCurrentThread();
+                    long start = Stopwatch.GetTimestamp();
+                    getter(ref value);
+                    profile.AddGetter(Stopwatch.GetTimestamp() - start, PipelineProfiler.AllocatedBytesForCurrentThread() - alloc);
+                };
+            }
+
+            protected override void Dispose(bool disposing)
+            {
+                if (disposing)
+                    _cursor.Dispose();
+                GC.SuppressFinalize(this);
+            }
+        }
+    }
+}
@@ -0,0 +1,148 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using Microsoft.ML.Data;
+using Microsoft.ML.Runtime;
+
+
+namespace Scikit.ML.PipelineHelper
+{
+    /// <summary>
+    /// Count, mean, variance (Welford), min and max for every slot of a column
+    /// computed in a streaming mode. Every thread can fill its own instance,
+    /// they are merged at the end (Chan et al.). Missing and infinite values
+    /// are skipped, so are the implicit zeros of sparse vectors.
+    /// </summary>
+    public class SlotStatistics
+    {
+        long[] _count;
+        double[] _mean;
+        double[] _m2;
+        double[] _min;
+        double[] _max;
+
+        /// <summary>
+        /// Number of slots, 0 if no value was added.
+        /// </summary>
+        public int Length => _count == null ? 0 : _count.Length;
+
+        void EnsureSize(int length)
+        {
+            if (length <= Length)
+                return;
+            int old = Length;
+            Array.Resize(ref _count, length);
+            Array.Resize(ref _mean, length);
+            Array.Resize(ref _m2, length);
+            Array.Resize(ref _min, length);
+            Array.Resize(ref _max, length);
+            for (int i = old; i < length; ++i)
+            {
+                _min[i] = double.PositiveInfinity;
+                _max[i] = double.NegativeInfinity;
+            }
+        }
+
+        void Update(int i, double x)
+        {
+            if (double.IsNaN(x) || double.IsInfinity(x))
+                return;
+            long n = ++_count[i];
+            double delta = x - _mean[i];
+            _mean[i] += delta / n;
+            _m2[i] += delta * (x - _mean[i]);
+            if (x < _min[i])
+                _min[i] = x;
+            if (x > _max[i])
+                _max[i] = x;
+        }
+
+        public void Update(double value)
+        {
+            EnsureSize(1);
+            Update(0, value);
+        }
+
+        public void Update(in VBuffer<float> value)
+        {
+            EnsureSize(value.Length);
+            if (value.IsDense)
+            {
+                for (int i = 0; i < value.Length; ++i)
+                    Update(i, value.Values[i]);
+            }
+            else
+            {
+                for (int i = 0; i < value.Count; ++i)
+                    Update(value.Indices[i], value.Values[i]);
+            }
+        }
+
+        public void Merge(SlotStatistics other)
+        {
+            EnsureSize(other.Length);
+            for (int i = 0; i < other.Length; ++i)
+            {
+                long nb = other._count[i];
+                if (nb == 0)
+                    continue;
+                long na = _count[i];
+                long n = na + nb;
+                double delta = other._mean[i] - _mean[i];
+                _mean[i] += delta * nb / n;
+                _m2[i] += other._m2[i] + delta * delta * ((double)na * nb / n);
+                _count[i] = n;
+                _min[i] = Math.Min(_min[i], other._min[i]);
+                _max[i] = Math.Max(_max[i], other._max[i]);
+            }
+        }
+
+        public long Count(int slot) => _count[slot];
+        public double Mean(int slot) => _count[slot] == 0 ? 0 : _mean[slot];
+
+        /// <summary>
+        /// Population variance.
+        /// </summary>
+        public double Variance(int slot) => _count[slot] == 0 ? 0 : _m2[slot] / _count[slot];
+        public double Min(int slot) => _count[slot] == 0 ? 0 : _min[slot];
+        public double Max(int slot) => _count[slot] == 0 ? 0 : _max[slot];
+
+        /// <summary>
+        /// Converts the statistics into a <see cref="ColumnStatObs"/>.
+        /// The variance is kept as <i>m2</i>, rebuilding <i>sum2</i>
+        /// would bring back the cancellation Welford's method avoids.
+        /// </summary>
+        public ColumnStatObs ToColumnStatObs(ColumnStatObs.StatKind kind)
+        {
+            var res = new ColumnStatObs(kind);
+            if (Length == 0)
+                return res;
+            var values = new double[Length];
+            for (int i = 0; i < values.Length; ++i)
+            {
+                switch (kind)
+                {
+                    case ColumnStatObs.StatKind.nb:
+                        values[i] = _count[i];
+                        break;
+                    case ColumnStatObs.StatKind.mean:
+                        values[i] = Mean(i);
+                        break;
+                    case ColumnStatObs.StatKind.m2:
+                        values[i] = _m2[i];
+                        break;
+                    case ColumnStatObs.StatKind.min:
+                        values[i] = Min(i);
+                        break;
+                    case ColumnStatObs.StatKind.max:
+                        values[i] = Max(i);
+                        break;
+                    default:
+                        throw Contracts.ExceptNotSupp($"Unsupported statistic {kind}.");
+                }
+            }
+            res.stat = new VBuffer<double>(values.Length, values);
+            return res;
+        }
+    }
+}
@@ -0,0 +1,380 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using Microsoft.ML.Runtime;
+
+
+namespace Scikit.ML.PipelineHelper
+{
+    /// <summary>
+    /// Count, mean, centered moments up to order 4, min and max computed
+    /// in one pass. Two sketches can be merged (Chan et al. / Pébay formulas).
+    /// </summary>
+    public class MomentsSketch
+    {
+        long _n;
+        double _mean;
+        double _m2;
+        double _m3;
+        double _m4;
+        double _min;
+        double _max;
+
+        public long Count => _n;
+        public double Mean => _n > 0 ? _mean : double.NaN;
+        public double Min => _n > 0 ? _min : double.NaN;
+        public double Max => _n > 0 ? _max : double.NaN;
+
+        /// <summary>
+        /// Unbiased variance.
+        /// </summary>
+        public double Variance => _n > 1 ? _m2 / (_n - 1) : double.NaN;
+        public double Std => Math.Sqrt(Variance);
+        public double Skewness => _n > 0 && _m2 > 0 ? Math.Sqrt(_n) * _m3 / Math.Pow(_m2, 1.5) : double.NaN;
+
+        /// <summary>
+        /// Excess kurtosis.
+        /// </summary>
+        public double Kurtosis => _n > 0 && _m2 > 0 ? _n * _m4 / (_m2 * _m2) - 3 : double.NaN;
+
+        public MomentsSketch()
+        {
+            _min = double.PositiveInfinity;
+            _max = double.NegativeInfinity;
+        }
+
+        public void Update(double x)
+        {
+            long n1 = _n;
+            ++_n;
+            double delta = x - _mean;
+            double deltaN = delta / _n;
+            double deltaN2 = deltaN * deltaN;
+            double term1 = delta * deltaN * n1;
+            _mean += deltaN;
+            _m4 += term1 * deltaN2 * ((double)_n * _n - 3 * _n + 3) + 6 * deltaN2 * _m2 - 4 * deltaN * _m3;
+            _m3 += term1 * deltaN * (_n - 2) - 3 * deltaN * _m2;
+            _m2 += term1;
+            if (x < _min)
+                _min = x;
+            if (x > _max)
+                _max = x;
+        }
+
+        /// <summary>
+        /// Adds <i>count</i> times the same value.
+        /// </summary>
+        public void Update(double x, long count)
+        {
+            if (count <= 0)
+                return;
+            var other = new MomentsSketch();
+            other._n = count;
+            other._mean = x;
+            other._min = x;
+            other._max = x;
+            Merge(other);
+        }
+
+        public void Merge(MomentsSketch other)
+        {
+            if (other._n == 0)
+                return;
+            if (_n == 0)
+            {
+                _n = other._n;
+                _mean = other._mean;
+                _m2 = other._m2;
+                _m3 = other._m3;
+                _m4 = other._m4;
+                _min = other._min;
+                _max = other._max;
+                return;
+            }
+            double na = _n, nb = other._n, n = na + nb;
+            double delta = other._mean - _mean;
+            double delta2 = delta * delta;
+            double m2 = _m2 + other._m2 + delta2 * na * nb / n;
+            double m3 = _m3 + other._m3 + delta * delta2 * na * nb * (na - nb) / (n * n) +
+                        3 * delta * (na * other._m2 - nb * _m2) / n;
+            double m4 = _m4 + other._m4 + delta2 * delta2 * na * nb * (na * na - na * nb + nb * nb) / (n * n * n) +
+                        6 * delta2 * (na * na * other._m2 + nb * nb * _m2) / (n * n) +
+                        4 * delta * (na * other._m3 - nb * _m3) / n;
+            _mean += delta * nb / n;
+            _m2 = m2;
+            _m3 = m3;
+            _m4 = m4;
+            _n += other._n;
+            _min = Math.Min(_min, other._min);
+            _max = Math.Max(_max, other._max);
+        }
+    }
+
+    /// <summary>
+    /// KLL quantile sketch (Karnin, Lang, Liberty, 2016). It keeps a hierarchy of
+    /// compactors, every item at level h stands for 2^h observations.
+    /// The memory is O(k) and the rank error is about 1.7/k.
+    /// Two sketches can be merged.
+    /// </summary>
+    public class KllQuantileSketch
+    {
+        const double CapacityRatio = 2.0 / 3.0;
+
+        readonly int _k;
+        readonly Random _rand;
+        readonly List<List<double>> _compactors;
+        long _n;
+        int _size;
+        int _maxSize;
+
+        public int K => _k;
+        public long Count => _n;
+
+        /// <summary>
+        /// Number of retained items.
+        /// </summary>
+        public int Size => _size;
+
+        public KllQuantileSketch(int k = 200, int seed = 0)
+        {
+            Contracts.CheckParam(k >= 8, nameof(k), "must be >= 8");
+            _k = k;
+            _rand = new Random(seed);
+            _compactors = new List<List<double>>();
+            Grow();
+        }
+
+        int Capacity(int level)
+        {
+            int depth = _compactors.Count - level - 1;
+            return Math.Max(2, (int)Math.Ceiling(_k * Math.Pow(CapacityRatio, depth)));
+        }
+
+        void Grow()
+        {
+            _compactors.Add(new List<double>());
+            _maxSize = 0;
+            for (int h = 0; h < _compactors.Count; ++h)
+                _maxSize += Capacity(h);
+        }
+
+        public void Update(double x)
+        {
+            if (double.IsNaN(x))
+                return;
+            _compactors[0].Add(x);
+            ++_n;
+            ++_size;
+            if (_size >= _maxSize)
+                Compress();
+        }
+
+        /// <summary>
+        /// Adds <i>count</i> times the same value, an item is added at level h
+        /// for every bit h set in count.
+        /// </summary>
+        public void Update(double x, long count)
+        {
+            if (double.IsNaN(x) || count <= 0)
+                return;
+            _n += count;
+            for (int h = 0; count > 0; ++h, count >>= 1)
+            {
+                if ((count & 1) == 0)
+                    continue;
+                while (_compactors.Count <= h)
+                    Grow();
+                _compactors[h].Add(x);
+                ++_size;
+            }
+            while (_size >= _maxSize)
+                Compress();
+        }
+
+        public void Merge(KllQuantileSketch other)
+        {
+            while (_compactors.Count < other._compactors.Count)
+                Grow();
+            for (int h = 0; h < other._compactors.Count; ++h)
+                _compactors[h].AddRange(other._compactors[h]);
+            _n += other._n;
+            _size = _compactors.Sum(c => c.Count);
+            while (_size >= _maxSize)
+                Compress();
+        }
+
+        void Compress()
+        {
+            for (int h = 0; h < _compactors.Count; ++h)
+            {
+                var level = _compactors[h];
+                if (level.Count < Capacity(h))
+                    continue;
+                if (h + 1 >= _compactors.Count)
+                    Grow();
+                level.Sort();
+                // If the number of items is odd, the last one stays at this level.
+                int nb = level.Count - (level.Count % 2);
+                int offset = _rand.Next(2);
+                var upper = _compactors[h + 1];
+                for (int i = offset; i < nb; i += 2)
+                    upper.Add(level[i]);
+                level.RemoveRange(0, nb);
+                _size -= nb / 2;
+                // One compaction frees enough space.
+                break;
+            }
+        }
+
+        /// <summary>
+        /// Returns the approximated quantile, NaN if the sketch is empty.
+        /// </summary>
+        public double Quantile(double q)
+        {
+            return Quantiles(new[] { q })[0];
+        }
+
+        public double[] Quantiles(double[] qs)
+        {
+            var res = new double[qs.Length];
+            if (_size == 0)
+            {
+                for (int i = 0; i < res.Length; ++i)
+                    res[i] = double.NaN;
+                return res;
+            }
+            var items = new List<KeyValuePair<double, long>>(_size);
+            for (int h = 0; h < _compactors.Count; ++h)
+                foreach (var v in _compactors[h])
+                    items.Add(new KeyValuePair<double, long>(v, 1L << h));
+            items.Sort((a, b) => a.Key.CompareTo(b.Key));
+            long total = items.Sum(c => c.Value);
+            for (int i = 0; i < qs.Length; ++i)
+            {
+                double target = Math.Min(Math.Max(qs[i], 0), 1) * total;
+                long cum = 0;
+                res[i] = items[items.Count - 1].Key;
+                foreach (var item in items)
+                {
+                    cum += item.Value;
+                    if (cum >= target)
+                    {
+                        res[i] = item.Key;
+                        break;
+                    }
+                }
+            }
+            return res;
+        }
+    }
+
+    /// <summary>
+    /// HyperLogLog distinct count estimator (Flajolet et al., 2007) with
+    /// the small range correction. The memory is 2^precision bytes and
+    /// the relative error about 1.04/sqrt(2^precision).
+    /// Two sketches with the same precision can be merged.
+    /// </summary>
+    public class HyperLogLogSketch
+    {
+        readonly int _precision;
+        readonly byte[] _registers;
+
+        public int Precision => _precision;
+
+        public HyperLogLogSketch(int precision = 12)
+        {
+            Contracts.CheckParam(precision >= 4 && precision <= 18, nameof(precision), "must be in [4, 18]");
+            _precision = precision;
+            _registers = new byte[1 << precision];
+        }
+
+        /// <summary>
+        /// Finalizer of SplitMix64.
+        /// </summary>
+        public static ulong Mix(ulong z)
+        {
+            z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9UL;
+            z = (z ^ (z >> 27)) * 0x94D049BB133111EBUL;
+            return z ^ (z >> 31);
+        }
+
+        public static ulong Hash(double value)
+        {
+            // 0 and -0 are the same value.
+            if (value == 0)
+                value = 0;
+            return Mix((ulong)BitConverter.DoubleToInt64Bits(value));
+        }
+
+        public static ulong Hash(ReadOnlySpan<char> value)
+        {
+            // FNV-1a
+            ulong h = 14695981039346656037UL;
+            for (int i = 0; i < value.Length; ++i)
+            {
+                h ^= value[i];
+                h *= 1099511628211UL;
+            }
+            return Mix(h);
+        }
+
+        public void Update(double value)
+        {
+            UpdateHash(Hash(value));
+        }
+
+        public void Update(ReadOnlySpan<char> value)
+        {
+            UpdateHash(Hash(value));
+        }
+
+        public void UpdateHash(ulong hash)
+        {
+            int index = (int)(hash >> (64 - _precision));
+            ulong w = (hash << _precision) | (1UL << (_precision - 1));
+            byte rho = 1;
+            while ((w & 0x8000000000000000UL) == 0)
+            {
+                ++rho;
+                w <<= 1;
+            }
+            if (rho > _registers[index])
+                _registers[index] = rho;
+        }
+
+        public void Merge(HyperLogLogSketch other)
+        {
+            Contracts.Check(other._precision == _precision, "Sketches must have the same precision.");
+            for (int i = 0; i < _registers.Length; ++i)
+                if (other._registers[i] > _registers[i])
+                    _registers[i] = other._registers[i];
+        }
+
+        public double Estimate()
+        {
+            int m = _registers.Length;
+            double alpha;
+            switch (m)
+            {
+                case 16: alpha = 0.673; break;
+                case 32: alpha = 0.697; break;
+                case 64: alpha = 0.709; break;
+                default: alpha = 0.7213 / (1 + 1.079 / m); break;
+            }
+            double sum = 0;
+            int zeros = 0;
+            for (int i = 0; i < m; ++i)
+            {
+                sum += Math.Pow(2, -_registers[i]);
+                if (_registers[i] == 0)
+                    ++zeros;
+            }
+            double estimate = alpha * m * m / sum;
+            if (estimate <= 2.5 * m && zeros > 0)
+                estimate = m * Math.Log((double)m / zeros);
+            return estimate;
+        }
+    }
+}
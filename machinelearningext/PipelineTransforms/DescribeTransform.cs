@@ -3,12 +3,15 @@
 using System;
 using System.Linq;
 using System.Collections.Generic;
+using System.Globalization;
+using System.Threading.Tasks;
 using Microsoft.ML;
 using Microsoft.ML.Runtime;
 using Microsoft.ML.CommandLine;
 using Microsoft.ML.Data;
 using Microsoft.ML.Model.OnnxConverter;
 using Scikit.ML.PipelineHelper;
+using Scikit.ML.DataManipulation;
 
 
 using LoadableClassAttribute = Microsoft.ML.LoadableClassAttribute;
@@ -40,8 +43,8 @@ namespace Scikit.ML.PipelineTransforms
         {
             return new VersionInfo(
                 modelSignature: "DESCTRNS",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(DescribeTransform).Assembly.FullName);
@@ -77,6 +80,19 @@ namespace Scikit.ML.PipelineTransforms
             [Argument(ArgumentType.AtMostOnce, HelpText = "If not null, every display will start by <name> and end by </name>")]
             public string name = "desc";
 
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Computes approximated statistics (moments, quantiles, distinct values) " +
+                "with mergeable sketches in one parallel pass instead of the exact statistics and histograms.", ShortName = "sk")]
+            public bool sketch = false;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of threads used to compute the sketches, null for the default value.", ShortName = "nt")]
+            public int? numThreads;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Size of the quantile sketch, the rank error is about 1.7/k.", ShortName = "k")]
+            public int sketchSize = 200;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Quantiles computed in sketch mode (comma separated).", ShortName = "q")]
+            public string quantiles = "0.01,0.05,0.25,0.5,0.75,0.95,0.99";
+
             public void Write(ModelSaveContext ctx, IHost host)
             {
                 ctx.Writer.Write(columns == null ? string.Empty : string.Join(",", columns));
@@ -88,6 +104,10 @@ namespace Scikit.ML.PipelineTransforms
                 ctx.Writer.Write(oneRowPerColumn ? 1 : 0);
                 ctx.Writer.Write(jsonFormat ? 1 : 0);
                 ctx.Writer.Write(name);
+                ctx.Writer.Write(sketch);
+                ctx.Writer.Write(numThreads ?? -1);
+                ctx.Writer.Write(sketchSize);
+                ctx.Writer.Write(quantiles ?? string.Empty);
             }
 
             public void Read(ModelLoadContext ctx, IHost host)
@@ -113,6 +133,14 @@ namespace Scikit.ML.PipelineTransforms
                 oneRowPerColumn = ctx.Reader.ReadInt32() == 1;
                 jsonFormat = ctx.Reader.ReadInt32() == 1;
                 name = ctx.Reader.ReadString();
+                if (ctx.Header.ModelVerWritten >= 0x00010002)
+                {
+                    sketch = ctx.Reader.ReadBoolean();
+                    int nt = ctx.Reader.ReadInt32();
+                    numThreads = nt < 0 ? (int?)null : nt;
+                    sketchSize = ctx.Reader.ReadInt32();
+                    quantiles = ctx.Reader.ReadString();
+                }
             }
 
             public void PostProcess()
@@ -122,9 +150,24 @@ namespace Scikit.ML.PipelineTransforms
                 if (columns != null && columns.Length == 1 && columns[0].Contains(","))
                     columns = columns[0].Split(',');
             }
+
+            /// <summary>
+            /// Parses the quantiles.
+            /// </summary>
+            public double[] GetQuantiles()
+            {
+                if (string.IsNullOrEmpty(quantiles))
+                    return new double[0];
+                var res = quantiles.Split(',').Where(c => !string.IsNullOrEmpty(c))
+                                   .Select(c => double.Parse(c, CultureInfo.InvariantCulture)).ToArray();
+                if (res.Any(c => c < 0 || c > 1))
+                    throw Contracts.ExceptParam(nameof(quantiles), "Quantiles must be in [0, 1].");
+                return res;
+            }
         }
 
         IDataView _statistics;
+        Dictionary<string, ColumnSketch> _sketches;
         Arguments _args;
         IHost _host;
         object _lock;
@@ -136,6 +179,8 @@ namespace Scikit.ML.PipelineTransforms
             _host.CheckValue(args, "args");
             args.PostProcess();
             _host.CheckValue(args.columns, "columns");
+            _host.CheckUserArg(args.sketchSize >= 8, nameof(args.sketchSize), "must be >= 8");
+            args.GetQuantiles();
 
             if (!args.passThrough)
                 throw _host.ExceptNotImpl("passThrough=+ not yet implemented.");
@@ -254,133 +299,141 @@ namespace Scikit.ML.PipelineTransforms
                         }
 
                         // Computation
-                        var required = new HashSet<int>(indexesCol);
-                        var requiredIndexes = required.OrderBy(c => c).ToArray();
-                        using (var cur = _input.GetRowCursor(Schema.Where(i => required.Contains(i.Index))))
+                        if (_args.sketch)
                         {
-                            bool[] isText = requiredIndexes.Select(c => sch[c].Type == TextDataViewType.Instance).ToArray();
-                            bool[] isBool = requiredIndexes.Select(c => sch[c].Type == BooleanDataViewType.Instance).ToArray();
-                            bool[] isFloat = requiredIndexes.Select(c => sch[c].Type == NumberDataViewType.Single).ToArray();
-                            bool[] isUint = requiredIndexes.Select(c => sch[c].Type == NumberDataViewType.UInt32 || sch[c].Type.RawKind() == DataKind.UInt32).ToArray();
-                            bool[] isInt = requiredIndexes.Select(c => sch[c].Type == NumberDataViewType.Int32 || sch[c].Type.RawKind() == DataKind.Int32).ToArray();
-                            bool[] isInt8 = requiredIndexes.Select(c => sch[c].Type == NumberDataViewType.Int64 || sch[c].Type.RawKind() == DataKind.Int64).ToArray();
-
-                            ValueGetter<bool>[] boolGetters = requiredIndexes.Select(i => sch[i].Type == BooleanDataViewType.Instance || sch[i].Type.RawKind() == DataKind.Boolean ? cur.GetGetter<bool>(SchemaHelper._dc(i, cur)) : null).ToArray();
-                            ValueGetter<uint>[] uintGetters = requiredIndexes.Select(i => sch[i].Type == NumberDataViewType.UInt32 || sch[i].Type.RawKind() == DataKind.UInt32 ? cur.GetGetter<uint>(SchemaHelper._dc(i, cur)) : null).ToArray();
-                            ValueGetter<ReadOnlyMemory<char>>[] textGetters = requiredIndexes.Select(i => sch[i].Type == TextDataViewType.Instance ? cur.GetGetter<ReadOnlyMemory<char>>(SchemaHelper._dc(i, cur)) : null).ToArray();
-                            ValueGetter<float>[] floatGetters = requiredIndexes.Select(i => sch[i].Type == NumberDataViewType.Single ? cur.GetGetter<float>(SchemaHelper._dc(i, cur)) : null).ToArray();
-                            ValueGetter<VBuffer<float>>[] vectorGetters = requiredIndexes.Select(i => sch[i].Type.IsVector() ? cur.GetGetter<VBuffer<float>>(SchemaHelper._dc(i, cur)) : null).ToArray();
-                            ValueGetter<int>[] intGetters = requiredIndexes.Select(i => sch[i].Type == NumberDataViewType.Int32 || sch[i].Type.RawKind() == DataKind.Int32 ? cur.GetGetter<int>(SchemaHelper._dc(i, cur)) : null).ToArray();
-                            ValueGetter<long>[] int8Getters = requiredIndexes.Select(i => sch[i].Type == NumberDataViewType.Int64 || sch[i].Type.RawKind() == DataKind.Int64 ? cur.GetGetter<long>(SchemaHelper._dc(i, cur)) : null).ToArray();
-
-                            var cols = _args.columns == null ? null : new HashSet<string>(_args.columns);
-                            var hists = _args.hists == null ? null : new HashSet<string>(_args.hists);
-                            var schema = _input.Schema;
-
-                            for (int i = 0; i < schema.Count; ++i)
+                            _sketches = ComputeSketches(ch, indexesCol);
+                            DisplaySketches(ch, _sketches);
+                        }
+                        else
+                        {
+                            var required = new HashSet<int>(indexesCol);
+                            var requiredIndexes = required.OrderBy(c => c).ToArray();
+                            using (var cur = _input.GetRowCursor(Schema.Where(i => required.Contains(i.Index))))
                             {
-                                string name = schema[i].Name;
-                                if (!required.Contains(i))
-                                    continue;
-                                stats[name] = new List<ColumnStatObs>();
-                                var t = stats[name];
-                                if (cols != null && cols.Contains(name))
+                                bool[] isText = requiredIndexes.Select(c => sch[c].Type == TextDataViewType.Instance).ToArray();
+                                bool[] isBool = requiredIndexes.Select(c => sch[c].Type == BooleanDataViewType.Instance).ToArray();
+                                bool[] isFloat = requiredIndexes.Select(c => sch[c].Type == NumberDataViewType.Single).ToArray();
+                                bool[] isUint = requiredIndexes.Select(c => sch[c].Type == NumberDataViewType.UInt32 || sch[c].Type.RawKind() == DataKind.UInt32).ToArray();
+                                bool[] isInt = requiredIndexes.Select(c => sch[c].Type == NumberDataViewType.Int32 || sch[c].Type.RawKind() == DataKind.Int32).ToArray();
+                                bool[] isInt8 = requiredIndexes.Select(c => sch[c].Type == NumberDataViewType.Int64 || sch[c].Type.RawKind() == DataKind.Int64).ToArray();
+
+                                ValueGetter<bool>[] boolGetters = requiredIndexes.Select(i => sch[i].Type == BooleanDataViewType.Instance || sch[i].Type.RawKind() == DataKind.Boolean ? cur.GetGetter<bool>(SchemaHelper._dc(i, cur)) : null).ToArray();
+                                ValueGetter<uint>[] uintGetters = requiredIndexes.Select(i => sch[i].Type == NumberDataViewType.UInt32 || sch[i].Type.RawKind() == DataKind.UInt32 ? cur.GetGetter<uint>(SchemaHelper._dc(i, cur)) : null).ToArray();
+                                ValueGetter<ReadOnlyMemory<char>>[] textGetters = requiredIndexes.Select(i => sch[i].Type == TextDataViewType.Instance ? cur.GetGetter<ReadOnlyMemory<char>>(SchemaHelper._dc(i, cur)) : null).ToArray();
+                                ValueGetter<float>[] floatGetters = requiredIndexes.Select(i => sch[i].Type == NumberDataViewType.Single ? cur.GetGetter<float>(SchemaHelper._dc(i, cur)) : null).ToArray();
+                                ValueGetter<VBuffer<float>>[] vectorGetters = requiredIndexes.Select(i => sch[i].Type.IsVector() ? cur.GetGetter<VBuffer<float>>(SchemaHelper._dc(i, cur)) : null).ToArray();
+                                ValueGetter<int>[] intGetters = requiredIndexes.Select(i => sch[i].Type == NumberDataViewType.Int32 || sch[i].Type.RawKind() == DataKind.Int32 ? cur.GetGetter<int>(SchemaHelper._dc(i, cur)) : null).ToArray();
+                                ValueGetter<long>[] int8Getters = requiredIndexes.Select(i => sch[i].Type == NumberDataViewType.Int64 || sch[i].Type.RawKind() == DataKind.Int64 ? cur.GetGetter<long>(SchemaHelper._dc(i, cur)) : null).ToArray();
+
+                                var cols = _args.columns == null ? null : new HashSet<string>(_args.columns);
+                                var hists = _args.hists == null ? null : new HashSet<string>(_args.hists);
+                                var schema = _input.Schema;
+
+                                for (int i = 0; i < schema.Count; ++i)
                                 {
-                                    t.Add(new ColumnStatObs(ColumnStatObs.StatKind.min));
-                                    t.Add(new ColumnStatObs(ColumnStatObs.StatKind.max));
-                                    t.Add(new ColumnStatObs(ColumnStatObs.StatKind.sum));
-                                    t.Add(new ColumnStatObs(ColumnStatObs.StatKind.sum2));
-                                    t.Add(new ColumnStatObs(ColumnStatObs.StatKind.nb));
+                                    string name = schema[i].Name;
+                                    if (!required.Contains(i))
+                                        continue;
+                                    stats[name] = new List<ColumnStatObs>();
+                                    var t = stats[name];
+                                    if (cols != null && cols.Contains(name))
+                                    {
+                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.min));
+                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.max));
+                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.sum));
+                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.sum2));
+                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.nb));
+                                    }
+                                    if (hists != null && hists.Contains(name))
+                                        t.Add(new ColumnStatObs(ColumnStatObs.StatKind.hist));
                                 }
-                                if (hists != null && hists.Contains(name))
-                                    t.Add(new ColumnStatObs(ColumnStatObs.StatKind.hist));
-                            }
 
-                            float value = 0;
-                            var tvalue = new ReadOnlyMemory<char>();
-                            var vector = new VBuffer<float>();
-                            uint uvalue = 0;
-                            var bvalue = true;
-                            var int4 = (int)0;
-                            var int8 = (long)0;
+                                float value = 0;
+                                var tvalue = new ReadOnlyMemory<char>();
+                                var vector = new VBuffer<float>();
+                                uint uvalue = 0;
+                                var bvalue = true;
+                                var int4 = (int)0;
+                                var int8 = (long)0;
 
-                            while (cur.MoveNext())
-                            {
-                                for (int i = 0; i < requiredIndexes.Length; ++i)
+                                while (cur.MoveNext())
                                 {
-                                    string name = cur.Schema[requiredIndexes[i]].Name;
-                                    if (!stats.ContainsKey(name))
-                                        continue;
-                                    if (isFloat[i])
-                                    {
-                                        floatGetters[i](ref value);
-                                        foreach (var t in stats[name])
-                                            t.Update(value);
-                                    }
-                                    else if (isBool[i])
-                                    {
-                                        boolGetters[i](ref bvalue);
-                                        foreach (var t in stats[name])
-                                            t.Update(bvalue);
-                                    }
-                                    else if (isText[i])
-                                    {
-                                        textGetters[i](ref tvalue);
-                                        foreach (var t in stats[name])
-                                            t.Update(tvalue.ToString());
-                                    }
-                                    else if (isUint[i])
+                                    for (int i = 0; i < requiredIndexes.Length; ++i)
                                     {
-                                        uintGetters[i](ref uvalue);
-                                        foreach (var t in stats[name])
-                                            t.Update(uvalue);
-                                    }
-                                    else if (isInt[i])
-                                    {
-                                        intGetters[i](ref int4);
-                                        foreach (var t in stats[name])
-                                            t.Update((double)int4);
-                                    }
-                                    else if (isInt8[i])
-                                    {
-                                        int8Getters[i](ref int8);
-                                        foreach (var t in stats[name])
-                                            t.Update((double)int8);
-                                    }
-                                    else
-                                    {
-                                        vectorGetters[i](ref vector);
-                                        foreach (var t in stats[name])
-                                            t.Update(vector);
+                                        string name = cur.Schema[requiredIndexes[i]].Name;
+                                        if (!stats.ContainsKey(name))
+                                            continue;
+                                        if (isFloat[i])
+                                        {
+                                            floatGetters[i](ref value);
+                                            foreach (var t in stats[name])
+                                                t.Update(value);
+                                        }
+                                        else if (isBool[i])
+                                        {
+                                            boolGetters[i](ref bvalue);
+                                            foreach (var t in stats[name])
+                                                t.Update(bvalue);
+                                        }
+                                        else if (isText[i])
+                                        {
+                                            textGetters[i](ref tvalue);
+                                            foreach (var t in stats[name])
+                                                t.Update(tvalue.ToString());
+                                        }
+                                        else if (isUint[i])
+                                        {
+                                            uintGetters[i](ref uvalue);
+                                            foreach (var t in stats[name])
+                                                t.Update(uvalue);
+                                        }
+                                        else if (isInt[i])
+                                        {
+                                            intGetters[i](ref int4);
+                                            foreach (var t in stats[name])
+                                                t.Update((double)int4);
+                                        }
+                                        else if (isInt8[i])
+                                        {
+                                            int8Getters[i](ref int8);
+                                            foreach (var t in stats[name])
+                                                t.Update((double)int8);
+                                        }
+                                        else
+                                        {
+                                            vectorGetters[i](ref vector);
+                                            foreach (var t in stats[name])
+                                                t.Update(vector);
+                                        }
                                     }
                                 }
                             }
-                        }
 
-                        if (_args.oneRowPerColumn || _args.jsonFormat)
-                        {
-                            var rows = new List<string>();
-                            rows.Add(string.Format("<{0}>{1}", _args.name, _args.jsonFormat ? "[" : ""));
-                            foreach (var col in stats.OrderBy(c => c.Key))
-                                if (_args.jsonFormat)
-                                    rows.Add(string.Format("    {{\"Column\": \"{0}\", \"stat\": {1}}},", col.Key,
-                                        string.Join(", ", col.Value.Select(c => c.ToString(true)))));
-                                else
-                                    rows.Add(string.Format("    <{2}>Column '{0}': {1}</{2}>", col.Key,
-                                        string.Join(", ", col.Value.Select(c => c.ToString(false))), _args.name));
-                            rows.Add(string.Format("{1}</{0}>", _args.name, _args.jsonFormat ? "]" : ""));
-                            ch.Info(string.Join("\n", rows));
-                        }
-                        else
-                        {
-                            var rows = new List<string>();
-                            foreach (var col in stats.OrderBy(c => c.Key))
+                            if (_args.oneRowPerColumn || _args.jsonFormat)
+                            {
+                                var rows = new List<string>();
+                                rows.Add(string.Format("<{0}>{1}", _args.name, _args.jsonFormat ? "[" : ""));
+                                foreach (var col in stats.OrderBy(c => c.Key))
+                                    if (_args.jsonFormat)
+                                        rows.Add(string.Format("    {{\"Column\": \"{0}\", \"stat\": {1}}},", col.Key,
+                                            string.Join(", ", col.Value.Select(c => c.ToString(true)))));
+                                    else
+                                        rows.Add(string.Format("    <{2}>Column '{0}': {1}</{2}>", col.Key,
+                                            string.Join(", ", col.Value.Select(c => c.ToString(false))), _args.name));
+                                rows.Add(string.Format("{1}</{0}>", _args.name, _args.jsonFormat ? "]" : ""));
+                                ch.Info(string.Join("\n", rows));
+                            }
+                            else
                             {
-                                rows.Add(string.Format("     [{1}] Column '{0}'", col.Key, _args.name));
-                                foreach (var st in col.Value)
-                                    rows.Add(string.Format("        {0}", st.ToString(false)));
+                                var rows = new List<string>();
+                                foreach (var col in stats.OrderBy(c => c.Key))
+                                {
+                                    rows.Add(string.Format("     [{1}] Column '{0}'", col.Key, _args.name));
+                                    foreach (var st in col.Value)
+                                        rows.Add(string.Format("        {0}", st.ToString(false)));
+                                }
+                                ch.Info(string.Join("\n", rows));
                             }
-                            ch.Info(string.Join("\n", rows));
                         }
 
                         // Save
@@ -395,6 +448,149 @@ namespace Scikit.ML.PipelineTransforms
             }
         }
 
+        /// <summary>
+        /// Computes one sketch per column, every cursor of a cursor set
+        /// fills its own sketches, they are merged at the end.
+        /// </summary>
+        private Dictionary<string, ColumnSketch> ComputeSketches(IChannel ch, List<int> indexesCol)
+        {
+            var sch = _input.Schema;
+            var requiredIndexes = new HashSet<int>(indexesCol).OrderBy(c => c).ToArray();
+            var required = new HashSet<int>(requiredIndexes);
+            int nt = DataViewUtils.GetThreadCount(_args.numThreads ?? 0);
+            var cursors = _input.GetRowCursorSet(sch.Where(c => required.Contains(c.Index)), nt);
+            ch.Info("Computing sketches for {0} columns with {1} cursors.", requiredIndexes.Length, cursors.Length);
+
+            var partials = new ColumnSketch[cursors.Length][];
+            var ops = new Action[cursors.Length];
+            for (int i = 0; i < ops.Length; ++i)
+            {
+                int chunkId = i;
+                ops[i] = new Action(() =>
+                {
+                    using (var cursor = cursors[chunkId])
+                    {
+                        var sketches = requiredIndexes.Select(c => new ColumnSketch(sch[c].Name,
+                                            sch[c].Type == TextDataViewType.Instance, _args.sketchSize, seed: chunkId)).ToArray();
+                        var updates = requiredIndexes.Select((c, k) => GetSketchUpdate(cursor, c, sketches[k])).ToArray();
+                        while (cursor.MoveNext())
+                        {
+                            for (int k = 0; k < updates.Length; ++k)
+                                updates[k]();
+                        }
+                        partials[chunkId] = sketches;
+                    }
+                });
+            }
+            Parallel.Invoke(new ParallelOptions() { MaxDegreeOfParallelism = ops.Length }, ops);
+
+            var res = new Dictionary<string, ColumnSketch>();
+            for (int k = 0; k < requiredIndexes.Length; ++k)
+            {
+                var sketch = partials[0][k];
+                for (int i = 1; i < partials.Length; ++i)
+                    sketch.Merge(partials[i][k]);
+                res[sketch.Name] = sketch;
+            }
+            return res;
+        }
+
+        /// <summary>
+        /// Returns a function which reads the current value of a column and adds it to a sketch.
+        /// </summary>
+        private static Action GetSketchUpdate(DataViewRowCursor cursor, int col, ColumnSketch sketch)
+        {
+            var ty = cursor.Schema[col].Type;
+            var column = SchemaHelper._dc(col, cursor);
+            if (ty == TextDataViewType.Instance)
+            {
+                var getter = cursor.GetGetter<ReadOnlyMemory<char>>(column);
+                var value = new ReadOnlyMemory<char>();
+                return () => { getter(ref value); sketch.Update(value); };
+            }
+            if (ty.IsVector())
+            {
+                var getter = cursor.GetGetter<VBuffer<float>>(column);
+                var value = new VBuffer<float>();
+                return () => { getter(ref value); sketch.Update(in value); };
+            }
+            if (ty == BooleanDataViewType.Instance)
+            {
+                var getter = cursor.GetGetter<bool>(column);
+                bool value = false;
+                return () => { getter(ref value); sketch.Update(value ? 1 : 0); };
+            }
+            if (ty == NumberDataViewType.Single)
+            {
+                var getter = cursor.GetGetter<float>(column);
+                float value = 0;
+                return () => { getter(ref value); sketch.Update(value); };
+            }
+            switch (ty.RawKind())
+            {
+                case DataKind.UInt32:
+                    {
+                        var getter = cursor.GetGetter<uint>(column);
+                        uint value = 0;
+                        return () => { getter(ref value); sketch.Update(value); };
+                    }
+                case DataKind.Int32:
+                    {
+                        var getter = cursor.GetGetter<int>(column);
+                        int value = 0;
+                        return () => { getter(ref value); sketch.Update(value); };
+                    }
+                case DataKind.Int64:
+                    {
+                        var getter = cursor.GetGetter<long>(column);
+                        long value = 0;
+                        return () => { getter(ref value); sketch.Update(value); };
+                    }
+                default:
+                    throw Contracts.Except("Unsupported type {0} for column '{1}'.", ty, cursor.Schema[col].Name);
+            }
+        }
+
+        private void DisplaySketches(IChannel ch, Dictionary<string, ColumnSketch> sketches)
+        {
+            var quantiles = _args.GetQuantiles();
+            var rows = new List<string>();
+            if (_args.jsonFormat)
+            {
+                rows.Add(string.Format("<{0}>[", _args.name));
+                foreach (var col in sketches.OrderBy(c => c.Key))
+                    rows.Add(string.Format("    {{\"Column\": \"{0}\", \"stat\": {1}}},", col.Key, col.Value.ToString(true, quantiles)));
+                rows.Add(string.Format("]</{0}>", _args.name));
+            }
+            else
+            {
+                foreach (var col in sketches.OrderBy(c => c.Key))
+                    rows.Add(string.Format("    <{2}>Column '{0}': {1}</{2}>", col.Key, col.Value.ToString(false, quantiles), _args.name));
+            }
+            ch.Info(string.Join("\n", rows));
+        }
+
+        /// <summary>
+        /// Returns the statistics computed in sketch mode, one row per column,
+        /// null if the statistics were not computed yet or not in sketch mode.
+        /// </summary>
+        public DataFrame GetSketchStatistics()
+        {
+            var sketches = _sketches;
+            if (sketches == null)
+                return null;
+            var quantiles = _args.GetQuantiles();
+            var ordered = sketches.OrderBy(c => c.Key).ToArray();
+            var stats = ordered.Select(c => c.Value.GetStatistics(quantiles).ToDictionary(kv => kv.Key, kv => kv.Value)).ToArray();
+            var names = new List<string>() { "count", "missing", "distinct", "mean", "std", "min", "max", "skewness", "kurtosis" };
+            names.AddRange(quantiles.Select(c => ColumnSketch.QuantileName(c)));
+            var df = new DataFrame();
+            df.AddColumn("Column", ordered.Select(c => c.Key).ToArray());
+            foreach (var name in names)
+                df.AddColumn(name, stats.Select(c => c.ContainsKey(name) ? c[name] : double.NaN).ToArray());
+            return df;
+        }
+
         public bool CanSaveOnnx(OnnxContext ctx)
         {
             return true;
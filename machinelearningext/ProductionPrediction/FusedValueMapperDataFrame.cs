@@ -0,0 +1,223 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using Microsoft.ML;
+using Microsoft.ML.Runtime;
+using Microsoft.ML.Data;
+using Scikit.ML.PipelineHelper;
+using Scikit.ML.DataManipulation;
+
+
+namespace Scikit.ML.ProductionPrediction
+{
+    /// <summary>
+    /// Converts a chain of <see cref="IDataTransform" /> into a single <see cref="ValueMapper" />
+    /// on dataframes. Unlike <see cref="ValueMapperDataFrameFromTransform"/>, the rows do not
+    /// flow through a chain of cursors: every transform implementing <see cref="IRowToRowMapper"/>
+    /// (most of ML.net transforms and the scorers) is bound to the row produced by the
+    /// previous step, the mapper is then a chain of getters. Other transforms are bridged:
+    /// they are applied on a view which returns the current row, their cursor is created once
+    /// and moved to the next row for every prediction. Getters and the output dataframe are
+    /// created once and reused, no cursor is created after the constructor.
+    /// The mapper is not thread-safe.
+    /// </summary>
+    public class FusedValueMapperDataFrame : IValueMapper, IDisposable
+    {
+        #region members
+
+        readonly IHostEnvironment _env;
+        readonly InfiniteLoopViewCursorDataFrame _inputView;
+        readonly DataViewSchema _outputSchema;
+        readonly DataFrame.RowFillerDelegate _filler;
+        readonly int _fusedSteps;
+        readonly int _bridgedSteps;
+        List<DataViewRowCursor> _cursors;
+
+        public DataViewType InputType => null;
+        public DataViewType OutputType => null;
+
+        /// <summary>
+        /// Number of transforms called as a <see cref="IRowToRowMapper"/>.
+        /// </summary>
+        public int FusedSteps => _fusedSteps;
+
+        /// <summary>
+        /// Number of transforms which still rely on a cursor.
+        /// </summary>
+        public int BridgedSteps => _bridgedSteps;
+
+        /// <summary>
+        /// Output schema.
+        /// </summary>
+        public DataViewSchema OutputSchema => _outputSchema;
+
+        #endregion
+
+        #region constructor
+
+        /// <summary>
+        /// Constructor.
+        /// </summary>
+        /// <param name="env">environment</param>
+        /// <param name="transform">last transform of the chain (usually a scorer)</param>
+        /// <param name="firstView">the chain starts after this view, the mapper receives dataframes
+        /// following its schema, if null, it is the first view of the pipeline</param>
+        public FusedValueMapperDataFrame(IHostEnvironment env, IDataTransform transform, IDataView firstView = null)
+        {
+            Contracts.CheckValue(env, nameof(env));
+            env.CheckValue(transform, nameof(transform));
+            _env = env;
+            firstView = firstView ?? DataViewHelper.GetFirstView(transform);
+
+            var chain = new List<IDataTransform>();
+            IDataView view = transform;
+            while (view != firstView)
+            {
+                var tr = view as IDataTransform;
+                if (tr == null)
+                    throw _env.Except($"Unable to find the first view in the pipeline, {view.GetType()} is not a transform.");
+                chain.Add(tr);
+                view = tr.Source;
+            }
+            chain.Reverse();
+
+            _cursors = new List<DataViewRowCursor>();
+            _inputView = new InfiniteLoopViewCursorDataFrame(null, firstView.Schema);
+            var inputCursor = _inputView.GetRowCursor(firstView.Schema);
+            _cursors.Add(inputCursor);
+
+            DataViewRow row = inputCursor;
+            foreach (var tr in chain)
+            {
+                // The transform is applied on a view returning the current row.
+                var applied = ApplyTransformUtils.ApplyTransformToData(_env, tr, new RowView(row));
+                var mapper = applied as IRowToRowMapper;
+                if (mapper != null)
+                {
+                    row = mapper.GetRow(row, mapper.OutputSchema);
+                    ++_fusedSteps;
+                }
+                else
+                {
+                    // The transform requires a cursor, it is created once and moved for every row.
+                    var cursor = applied.GetRowCursor(applied.Schema);
+                    _cursors.Add(cursor);
+                    row = cursor;
+                    ++_bridgedSteps;
+                }
+            }
+
+            _outputSchema = row.Schema;
+            _filler = DataFrame.GetRowFiller(new RowCursor(row));
+        }
+
+        public void Dispose()
+        {
+            if (_cursors != null)
+            {
+                // The last cursors depend on the first ones.
+                for (int i = _cursors.Count - 1; i >= 0; --i)
+                    _cursors[i].Dispose();
+                _cursors = null;
+            }
+        }
+
+        #endregion
+
+        #region mapper
+
+        public ValueMapper<TSrc, TDst> GetMapper<TSrc, TDst>()
+        {
+            if (typeof(TSrc) != typeof(DataFrame) || typeof(TDst) != typeof(DataFrame))
+                throw _env.Except($"Cannot create a mapper from {typeof(TSrc)} to {typeof(TDst)}, only DataFrame is allowed.");
+            ValueMapper<DataFrame, DataFrame> mapper = Predict;
+            return mapper as ValueMapper<TSrc, TDst>;
+        }
+
+        /// <summary>
+        /// Computes the predictions.
+        /// </summary>
+        /// <param name="src">input data</param>
+        /// <param name="dst">output, reused if not null</param>
+        public void Predict(in DataFrame src, ref DataFrame dst)
+        {
+            if (_cursors == null)
+                throw _env.Except("The mapper was disposed.");
+            if (dst is null)
+                dst = new DataFrame(_outputSchema, src.Length);
+            else if (!dst.CheckSharedSchema(_outputSchema))
+                throw _env.Except($"DataFrame does not share the same schema, expected {SchemaHelper.ToString(_outputSchema)}.");
+            dst.Resize(src.Length);
+
+            _inputView.Set(src);
+            for (int i = 0; i < src.Length; ++i)
+            {
+                for (int c = 0; c < _cursors.Count; ++c)
+                    _cursors[c].MoveNext();
+                _filler(dst, i);
+            }
+        }
+
+        #endregion
+
+        #region row adapters
+
+        /// <summary>
+        /// Exposes a row as a cursor which never ends.
+        /// The owner of the row is responsible for moving it.
+        /// </summary>
+        class RowCursor : DataViewRowCursor
+        {
+            readonly DataViewRow _row;
+
+            public RowCursor(DataViewRow row)
+            {
+                _row = row;
+            }
+
+            public override long Batch => _row.Batch;
+            public override long Position => _row.Position;
+            public override DataViewSchema Schema => _row.Schema;
+            public override ValueGetter<DataViewRowId> GetIdGetter() => _row.GetIdGetter();
+            public override bool IsColumnActive(DataViewSchema.Column col) => _row.IsColumnActive(col);
+            public override ValueGetter<TValue> GetGetter<TValue>(DataViewSchema.Column col) => _row.GetGetter<TValue>(col);
+            public override bool MoveNext() => true;
+
+            protected override void Dispose(bool disposing)
+            {
+                // The row is not owned.
+            }
+        }
+
+        /// <summary>
+        /// View on a row, every cursor returns the current row.
+        /// </summary>
+        class RowView : IDataView
+        {
+            readonly DataViewRow _row;
+
+            public RowView(DataViewRow row)
+            {
+                _row = row;
+            }
+
+            public bool CanShuffle => false;
+            public DataViewSchema Schema => _row.Schema;
+            public long? GetRowCount() => null;
+
+            public DataViewRowCursor GetRowCursor(IEnumerable<DataViewSchema.Column> columnsNeeded, Random rand = null)
+            {
+                return new RowCursor(_row);
+            }
+
+            public DataViewRowCursor[] GetRowCursorSet(IEnumerable<DataViewSchema.Column> columnsNeeded, int n, Random rand = null)
+            {
+                return new DataViewRowCursor[] { new RowCursor(_row) };
+            }
+        }
+
+        #endregion
+    }
+}
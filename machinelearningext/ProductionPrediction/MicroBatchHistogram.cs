@@ -0,0 +1,155 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Linq;
+using Microsoft.ML.Runtime;
+using Scikit.ML.DataManipulation;
+
+
+namespace Scikit.ML.ProductionPrediction
+{
+    /// <summary>
+    /// Thread-safe histogram with fixed bucket bounds.
+    /// Used by <see cref="MicroBatchPredictionServer"/> to report
+    /// queue latencies and batch sizes.
+    /// </summary>
+    public class MicroBatchHistogram
+    {
+        readonly double[] _bounds;
+        readonly long[] _counts;
+        readonly object _lock;
+        long _total;
+        double _sum;
+
+        /// <summary>
+        /// Constructor.
+        /// </summary>
+        /// <param name="bounds">upper bounds of every bucket (sorted),
+        /// a last bucket is added for values above the last bound</param>
+        public MicroBatchHistogram(double[] bounds)
+        {
+            if (bounds == null || bounds.Length == 0)
+                throw Contracts.Except("bounds cannot be empty.");
+            for (int i = 1; i < bounds.Length; ++i)
+                if (bounds[i] <= bounds[i - 1])
+                    throw Contracts.Except("bounds must be strictly increasing.");
+            _bounds = bounds.ToArray();
+            _counts = new long[bounds.Length + 1];
+            _lock = new object();
+        }
+
+        /// <summary>
+        /// Exponential bounds: <pre>start, start * factor, ..., start * factor^(n-1)</pre>.
+        /// </summary>
+        public static MicroBatchHistogram Exponential(double start, double factor, int n)
+        {
+            Contracts.Check(start > 0 && factor > 1 && n > 0, "start must be > 0, factor > 1 and n > 0.");
+            var bounds = new double[n];
+            bounds[0] = start;
+            for (int i = 1; i < n; ++i)
+                bounds[i] = bounds[i - 1] * factor;
+            return new MicroBatchHistogram(bounds);
+        }
+
+        /// <summary>
+        /// Number of added observations.
+        /// </summary>
+        public long Count
+        {
+            get
+            {
+                lock (_lock)
+                    return _total;
+            }
+        }
+
+        /// <summary>
+        /// Average of added observations.
+        /// </summary>
+        public double Mean
+        {
+            get
+            {
+                lock (_lock)
+                    return _total == 0 ? 0 : _sum / _total;
+            }
+        }
+
+        /// <summary>
+        /// Adds one observation.
+        /// </summary>
+        public void Add(double value)
+        {
+            int pos = Array.BinarySearch(_bounds, value);
+            if (pos < 0)
+                pos = ~pos;
+            lock (_lock)
+            {
+                ++_counts[pos];
+                _sum += value;
+                ++_total;
+            }
+        }
+
+        /// <summary>
+        /// Returns an approximation of a quantile (upper bound of the bucket
+        /// which contains it).
+        /// </summary>
+        public double Quantile(double q)
+        {
+            lock (_lock)
+            {
+                if (_total == 0)
+                    return 0;
+                long threshold = Math.Max(1, (long)Math.Ceiling(q * _total));
+                long cum = 0;
+                for (int i = 0; i < _counts.Length; ++i)
+                {
+                    cum += _counts[i];
+                    if (cum >= threshold)
+                        return i < _bounds.Length ? _bounds[i] : double.PositiveInfinity;
+                }
+                return double.PositiveInfinity;
+            }
+        }
+
+        /// <summary>
+        /// Removes every observation.
+        /// </summary>
+        public void Reset()
+        {
+            lock (_lock)
+            {
+                for (int i = 0; i < _counts.Length; ++i)
+                    _counts[i] = 0;
+                _sum = 0;
+                _total = 0;
+            }
+        }
+
+        /// <summary>
+        /// Returns the histogram as a DataFrame with columns
+        /// <pre>lower, upper, count</pre>.
+        /// </summary>
+        public DataFrame ToDataFrame()
+        {
+            var lower = new double[_counts.Length];
+            var upper = new double[_counts.Length];
+            var counts = new long[_counts.Length];
+            lock (_lock)
+            {
+                for (int i = 0; i < _counts.Length; ++i)
+                {
+                    lower[i] = i == 0 ? double.NegativeInfinity : _bounds[i - 1];
+                    upper[i] = i < _bounds.Length ? _bounds[i] : double.PositiveInfinity;
+                    counts[i] = _counts[i];
+                }
+            }
+            var df = new DataFrame();
+            df.AddColumn("lower", lower);
+            df.AddColumn("upper", upper);
+            df.AddColumn("count", counts);
+            return df;
+        }
+    }
+}
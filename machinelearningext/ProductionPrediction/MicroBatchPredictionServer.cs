@@ -0,0 +1,380 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Concurrent;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Net;
+using System.Text;
+using System.Threading;
+using System.Threading.Tasks;
+using Microsoft.ML;
+using Microsoft.ML.Data;
+using Microsoft.ML.Runtime;
+using Scikit.ML.DataManipulation;
+
+
+namespace Scikit.ML.ProductionPrediction
+{
+    /// <summary>
+    /// Local prediction server which coalesces single-row requests
+    /// into micro-batches. A batch is scored as soon as it contains
+    /// <i>maxBatchSize</i> rows or when the oldest request waited
+    /// <i>maxDelay</i> milliseconds. Every batch goes through a single
+    /// call to the value mapper, the per-call overhead of
+    /// <see cref="ValueMapperDataFrameFromTransform"/> is paid once per batch.
+    /// Only one thread calls the mapper, which does not need to be thread-safe.
+    /// Requests can be submitted in process (<see cref="PredictAsync"/>) or through
+    /// a local HTTP endpoint (<see cref="StartHttp"/>): a POST request sends rows
+    /// as CSV (with header) and receives the predictions as CSV,
+    /// a GET request on <pre>/stats</pre> returns the statistics.
+    /// </summary>
+    public class MicroBatchPredictionServer : IDisposable
+    {
+        #region members
+
+        class Request
+        {
+            public DataFrame Data;
+            public double Enqueued;
+            public TaskCompletionSource<DataFrame> Result;
+        }
+
+        readonly IHost _host;
+        readonly ValueMapper<DataFrame, DataFrame> _mapper;
+        readonly int _maxBatchSize;
+        readonly double _maxDelay;
+        readonly BlockingCollection<Request> _queue;
+        readonly System.Diagnostics.Stopwatch _clock;
+        readonly MicroBatchHistogram _queueLatency;
+        readonly MicroBatchHistogram _batchSize;
+        readonly MicroBatchHistogram _scoringTime;
+        readonly Thread _batchThread;
+
+        HttpListener _listener;
+        Thread _httpThread;
+        char _sep;
+        DataViewType[] _dtypes;
+
+        #endregion
+
+        #region constructors
+
+        /// <summary>
+        /// Constructor.
+        /// </summary>
+        /// <param name="env">environment</param>
+        /// <param name="mapper">mapper from a dataframe to a dataframe, the output must have
+        /// the same number of rows as the input, it is never called from two threads at the same time</param>
+        /// <param name="maxBatchSize">maximum number of rows in a batch</param>
+        /// <param name="maxDelay">maximum time (milliseconds) a request waits in the queue
+        /// before its batch is scored</param>
+        public MicroBatchPredictionServer(IHostEnvironment env, ValueMapper<DataFrame, DataFrame> mapper,
+                                          int maxBatchSize = 64, double maxDelay = 2)
+        {
+            Contracts.CheckValue(env, nameof(env));
+            _host = env.Register("MicroBatchPredictionServer");
+            _host.CheckValue(mapper, nameof(mapper));
+            _host.CheckUserArg(maxBatchSize > 0, nameof(maxBatchSize), "must be > 0");
+            _host.CheckUserArg(maxDelay >= 0, nameof(maxDelay), "must be >= 0");
+            _mapper = mapper;
+            _maxBatchSize = maxBatchSize;
+            _maxDelay = maxDelay;
+            _queue = new BlockingCollection<Request>();
+            _clock = System.Diagnostics.Stopwatch.StartNew();
+            _queueLatency = MicroBatchHistogram.Exponential(0.01, 2, 20);
+            _scoringTime = MicroBatchHistogram.Exponential(0.01, 2, 20);
+            _batchSize = MicroBatchHistogram.Exponential(1, 2, 16);
+            _batchThread = new Thread(BatchLoop) { IsBackground = true, Name = "MicroBatchPredictionServer" };
+            _batchThread.Start();
+        }
+
+        /// <summary>
+        /// Constructor.
+        /// </summary>
+        /// <param name="env">environment</param>
+        /// <param name="engine">prediction engine</param>
+        /// <param name="maxBatchSize">maximum number of rows in a batch</param>
+        /// <param name="maxDelay">maximum time (milliseconds) a request waits in the queue
+        /// before its batch is scored</param>
+        public MicroBatchPredictionServer(IHostEnvironment env, PredictionFunctionDataFrame engine,
+                                          int maxBatchSize = 64, double maxDelay = 2) :
+            this(env, (in DataFrame src, ref DataFrame dst) => engine.Predict(src, ref dst),
+                 maxBatchSize, maxDelay)
+        {
+        }
+
+        /// <summary>
+        /// Stops the HTTP endpoint, scores the pending requests and stops the batching thread.
+        /// </summary>
+        public void Dispose()
+        {
+            StopHttp();
+            if (!_queue.IsAddingCompleted)
+            {
+                _queue.CompleteAdding();
+                _batchThread.Join();
+            }
+        }
+
+        #endregion
+
+        #region statistics
+
+        /// <summary>
+        /// Time spent in the queue by every request (milliseconds).
+        /// </summary>
+        public MicroBatchHistogram QueueLatency => _queueLatency;
+
+        /// <summary>
+        /// Number of rows in every scored batch.
+        /// </summary>
+        public MicroBatchHistogram BatchSize => _batchSize;
+
+        /// <summary>
+        /// Time spent in the value mapper for every batch (milliseconds).
+        /// </summary>
+        public MicroBatchHistogram ScoringTime => _scoringTime;
+
+        /// <summary>
+        /// Returns a summary of the statistics as a DataFrame (columns <pre>name, value</pre>).
+        /// </summary>
+        public DataFrame GetStatistics()
+        {
+            var stats = new Dictionary<string, double>()
+            {
+                ["batches"] = _batchSize.Count,
+                ["requests"] = _queueLatency.Count,
+                ["pending"] = _queue.Count,
+                ["batch_size_mean"] = _batchSize.Mean,
+                ["batch_size_p50"] = _batchSize.Quantile(0.5),
+                ["batch_size_p99"] = _batchSize.Quantile(0.99),
+                ["queue_latency_ms_mean"] = _queueLatency.Mean,
+                ["queue_latency_ms_p50"] = _queueLatency.Quantile(0.5),
+                ["queue_latency_ms_p99"] = _queueLatency.Quantile(0.99),
+                ["scoring_time_ms_mean"] = _scoringTime.Mean,
+                ["scoring_time_ms_p99"] = _scoringTime.Quantile(0.99),
+            };
+            return DataFrameIO.Convert(stats, "name", "value");
+        }
+
+        #endregion
+
+        #region prediction
+
+        /// <summary>
+        /// Queues one request (usually one row) and returns a task
+        /// which completes when its batch is scored.
+        /// </summary>
+        public Task<DataFrame> PredictAsync(DataFrame data)
+        {
+            _host.CheckValue(data, nameof(data));
+            var req = new Request()
+            {
+                Data = data,
+                Enqueued = _clock.Elapsed.TotalMilliseconds,
+                Result = new TaskCompletionSource<DataFrame>(TaskCreationOptions.RunContinuationsAsynchronously)
+            };
+            if (_queue.IsAddingCompleted)
+                throw _host.Except("The server was stopped.");
+            try
+            {
+                _queue.Add(req);
+            }
+            catch (InvalidOperationException)
+            {
+                // Stop was called between the check and the insertion.
+                throw _host.Except("The server was stopped.");
+            }
+            return req.Result.Task;
+        }
+
+        /// <summary>
+        /// Queues one request and waits for the predictions.
+        /// </summary>
+        public DataFrame Predict(DataFrame data)
+        {
+            return PredictAsync(data).GetAwaiter().GetResult();
+        }
+
+        void BatchLoop()
+        {
+            var batch = new List<Request>();
+            Request req;
+            while (true)
+            {
+                try
+                {
+                    req = _queue.Take();
+                }
+                catch (InvalidOperationException)
+                {
+                    // CompleteAdding was called and the queue is empty.
+                    break;
+                }
+
+                batch.Add(req);
+                int rows = req.Data.Length;
+                double deadline = req.Enqueued + _maxDelay;
+                while (rows < _maxBatchSize)
+                {
+                    int wait = Math.Max(0, (int)Math.Ceiling(deadline - _clock.Elapsed.TotalMilliseconds));
+                    if (!_queue.TryTake(out req, wait))
+                        break;
+                    batch.Add(req);
+                    rows += req.Data.Length;
+                }
+
+                ScoreBatch(batch, rows);
+                batch.Clear();
+            }
+        }
+
+        void ScoreBatch(List<Request> batch, int rows)
+        {
+            double start = _clock.Elapsed.TotalMilliseconds;
+            foreach (var r in batch)
+                _queueLatency.Add(start - r.Enqueued);
+            _batchSize.Add(rows);
+
+            try
+            {
+                var input = batch.Count == 1 ? batch[0].Data : DataFrame.Concat(batch.Select(r => r.Data));
+                DataFrame output = null;
+                _mapper(in input, ref output);
+                _scoringTime.Add(_clock.Elapsed.TotalMilliseconds - start);
+                if (output.Length != rows)
+                    throw _host.Except($"The mapper returned {output.Length} rows for {rows} rows.");
+
+                if (batch.Count == 1)
+                    batch[0].Result.SetResult(output);
+                else
+                {
+                    var columns = Enumerable.Range(0, output.ColumnCount).ToArray();
+                    int offset = 0;
+                    foreach (var r in batch)
+                    {
+                        r.Result.SetResult(output.Copy(Enumerable.Range(offset, r.Data.Length), columns));
+                        offset += r.Data.Length;
+                    }
+                }
+            }
+            catch (Exception e)
+            {
+                // One bad request fails the whole batch, the server keeps running.
+                foreach (var r in batch)
+                    r.Result.TrySetException(e);
+            }
+        }
+
+        #endregion
+
+        #region http
+
+        /// <summary>
+        /// Starts a local HTTP endpoint.
+        /// </summary>
+        /// <param name="prefix">listened prefix, example: <pre>http://localhost:8080/</pre></param>
+        /// <param name="sep">column separator of the posted CSV</param>
+        /// <param name="dtypes">column types of the posted CSV, the types are guessed if null,
+        /// they should be specified to ensure every request shares the same schema</param>
+        public void StartHttp(string prefix = "http://localhost:8080/", char sep = ',', DataViewType[] dtypes = null)
+        {
+            if (_listener != null)
+                throw _host.Except("The HTTP endpoint is already started.");
+            _sep = sep;
+            _dtypes = dtypes;
+            _listener = new HttpListener();
+            _listener.Prefixes.Add(prefix);
+            _listener.Start();
+            _httpThread = new Thread(HttpLoop) { IsBackground = true, Name = "MicroBatchPredictionServerHttp" };
+            _httpThread.Start();
+        }
+
+        /// <summary>
+        /// Stops the HTTP endpoint.
+        /// </summary>
+        public void StopHttp()
+        {
+            if (_listener == null)
+                return;
+            _listener.Close();
+            _httpThread.Join();
+            _listener = null;
+            _httpThread = null;
+        }
+
+        void HttpLoop()
+        {
+            while (true)
+            {
+                HttpListenerContext context;
+                try
+                {
+                    context = _listener.GetContext();
+                }
+                catch (HttpListenerException)
+                {
+                    break;
+                }
+                catch (ObjectDisposedException)
+                {
+                    break;
+                }
+                catch (InvalidOperationException)
+                {
+                    break;
+                }
+                Task.Run(() => HandleHttpRequest(context));
+            }
+        }
+
+        async Task HandleHttpRequest(HttpListenerContext context)
+        {
+            int status = 200;
+            string answer;
+            try
+            {
+                var request = context.Request;
+                if (request.HttpMethod == "GET" && request.Url.AbsolutePath.TrimEnd('/').EndsWith("/stats"))
+                    answer = GetStatistics().ToString();
+                else if (request.HttpMethod == "POST")
+                {
+                    string body;
+                    using (var reader = new StreamReader(request.InputStream, request.ContentEncoding ?? Encoding.UTF8))
+                        body = reader.ReadToEnd();
+                    var data = DataFrameIO.ReadStr(body, sep: _sep, dtypes: _dtypes);
+                    var pred = await PredictAsync(data);
+                    answer = pred.ToString();
+                }
+                else
+                {
+                    status = 404;
+                    answer = "Unknown request, use POST to predict or GET /stats.";
+                }
+            }
+            catch (Exception e)
+            {
+                status = 500;
+                answer = e.Message;
+            }
+
+            try
+            {
+                var buffer = Encoding.UTF8.GetBytes(answer);
+                context.Response.StatusCode = status;
+                context.Response.ContentType = "text/csv; charset=utf-8";
+                context.Response.ContentLength64 = buffer.Length;
+                context.Response.OutputStream.Write(buffer, 0, buffer.Length);
+                context.Response.Close();
+            }
+            catch (HttpListenerException)
+            {
+                // The client is gone.
+            }
+        }
+
+        #endregion
+    }
+}
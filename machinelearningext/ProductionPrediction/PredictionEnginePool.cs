@@ -0,0 +1,284 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Concurrent;
+using System.IO;
+using System.Threading;
+using Microsoft.ML;
+using Microsoft.ML.Data;
+using Microsoft.ML.Runtime;
+using Microsoft.ML.Model;
+
+
+namespace Scikit.ML.ProductionPrediction
+{
+    /// <summary>
+    /// Pool of prediction engines. Engines such as <see cref="ValueMapperPredictionEngine{TRowValue}"/>
+    /// or <see cref="ValueMapperPredictionEngineFloat"/> hold one cursor and a mutable row,
+    /// they cannot be shared across threads. The pool creates them on demand from a factory
+    /// (usually sharing the same scorer, see <see cref="PredictionEnginePool"/>),
+    /// hands them out through a <see cref="ConcurrentBag{T}"/> which favors the engine
+    /// last returned by the same thread, and trims the engines which were not needed
+    /// since the last trimming. Renting and returning an engine does not take any lock
+    /// unless the pool needs to grow.
+    /// </summary>
+    public class PredictionEnginePool<TEngine> : IDisposable
+        where TEngine : class, IDisposable
+    {
+        readonly Func<TEngine> _factory;
+        readonly ConcurrentBag<TEngine> _idle;
+        readonly object _factoryLock;
+        readonly int _minSize;
+        readonly int _maxSize;
+        readonly long _trimInterval;
+        readonly System.Diagnostics.Stopwatch _clock;
+        int _created;
+        int _inUse;
+        int _peakInUse;
+        long _lastTrim;
+        bool _disposed;
+
+        /// <summary>
+        /// Constructor.
+        /// </summary>
+        /// <param name="factory">creates a new engine, it is never called by two threads at the same time</param>
+        /// <param name="minSize">number of engines created immediately and never trimmed</param>
+        /// <param name="maxSize">maximum number of engines, callers wait for an engine to be returned
+        /// when this number is reached, default is the number of processors</param>
+        /// <param name="trimInterval">engines unused during this period (milliseconds) are disposed,
+        /// 0 to disable automatic trimming</param>
+        public PredictionEnginePool(Func<TEngine> factory, int minSize = 0, int maxSize = -1, long trimInterval = 60000)
+        {
+            Contracts.CheckValue(factory, nameof(factory));
+            if (maxSize <= 0)
+                maxSize = Environment.ProcessorCount;
+            Contracts.CheckParam(minSize >= 0 && minSize <= maxSize, nameof(minSize), "must be in [0, maxSize]");
+            Contracts.CheckParam(trimInterval >= 0, nameof(trimInterval), "must be >= 0");
+            _factory = factory;
+            _idle = new ConcurrentBag<TEngine>();
+            _factoryLock = new object();
+            _minSize = minSize;
+            _maxSize = maxSize;
+            _trimInterval = trimInterval;
+            _clock = System.Diagnostics.Stopwatch.StartNew();
+            for (int i = 0; i < minSize; ++i)
+            {
+                _idle.Add(_factory());
+                ++_created;
+            }
+        }
+
+        /// <summary>
+        /// Number of created engines (rented or idle).
+        /// </summary>
+        public int Count => Volatile.Read(ref _created);
+
+        /// <summary>
+        /// Number of rented engines.
+        /// </summary>
+        public int InUse => Volatile.Read(ref _inUse);
+
+        /// <summary>
+        /// Maximum number of engines.
+        /// </summary>
+        public int MaxSize => _maxSize;
+
+        /// <summary>
+        /// Returns an idle engine or creates a new one.
+        /// The engine must be given back with <see cref="Return"/>.
+        /// </summary>
+        public TEngine Rent()
+        {
+            if (_disposed)
+                throw Contracts.Except("The pool was disposed.");
+            int inUse = Interlocked.Increment(ref _inUse);
+            int peak = Volatile.Read(ref _peakInUse);
+            while (inUse > peak)
+            {
+                int prev = Interlocked.CompareExchange(ref _peakInUse, inUse, peak);
+                if (prev == peak)
+                    break;
+                peak = prev;
+            }
+
+            TEngine engine;
+            if (_idle.TryTake(out engine))
+                return engine;
+            return Grow();
+        }
+
+        TEngine Grow()
+        {
+            var spin = new SpinWait();
+            TEngine engine;
+            while (true)
+            {
+                if (Interlocked.Increment(ref _created) <= _maxSize)
+                {
+                    try
+                    {
+                        // Creating an engine applies the transforms on a new view,
+                        // the shared transforms are not meant to be used by two threads at this stage.
+                        lock (_factoryLock)
+                            return _factory();
+                    }
+                    catch
+                    {
+                        Interlocked.Decrement(ref _created);
+                        Interlocked.Decrement(ref _inUse);
+                        throw;
+                    }
+                }
+                Interlocked.Decrement(ref _created);
+                if (_idle.TryTake(out engine))
+                    return engine;
+                spin.SpinOnce();
+            }
+        }
+
+        /// <summary>
+        /// Gives back an engine obtained with <see cref="Rent"/>.
+        /// </summary>
+        public void Return(TEngine engine)
+        {
+            Contracts.CheckValue(engine, nameof(engine));
+            _idle.Add(engine);
+            Interlocked.Decrement(ref _inUse);
+            if (_trimInterval > 0)
+            {
+                long last = Interlocked.Read(ref _lastTrim);
+                long now = _clock.ElapsedMilliseconds;
+                if (now - last > _trimInterval && Interlocked.CompareExchange(ref _lastTrim, now, last) == last)
+                    Trim();
+            }
+        }
+
+        /// <summary>
+        /// Rents an engine, calls a function and returns the engine.
+        /// </summary>
+        public TResult Run<TResult>(Func<TEngine, TResult> fct)
+        {
+            var engine = Rent();
+            try
+            {
+                return fct(engine);
+            }
+            finally
+            {
+                Return(engine);
+            }
+        }
+
+        /// <summary>
+        /// Disposes the idle engines beyond the peak usage observed
+        /// since the previous call (and beyond <i>minSize</i>).
+        /// </summary>
+        public void Trim()
+        {
+            int keep = Math.Max(_minSize, Interlocked.Exchange(ref _peakInUse, Volatile.Read(ref _inUse)));
+            TEngine engine;
+            while (Volatile.Read(ref _created) > keep && _idle.TryTake(out engine))
+            {
+                Interlocked.Decrement(ref _created);
+                engine.Dispose();
+            }
+        }
+
+        /// <summary>
+        /// Disposes every idle engine. Rented engines must be disposed by the caller.
+        /// </summary>
+        public void Dispose()
+        {
+            _disposed = true;
+            TEngine engine;
+            while (_idle.TryTake(out engine))
+            {
+                Interlocked.Decrement(ref _created);
+                engine.Dispose();
+            }
+        }
+    }
+
+    /// <summary>
+    /// Creates pools of prediction engines which share the same model.
+    /// The predictor and the transforms are loaded once, every engine
+    /// only owns its cursor and its input row.
+    /// </summary>
+    public static class PredictionEnginePool
+    {
+        /// <summary>
+        /// Loads a model and returns a scorer which can be shared by many engines.
+        /// </summary>
+        /// <param name="env">environment</param>
+        /// <param name="modelStream">stream</param>
+        /// <param name="features">features column</param>
+        public static IDataScorerTransform LoadScorer<TRowValue>(IHostEnvironment env, Stream modelStream,
+                                                                  string features = "Features")
+            where TRowValue : class
+        {
+            Contracts.CheckValue(env, nameof(env));
+            var view = DataViewConstructionUtils.CreateFromEnumerable(env, new TRowValue[0]);
+
+            long modelPosition = modelStream.Position;
+            var predictor = ModelFileUtils.LoadPredictorOrNull(env, modelStream);
+            if (predictor == null)
+                throw env.Except("Unable to load a model.");
+            modelStream.Seek(modelPosition, SeekOrigin.Begin);
+            var transforms = ModelFileUtils.LoadTransforms(env, view, modelStream);
+            if (transforms == null)
+                throw env.Except("Unable to load a model.");
+
+            var data = env.CreateExamples(transforms, features);
+            if (data == null)
+                throw env.Except("Cannot create rows.");
+            var scorer = env.CreateDefaultScorer(data, predictor);
+            if (scorer == null)
+                throw env.Except("Cannot create a scorer.");
+            return scorer;
+        }
+
+        /// <summary>
+        /// Creates a pool of <see cref="ValueMapperPredictionEngine{TRowValue}"/>.
+        /// </summary>
+        /// <param name="env">environment</param>
+        /// <param name="modelName">filename</param>
+        /// <param name="features">features column</param>
+        /// <param name="minSize">minimum number of engines</param>
+        /// <param name="maxSize">maximum number of engines (-1 for the number of processors)</param>
+        public static PredictionEnginePool<ValueMapperPredictionEngine<TRowValue>> Create<TRowValue>(
+                            IHostEnvironment env, string modelName, string features = "Features",
+                            int minSize = 0, int maxSize = -1)
+            where TRowValue : class, IClassWithGetter<TRowValue>, new()
+        {
+            IDataScorerTransform scorer;
+            using (var st = File.OpenRead(modelName))
+                scorer = LoadScorer<TRowValue>(env, st, features);
+            return new PredictionEnginePool<ValueMapperPredictionEngine<TRowValue>>(
+                            () => new ValueMapperPredictionEngine<TRowValue>(env, scorer),
+                            minSize: minSize, maxSize: maxSize);
+        }
+
+        /// <summary>
+        /// Creates a pool of <see cref="ValueMapperPredictionEngineFloat"/>.
+        /// </summary>
+        /// <param name="env">environment</param>
+        /// <param name="modelName">filename</param>
+        /// <param name="output">name of the output column</param>
+        /// <param name="outputIsFloat">output is a float (true) or a vector of floats (false)</param>
+        /// <param name="features">features column</param>
+        /// <param name="minSize">minimum number of engines</param>
+        /// <param name="maxSize">maximum number of engines (-1 for the number of processors)</param>
+        public static PredictionEnginePool<ValueMapperPredictionEngineFloat> CreateFloat(
+                            IHostEnvironment env, string modelName, string output = "Probability",
+                            bool outputIsFloat = true, string features = "Features",
+                            int minSize = 0, int maxSize = -1)
+        {
+            IDataScorerTransform scorer;
+            using (var st = File.OpenRead(modelName))
+                scorer = LoadScorer<FloatVectorInput>(env, st, features);
+            return new PredictionEnginePool<ValueMapperPredictionEngineFloat>(
+                            () => new ValueMapperPredictionEngineFloat(env, scorer, output, outputIsFloat, 1, features),
+                            minSize: minSize, maxSize: maxSize);
+        }
+    }
+}
@@ -29,8 +29,8 @@ namespace Scikit.ML.ProductionPrediction
         readonly IHostEnvironment _env;
         readonly IDataView _transforms;
         readonly IPredictor _predictor;
-        readonly ValueMapper<VBuffer<float>, float> _mapper;
-        readonly ValueMapper<VBuffer<float>, VBuffer<float>> _mapperVector;
+        ValueMapper<VBuffer<float>, float> _mapper;
+        ValueMapper<VBuffer<float>, VBuffer<float>> _mapperVector;
         ValueMapperFromTransformFloat<VBuffer<float>> _valueMapper;
 
         public ValueMapperPredictionEngineFloat()
@@ -88,7 +88,31 @@ namespace Scikit.ML.ProductionPrediction
             var scorer = _env.CreateDefaultScorer(data, _predictor);
             if (scorer == null)
                 throw _env.Except("Cannot create a scorer.");
+            _CreateMapper(scorer, output, outputIsFloat, conc, features);
+        }
 
+        /// <summary>
+        /// Constructor, the scorer can be shared by several engines
+        /// (see <see cref="PredictionEnginePool"/>).
+        /// </summary>
+        /// <param name="env">environment</param>
+        /// <param name="scorer">scorer</param>
+        /// <param name="output">name of the output column</param>
+        /// <param name="outputIsFloat">output is a gloat (true) or a vector of floats (false)</param>
+        /// <param name="conc">number of concurrency threads</param>
+        /// <param name="features">features name</param>
+        public ValueMapperPredictionEngineFloat(IHostEnvironment env, IDataScorerTransform scorer,
+                string output = "Probability", bool outputIsFloat = true, int conc = 1,
+                string features = "Features")
+        {
+            _env = env;
+            if (_env == null)
+                throw Contracts.Except("env must not be null");
+            _CreateMapper(scorer, output, outputIsFloat, conc, features);
+        }
+
+        void _CreateMapper(IDataScorerTransform scorer, string output, bool outputIsFloat, int conc, string features)
+        {
             _valueMapper = new ValueMapperFromTransformFloat<VBuffer<float>>(_env,
                                 scorer, features, output, conc: conc);
             if (_valueMapper == null)
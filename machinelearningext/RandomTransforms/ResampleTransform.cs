@@ -26,6 +26,10 @@ namespace Scikit.ML.RandomTransforms
 {
     /// <summary>
     /// Randomly multiplies rows.
+    /// If <i>hashed</i> is true, the number of copies of a row is drawn from a hash
+    /// of (seed, row id) and does not require any cache. If <i>replicas</i> is positive,
+    /// rows are not multiplied anymore, the transform adds a vector column with the number of copies
+    /// of every row in every bootstrap replica, all replicas are produced in a single pass.
     /// </summary>
     public class ResampleTransform : ADataTransform, IDataTransform
     {
@@ -39,8 +43,8 @@ namespace Scikit.ML.RandomTransforms
         {
             return new VersionInfo(
                 modelSignature: "RESAMPLE",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,      // hashed, replicas
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(ResampleTransform).Assembly.FullName);
@@ -69,6 +73,17 @@ namespace Scikit.ML.RandomTransforms
             [Argument(ArgumentType.AtMostOnce, HelpText = "Class to resample (null for all).", ShortName = "cl")]
             public string classValue = null;
 
+            [Argument(ArgumentType.AtMostOnce, ShortName = "h", HelpText = "Draws the number of copies of a row from a hash of (seed, row id). " +
+                "Every run through the view returns the same results without any cache.")]
+            public bool hashed = false;
+
+            [Argument(ArgumentType.AtMostOnce, ShortName = "rep", HelpText = "Number of bootstrap replicas. If > 0, rows are not multiplied, " +
+                "a vector column contains the number of copies of every row in every replica (hashed mode).")]
+            public int replicas = 0;
+
+            [Argument(ArgumentType.AtMostOnce, ShortName = "w", HelpText = "Name of the column which contains the number of copies for every replica.")]
+            public string weightColumn = "BootstrapWeights";
+
             public void Write(ModelSaveContext ctx, IHost host)
             {
                 ctx.Writer.Write(lambda);
@@ -76,6 +91,9 @@ namespace Scikit.ML.RandomTransforms
                 ctx.Writer.Write(cache ? 1 : 0);
                 ctx.Writer.Write(string.IsNullOrEmpty(column) ? string.Empty : column);
                 ctx.Writer.Write(string.IsNullOrEmpty(classValue) ? string.Empty : classValue);
+                ctx.Writer.Write(hashed ? 1 : 0);
+                ctx.Writer.Write(replicas);
+                ctx.Writer.Write(string.IsNullOrEmpty(weightColumn) ? string.Empty : weightColumn);
             }
 
             public void Read(ModelLoadContext ctx, IHost host)
@@ -87,6 +105,17 @@ namespace Scikit.ML.RandomTransforms
                 cache = ctx.Reader.ReadInt32() == 1;
                 column = ctx.Reader.ReadString();
                 classValue = ctx.Reader.ReadString();
+                if (ctx.Header.ModelVerWritten >= 0x00010002)
+                {
+                    hashed = ctx.Reader.ReadInt32() == 1;
+                    replicas = ctx.Reader.ReadInt32();
+                    weightColumn = ctx.Reader.ReadString();
+                }
+                else
+                {
+                    hashed = false;
+                    replicas = 0;
+                }
             }
         }
 
@@ -98,6 +127,12 @@ namespace Scikit.ML.RandomTransforms
         Arguments _args;
         IHost _host;
         Dictionary<DataViewRowId, int> _cacheReplica;
+        DataViewSchema _schema;
+
+        /// <summary>
+        /// The number of copies is drawn from a hash, no cache is needed.
+        /// </summary>
+        bool IsHashed => _args.hashed || _args.replicas > 0;
 
         #endregion
 
@@ -110,6 +145,7 @@ namespace Scikit.ML.RandomTransforms
             _host.CheckValue(args, "args");                 // Checks values are valid.
             _host.CheckValue(input, "input");
             _host.Check(args.lambda > 0, "lambda must be > 0");
+            _host.Check(args.replicas >= 0, "replicas must be >= 0");
             _input = input;
             _args = args;
             _cacheReplica = null;
@@ -120,7 +156,10 @@ namespace Scikit.ML.RandomTransforms
                 if (string.IsNullOrEmpty(_args.classValue))
                     throw _host.Except("Class value cannot be null.");
             }
+            if (_args.replicas > 0 && string.IsNullOrEmpty(_args.weightColumn))
+                throw _host.Except("weightColumn cannot be empty if replicas > 0.");
 
+            _schema = CreateSchema();
             _transform = CreateTemplatedTransform();
         }
 
@@ -143,6 +182,7 @@ namespace Scikit.ML.RandomTransforms
             _args = new Arguments();
             _args.Read(ctx, _host);
             _cacheReplica = null;
+            _schema = CreateSchema();
             _transform = CreateTemplatedTransform();
         }
 
@@ -160,12 +200,22 @@ namespace Scikit.ML.RandomTransforms
 
         #region IDataTransform API
 
-        public DataViewSchema Schema { get { return Source.Schema; } }
+        public DataViewSchema Schema { get { return _schema; } }
+
+        DataViewSchema CreateSchema()
+        {
+            if (_args.replicas <= 0)
+                return Source.Schema;
+            return ExtendedSchema.Create(new ExtendedSchema(Source.Schema, new[] { _args.weightColumn },
+                                         new[] { new VectorDataViewType(NumberDataViewType.Single, _args.replicas) }));
+        }
 
         public bool CanShuffle { get { return true; } }
         public long? GetRowCount()
         {
             _host.AssertValue(Source, "_input");
+            if (_args.replicas > 0)
+                return Source.GetRowCount();
             if (_cacheReplica != null)
                 return _cacheReplica.Values.Sum();
             else
@@ -180,10 +230,13 @@ namespace Scikit.ML.RandomTransforms
         private DataViewRowCursor GetRowCursor(IEnumerable<DataViewSchema.Column> columnsNeeded, Random rand,
                                                DelegateGetRowCursor getterCursor)
         {
+            if (_args.replicas > 0)
+                return GetWeightsCursors(columnsNeeded, cols => new[] { getterCursor(cols, rand) })[0];
+
             int classColumn = -1;
             if (!string.IsNullOrEmpty(_args.column))
                 classColumn = SchemaHelper.GetColumnIndex(_input.Schema, _args.column);
-            if (_args.cache)
+            if (_args.cache && !IsHashed)
                 LoadCache(rand);
             else
                 Contracts.Assert(_cacheReplica == null);
@@ -192,7 +245,7 @@ namespace Scikit.ML.RandomTransforms
             if (classColumn == -1)
                 return new ResampleCursor<float>(this, cursor, columnsNeeded, _args.lambda,
                     _args.seed, rand, _cacheReplica, SchemaHelper._dc(classColumn, cursor),
-                    float.NaN);
+                    float.NaN, IsHashed);
 
             var newColumns = columnsNeeded.ToList();
             newColumns.Add(Schema.Where(c => c.Index == classColumn).First());
@@ -206,26 +259,26 @@ namespace Scikit.ML.RandomTransforms
                         throw _host.Except("Unable to parse '{0}'.", _args.classValue);
                     return new ResampleCursor<bool>(this, cursor, newColumns,
                         _args.lambda, _args.seed, rand, _cacheReplica,
-                        SchemaHelper._dc(classColumn, cursor), clbool);
+                        SchemaHelper._dc(classColumn, cursor), clbool, IsHashed);
                 case DataKind.UInt32:
                     uint cluint;
                     if (!uint.TryParse(_args.classValue, out cluint))
                         throw _host.Except("Unable to parse '{0}'.", _args.classValue);
                     return new ResampleCursor<uint>(this, cursor, newColumns,
                         _args.lambda, _args.seed, rand, _cacheReplica,
-                        SchemaHelper._dc(classColumn, cursor), cluint);
+                        SchemaHelper._dc(classColumn, cursor), cluint, IsHashed);
                 case DataKind.Single:
                     float clfloat;
                     if (!float.TryParse(_args.classValue, out clfloat))
                         throw _host.Except("Unable to parse '{0}'.", _args.classValue);
                     return new ResampleCursor<float>(this, cursor, newColumns,
                         _args.lambda, _args.seed, rand, _cacheReplica,
-                        SchemaHelper._dc(classColumn, cursor), clfloat);
+                        SchemaHelper._dc(classColumn, cursor), clfloat, IsHashed);
                 case DataKind.String:
                     var cltext = new ReadOnlyMemory<char>(_args.classValue.ToCharArray());
                     return new ResampleCursor<ReadOnlyMemory<char>>(this, cursor, newColumns,
                         _args.lambda, _args.seed, rand, _cacheReplica,
-                        SchemaHelper._dc(classColumn, cursor), cltext);
+                        SchemaHelper._dc(classColumn, cursor), cltext, IsHashed);
                 default:
                     throw _host.Except("Unsupported type '{0}'", type);
             }
@@ -233,10 +286,13 @@ namespace Scikit.ML.RandomTransforms
 
         public DataViewRowCursor[] GetRowCursorSet(IEnumerable<DataViewSchema.Column> columnsNeeded, int n, Random rand = null)
         {
+            if (_args.replicas > 0)
+                return GetWeightsCursors(columnsNeeded, cols => _input.GetRowCursorSet(cols, n, rand));
+
             int classColumn = -1;
             if (!string.IsNullOrEmpty(_args.column))
                 classColumn = SchemaHelper.GetColumnIndex(_input.Schema, _args.column);
-            if (_args.cache)
+            if (_args.cache && !IsHashed)
                 LoadCache(rand);
             else
                 Contracts.Assert(_cacheReplica == null);
@@ -260,26 +316,26 @@ namespace Scikit.ML.RandomTransforms
                         throw _host.Except("Unable to parse '{0}'.", _args.classValue);
                     return cursors.Select(c => new ResampleCursor<bool>(this, c, newColumns,
                         _args.lambda, _args.seed, rand, _cacheReplica,
-                        SchemaHelper._dc(classColumn, c), clbool)).ToArray();
+                        SchemaHelper._dc(classColumn, c), clbool, IsHashed)).ToArray();
                 case DataKind.UInt32:
                     uint cluint;
                     if (!uint.TryParse(_args.classValue, out cluint))
                         throw _host.Except("Unable to parse '{0}'.", _args.classValue);
                     return cursors.Select(c => new ResampleCursor<uint>(this, c, newColumns,
                         _args.lambda, _args.seed, rand, _cacheReplica,
-                        SchemaHelper._dc(classColumn, c), cluint)).ToArray();
+                        SchemaHelper._dc(classColumn, c), cluint, IsHashed)).ToArray();
                 case DataKind.Single:
                     float clfloat;
                     if (!float.TryParse(_args.classValue, out clfloat))
                         throw _host.Except("Unable to parse '{0}'.", _args.classValue);
                     return cursors.Select(c => new ResampleCursor<float>(this, c, newColumns,
                         _args.lambda, _args.seed, rand, _cacheReplica,
-                        SchemaHelper._dc(classColumn, c), clfloat)).ToArray();
+                        SchemaHelper._dc(classColumn, c), clfloat, IsHashed)).ToArray();
                 case DataKind.String:
                     var cltext = new ReadOnlyMemory<char>(_args.classValue.ToCharArray());
                     return cursors.Select(c => new ResampleCursor<ReadOnlyMemory<char>>(this, c, newColumns,
                         _args.lambda, _args.seed, rand, _cacheReplica,
-                        SchemaHelper._dc(classColumn, c), cltext)).ToArray();
+                        SchemaHelper._dc(classColumn, c), cltext, IsHashed)).ToArray();
                 default:
                     throw _host.Except("Unsupported type '{0}'", type);
             }
@@ -301,6 +357,104 @@ namespace Scikit.ML.RandomTransforms
             return k - 1;
         }
 
+        /// <summary>
+        /// Draws a number from a Poisson law with a single uniform number
+        /// obtained from a hash of (seed, row id, replica). The result only depends
+        /// on these values, it does not depend on the order the rows are processed.
+        /// </summary>
+        public static int HashPoisson(float lambda, int seed, DataViewRowId id, int replica)
+        {
+            ulong h = Mix((ulong)(uint)seed + 0x9E3779B97F4A7C15UL);
+            h = Mix(h ^ id.Low);
+            h = Mix(h ^ id.High);
+            h = Mix(h ^ (ulong)(uint)replica);
+            double u = (h >> 11) * (1.0 / (1UL << 53));
+
+            // Inversion of the cumulative distribution function.
+            double p = Math.Exp(-lambda);
+            double cdf = p;
+            int k = 0;
+            while (u > cdf && p > 0)
+            {
+                ++k;
+                p *= lambda / k;
+                cdf += p;
+            }
+            return k;
+        }
+
+        /// <summary>
+        /// Returns the highest value <see cref="HashPoisson"/> can return for a given lambda.
+        /// </summary>
+        public static int MaxHashPoisson(float lambda)
+        {
+            double u = 1.0 - 1.0 / (1UL << 53);
+            double p = Math.Exp(-lambda);
+            double cdf = p;
+            int k = 0;
+            while (u > cdf && p > 0)
+            {
+                ++k;
+                p *= lambda / k;
+                cdf += p;
+            }
+            return k;
+        }
+
+        /// <summary>
+        /// Finalizer of SplitMix64.
+        /// </summary>
+        static ulong Mix(ulong z)
+        {
+            z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9UL;
+            z = (z ^ (z >> 27)) * 0x94D049BB133111EBUL;
+            return z ^ (z >> 31);
+        }
+
+        DataViewRowCursor[] GetWeightsCursors(IEnumerable<DataViewSchema.Column> columnsNeeded,
+                                              Func<IEnumerable<DataViewSchema.Column>, DataViewRowCursor[]> getterCursors)
+        {
+            int classColumn = -1;
+            if (!string.IsNullOrEmpty(_args.column))
+                classColumn = SchemaHelper.GetColumnIndex(_input.Schema, _args.column);
+            var oldCols = SchemaHelper.ColumnsNeeded(columnsNeeded, _input.Schema,
+                                                     classColumn >= 0 ? new[] { classColumn } : new int[0]);
+            int seed = _args.seed ?? 0;
+
+            if (classColumn == -1)
+                return getterCursors(oldCols).Select(c => new BootstrapWeightsCursor<float>(this, c,
+                    _args.lambda, seed, _args.replicas, SchemaHelper._dc(classColumn, c), float.NaN)).ToArray();
+
+            var type = _input.Schema[classColumn].Type;
+            switch (type.RawKind())
+            {
+                case DataKind.Boolean:
+                    bool clbool;
+                    if (!bool.TryParse(_args.classValue, out clbool))
+                        throw _host.Except("Unable to parse '{0}'.", _args.classValue);
+                    return getterCursors(oldCols).Select(c => new BootstrapWeightsCursor<bool>(this, c,
+                        _args.lambda, seed, _args.replicas, SchemaHelper._dc(classColumn, c), clbool)).ToArray();
+                case DataKind.UInt32:
+                    uint cluint;
+                    if (!uint.TryParse(_args.classValue, out cluint))
+                        throw _host.Except("Unable to parse '{0}'.", _args.classValue);
+                    return getterCursors(oldCols).Select(c => new BootstrapWeightsCursor<uint>(this, c,
+                        _args.lambda, seed, _args.replicas, SchemaHelper._dc(classColumn, c), cluint)).ToArray();
+                case DataKind.Single:
+                    float clfloat;
+                    if (!float.TryParse(_args.classValue, out clfloat))
+                        throw _host.Except("Unable to parse '{0}'.", _args.classValue);
+                    return getterCursors(oldCols).Select(c => new BootstrapWeightsCursor<float>(this, c,
+                        _args.lambda, seed, _args.replicas, SchemaHelper._dc(classColumn, c), clfloat)).ToArray();
+                case DataKind.String:
+                    var cltext = new ReadOnlyMemory<char>(_args.classValue.ToCharArray());
+                    return getterCursors(oldCols).Select(c => new BootstrapWeightsCursor<ReadOnlyMemory<char>>(this, c,
+                        _args.lambda, seed, _args.replicas, SchemaHelper._dc(classColumn, c), cltext)).ToArray();
+                default:
+                    throw _host.Except("Unsupported type '{0}'", type);
+            }
+        }
+
         void LoadCache(Random rand)
         {
             if (_cacheReplica != null)
@@ -427,6 +581,8 @@ namespace Scikit.ML.RandomTransforms
             readonly ValueGetter<TClass> _classGetter;
             readonly TClass _classValue;
             readonly DataViewSchema.Column _classColumn;
+            readonly bool _hashed;
+            readonly int _seed;
 
             int _copy;
             DataViewRowId _currentId;
@@ -434,16 +590,21 @@ namespace Scikit.ML.RandomTransforms
 
             public ResampleCursor(ResampleTransform view, DataViewRowCursor cursor, IEnumerable<DataViewSchema.Column> neededColumns,
                                     float lambda, int? seed, Random rand, Dictionary<DataViewRowId, int> cache,
-                                    DataViewSchema.Column classColumn, TClass classValue)
+                                    DataViewSchema.Column classColumn, TClass classValue, bool hashed)
             {
                 _view = view;
+                _hashed = hashed;
+                _seed = seed ?? 0;
                 _inputCursor = cursor;
                 _lambda = lambda;
                 uint? useed = seed.HasValue ? (uint)seed.Value : (uint?)null;
                 _rand = rand == null ? RandomUtils.Create(useed) : rand;
                 _neededColumns = neededColumns;
                 _cache = cache;
-                _maxReplica = cache == null ? Math.Max((int)(lambda * 3 + 1), 1) : _cache.Values.Max();
+                // The hashed mode does not truncate the number of copies.
+                _maxReplica = cache != null
+                                ? _cache.Values.Max()
+                                : (hashed ? Math.Max(MaxHashPoisson(lambda), 1) : Math.Max((int)(lambda * 3 + 1), 1));
                 int maxReplica = _maxReplica + 1;
                 _shift = 0;
                 _idGetter = cursor.GetIdGetter();
@@ -524,6 +685,8 @@ namespace Scikit.ML.RandomTransforms
                     _idGetter(ref _currentId);
                     _copy = _cache[_currentId];
                 }
+                else if (_hashed)
+                    _copy = NextHashedCopy();
                 else
                 {
                     _copy = NextPoisson(_lambda, _rand);
@@ -540,6 +703,8 @@ namespace Scikit.ML.RandomTransforms
                         _idGetter(ref _currentId);
                         _copy = _cache[_currentId];
                     }
+                    else if (_hashed)
+                        _copy = NextHashedCopy();
                     else if (_classGetter == null)
                     {
                         _copy = NextPoisson(_lambda, _rand);
@@ -556,6 +721,18 @@ namespace Scikit.ML.RandomTransforms
                 return true;
             }
 
+            int NextHashedCopy()
+            {
+                if (_classGetter != null)
+                {
+                    _classGetter(ref _currentCl);
+                    if (!_currentCl.Equals(_classValue))
+                        return 1;
+                }
+                _idGetter(ref _currentId);
+                return Math.Min(HashPoisson(_lambda, _seed, _currentId, 0), _maxReplica);
+            }
+
             public override ValueGetter<TValue> GetGetter<TValue>(DataViewSchema.Column col)
             {
 #if (DEBUG)
@@ -571,5 +748,98 @@ namespace Scikit.ML.RandomTransforms
         }
 
         #endregion
+
+        #region Cursor with bootstrap weights
+
+        /// <summary>
+        /// Row to row cursor, it adds a vector column with the number of copies
+        /// of the current row in every replica.
+        /// </summary>
+        class BootstrapWeightsCursor<TClass> : DataViewRowCursor
+        {
+            readonly ResampleTransform _view;
+            readonly DataViewRowCursor _inputCursor;
+            readonly float _lambda;
+            readonly int _seed;
+            readonly int _replicas;
+            readonly ValueGetter<DataViewRowId> _idGetter;
+            readonly ValueGetter<TClass> _classGetter;
+            readonly TClass _classValue;
+
+            DataViewRowId _currentId;
+            TClass _currentCl;
+
+            public BootstrapWeightsCursor(ResampleTransform view, DataViewRowCursor cursor, float lambda, int seed, int replicas,
+                                          DataViewSchema.Column classColumn, TClass classValue)
+            {
+                _view = view;
+                _inputCursor = cursor;
+                _lambda = lambda;
+                _seed = seed;
+                _replicas = replicas;
+                _idGetter = cursor.GetIdGetter();
+                _classValue = classValue;
+                _classGetter = classColumn.Index >= 0 && classColumn.Index < int.MaxValue
+                    ? _inputCursor.GetGetter<TClass>(classColumn)
+                    : null;
+            }
+
+            public override ValueGetter<DataViewRowId> GetIdGetter() { return _idGetter; }
+            public override bool IsColumnActive(DataViewSchema.Column col)
+            {
+                return col.Index >= _inputCursor.Schema.Count || _inputCursor.IsColumnActive(col);
+            }
+
+            public override long Batch { get { return _inputCursor.Batch; } }
+            public override long Position { get { return _inputCursor.Position; } }
+            public override DataViewSchema Schema { get { return _view.Schema; } }
+            public override bool MoveNext() { return _inputCursor.MoveNext(); }
+
+            protected override void Dispose(bool disposing)
+            {
+                if (disposing)
+                    _inputCursor.Dispose();
+                GC.SuppressFinalize(this);
+            }
+
+            public override ValueGetter<TValue> GetGetter<TValue>(DataViewSchema.Column col)
+            {
+                if (col.Index < _inputCursor.Schema.Count)
+                    return _inputCursor.GetGetter<TValue>(col);
+                if (col.Index > _inputCursor.Schema.Count)
+                    throw Contracts.Except("Unexpected columns {0} > {1}.", col, _inputCursor.Schema.Count);
+                return GetWeightsGetter() as ValueGetter<TValue>;
+            }
+
+            ValueGetter<VBuffer<float>> GetWeightsGetter()
+            {
+                return (ref VBuffer<float> dst) =>
+                {
+                    var values = dst.Values;
+                    if (values == null || values.Length < _replicas)
+                        values = new float[_replicas];
+                    bool resample = true;
+                    if (_classGetter != null)
+                    {
+                        _classGetter(ref _currentCl);
+                        resample = _currentCl.Equals(_classValue);
+                    }
+                    if (resample)
+                    {
+                        _idGetter(ref _currentId);
+                        for (int i = 0; i < _replicas; ++i)
+                            values[i] = HashPoisson(_lambda, _seed, _currentId, i);
+                    }
+                    else
+                    {
+                        for (int i = 0; i < _replicas; ++i)
+                            values[i] = 1;
+                    }
+                    dst = new VBuffer<float>(_replicas, values, dst.Indices);
+                };
+            }
+        }
+
+        #endregion
     }
 }
@@ -3,6 +3,7 @@
 using System;
 using System.Collections.Generic;
 using System.Linq;
+using System.Threading.Tasks;
 using Microsoft.ML;
 using Microsoft.ML.CommandLine;
 using Microsoft.ML.Data;
@@ -32,8 +33,8 @@ namespace Scikit.ML.RandomTransforms
         {
             return new VersionInfo(
                 modelSignature: "SHAKEINP",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,      // batchSize
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(ShakeInputTransform).Assembly.FullName);
@@ -88,9 +89,13 @@ namespace Scikit.ML.RandomTransforms
             [Argument(ArgumentType.AtMostOnce, HelpText = "Values to shake", ShortName = "w")]
             public string values;
 
-            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of threads used to estimate how much a class should resample.", ShortName = "nt")]
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of threads used to score the shaken rows in batch mode.", ShortName = "nt")]
             public int? numThreads;
 
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of rows shaken and scored at once, 0 or 1 to score rows one by one. " +
+                "The batch mode is only enabled if batchSize > 1.", ShortName = "bs")]
+            public int batchSize;
+
             [Argument(ArgumentType.AtMostOnce, HelpText = "Different ways to aggregate the rows produced by the skaking", ShortName = "agg")]
             public ShakeAggregation aggregation = ShakeAggregation.concatenate;
 
@@ -112,6 +117,7 @@ namespace Scikit.ML.RandomTransforms
                 ctx.Writer.Write(values);
                 ctx.Writer.Write(numThreads ?? -1);
                 ctx.Writer.Write((int)aggregation);
+                ctx.Writer.Write(batchSize);
             }
 
             public void Read(ModelLoadContext ctx, IHost host)
@@ -125,6 +131,15 @@ namespace Scikit.ML.RandomTransforms
                 int nb = ctx.Reader.ReadInt32();
                 numThreads = nb > 0 ? (int?)nb : null;
                 aggregation = (ShakeAggregation)ctx.Reader.ReadInt32();
+                batchSize = ctx.Header.ModelVerWritten >= 0x00010002 ? ctx.Reader.ReadInt32() : 0;
+            }
+
+            /// <summary>
+            /// Returns the number of rows scored at once, 1 means rows are scored one by one.
+            /// </summary>
+            public int GetBatchSize()
+            {
+                return batchSize > 1 ? batchSize : 1;
             }
         }
 
@@ -152,6 +167,7 @@ namespace Scikit.ML.RandomTransforms
             _host.CheckValue(args.inputColumn, "inputColumn");
             _host.CheckValue(args.inputFeaturesInt, "inputFeatures");
             _host.CheckValue(args.outputColumns, "outputColumns");
+            _host.CheckParam(args.batchSize >= 0, nameof(args.batchSize), "must be >= 0");
 
             _toShake = toShake;
             _input = input;
@@ -436,6 +452,8 @@ namespace Scikit.ML.RandomTransforms
                 switch (kind)
                 {
                     case DataKind.Single:
+                        if (_args.GetBatchSize() > 1)
+                            return GetBatchCursor(oldCols, rand, getterCursor);
                         var cursor = getterCursor(oldCols, rand);
                         return new ShakeInputCursor<TInput, float>(this, cursor, newCols, _args, _inputCol, _toShake, _shakingValues,
                                         (float x, float y) => { return x + y; });
@@ -444,8 +462,33 @@ namespace Scikit.ML.RandomTransforms
                 }
             }
 
+            /// <summary>
+            /// The batch cursor reads the input twice, the second cursor reads chunks of rows ahead.
+            /// Both cursors must go through the rows in the same order, they share the same seed
+            /// if the rows are shuffled.
+            /// </summary>
+            private DataViewRowCursor GetBatchCursor(IEnumerable<DataViewSchema.Column> oldCols, Random rand,
+                                                     DelegateGetRowCursor getterCursor)
+            {
+                Random rand1 = null, rand2 = null;
+                if (rand != null)
+                {
+                    int seed = rand.Next();
+                    rand1 = new Random(seed);
+                    rand2 = new Random(seed);
+                }
+                var cursor = getterCursor(oldCols, rand1);
+                var lookAhead = getterCursor(new[] { _inputCol }, rand2);
+                return new ShakeInputBatchCursor<TInput, float>(this, cursor, lookAhead, _args, _inputCol, _toShake, _shakingValues,
+                                (float x, float y) => { return x + y; });
+            }
+
             public DataViewRowCursor[] GetRowCursorSet(IEnumerable<DataViewSchema.Column> columnsNeeded, int n, Random rand = null)
             {
+                // The batch mode parallelizes the scoring itself, it returns a single cursor.
+                if (_args.GetBatchSize() > 1)
+                    return new[] { GetRowCursor(columnsNeeded, rand) };
+
                 DataKind kind;
                 if (_toShake[0].OutputType.IsVector())
                     kind = _toShake[0].OutputType.AsVector().ItemType().RawKind();
@@ -776,6 +819,318 @@ namespace Scikit.ML.RandomTransforms
                 #endregion
             }
         }
+
+        /// <summary>
+        /// Batched version of <see cref="ShakeInputCursor{TInput, TOutput}"/>.
+        /// A second cursor on the input reads chunks of rows ahead, all shaken variants
+        /// of a chunk are built at once and scored by <i>numThreads</i> workers,
+        /// each of them with its own mappers. The main cursor moves row by row and
+        /// returns the aggregated outputs computed for the chunk, they are the same
+        /// as the outputs of <see cref="ShakeInputCursor{TInput, TOutput}"/>.
+        /// </summary>
+        public class ShakeInputBatchCursor<TInput, TOutput> : DataViewRowCursor
+        {
+            readonly ShakeInputState<TInput> _view;
+            readonly DataViewRowCursor _inputCursor;
+            readonly DataViewRowCursor _lookAhead;
+            readonly Arguments _args;
+            readonly TInput[][] _shakingValues;
+            readonly int _batchSize;
+            readonly int _numThreads;
+            readonly int _nbVariants;
+            readonly Func<TOutput, TOutput, TOutput> _aggregation;
+
+            readonly ValueGetter<VBuffer<TInput>> _inputGetter;
+            readonly ValueGetter<DataViewRowId> _idGetter;
+            readonly ValueGetter<DataViewRowId> _idLookAhead;
+            // Mappers are not assumed to be thread safe, every worker has its own: [thread][mapper].
+            readonly ValueMapper<VBuffer<TInput>, TOutput>[][] _mappers;
+            readonly ValueMapper<VBuffer<TInput>, VBuffer<TOutput>>[][] _mappersV;
+
+            // Buffers reused from one chunk to the next one.
+            VBuffer<TInput> _inputValue;
+            VBuffer<TInput> _current;
+            readonly VBuffer<TInput>[] _variants;
+            readonly TOutput[][] _scores;
+            readonly VBuffer<TOutput>[][] _scoresV;
+            readonly VBuffer<TOutput>[][] _chunk;
+            readonly DataViewRowId[] _chunkIds;
+            int _chunkRows;
+            int _chunkPos;
+            bool _lookAheadDone;
+            DataViewRowId _id;
+
+            VBuffer<TOutput>[] _collected;
+
+            public ShakeInputBatchCursor(ShakeInputState<TInput> view, DataViewRowCursor cursor, DataViewRowCursor lookAhead,
+                                         Arguments args, DataViewSchema.Column column, IValueMapper[] toShake, TInput[][] shakingValues,
+                                         Func<TOutput, TOutput, TOutput> aggregation)
+            {
+                if (args.algo != ShakeInputAlgorithm.exhaustive)
+                    throw Contracts.Except("Not available algo {0}", args.algo);
+                if (args.aggregation == ShakeAggregation.add && aggregation == null)
+                    throw Contracts.Except("Aggregation is null.");
+                _view = view;
+                _args = args;
+                _inputCursor = cursor;
+                _lookAhead = lookAhead;
+                _shakingValues = shakingValues;
+                _aggregation = aggregation;
+                _batchSize = args.GetBatchSize();
+                _numThreads = Math.Max(1, args.numThreads ?? 1);
+                _nbVariants = shakingValues.Sum(c => c.Length);
+                if (_nbVariants == 0)
+                    throw Contracts.Except("No shaking values ('{0}')", args.values);
+
+                _inputGetter = lookAhead.GetGetter<VBuffer<TInput>>(column);
+                _idGetter = cursor.GetIdGetter();
+                _idLookAhead = lookAhead.GetIdGetter();
+
+                _mappers = new ValueMapper<VBuffer<TInput>, TOutput>[_numThreads][];
+                _mappersV = new ValueMapper<VBuffer<TInput>, VBuffer<TOutput>>[_numThreads][];
+                for (int t = 0; t < _numThreads; ++t)
+                {
+                    _mappersV[t] = toShake.Select(c => !c.OutputType.IsVector()
+                                    ? null
+                                    : c.GetMapper<VBuffer<TInput>, VBuffer<TOutput>>()).ToArray();
+                    _mappers[t] = toShake.Select(c => c.OutputType.IsVector()
+                                    ? null
+                                    : c.GetMapper<VBuffer<TInput>, TOutput>()).ToArray();
+                    for (int i = 0; i < toShake.Length; ++i)
+                    {
+                        if (_mappers[t][i] == null && _mappersV[t][i] == null)
+                            throw Contracts.Except("Type mismatch.");
+                    }
+                }
+
+                int nbScores = _batchSize * _nbVariants;
+                _variants = new VBuffer<TInput>[nbScores];
+                _scores = toShake.Select(c => c.OutputType.IsVector() ? null : new TOutput[nbScores]).ToArray();
+                _scoresV = toShake.Select(c => c.OutputType.IsVector() ? new VBuffer<TOutput>[nbScores] : null).ToArray();
+                _chunk = new VBuffer<TOutput>[_batchSize][];
+                _chunkIds = new DataViewRowId[_batchSize];
+                _chunkRows = 0;
+                _chunkPos = -1;
+            }
+
+            public override bool IsColumnActive(DataViewSchema.Column col)
+            {
+                return col.Index >= _inputCursor.Schema.Count || _inputCursor.IsColumnActive(col);
+            }
+
+            public override ValueGetter<DataViewRowId> GetIdGetter()
+            {
+                return _idGetter;
+            }
+
+            public override long Batch { get { return _inputCursor.Batch; } }
+            public override long Position { get { return _inputCursor.Position; } }
+            public override DataViewSchema Schema { get { return _view.Schema; } }
+
+            protected override void Dispose(bool disposing)
+            {
+                if (disposing)
+                {
+                    _inputCursor.Dispose();
+                    _lookAhead.Dispose();
+                }
+                GC.SuppressFinalize(this);
+            }
+
+            public override bool MoveNext()
+            {
+                if (++_chunkPos >= _chunkRows)
+                    FillChunk();
+                if (_chunkRows == 0)
+                {
+                    if (_inputCursor.MoveNext())
+                        throw Contracts.Except("Both cursors on the input do not have the same number of rows.");
+                    return false;
+                }
+                if (!_inputCursor.MoveNext())
+                    throw Contracts.Except("Both cursors on the input do not have the same number of rows.");
+                _idGetter(ref _id);
+                if (!_id.Equals(_chunkIds[_chunkPos]))
+                    throw Contracts.Except("Both cursors on the input do not go through the rows in the same order.");
+                _collected = _chunk[_chunkPos];
+                return true;
+            }
+
+            public override ValueGetter<TValue> GetGetter<TValue>(DataViewSchema.Column col)
+            {
+                if (col.Index < _inputCursor.Schema.Count)
+                    return _inputCursor.GetGetter<TValue>(col);
+                else if (col.Index - _inputCursor.Schema.Count >= _scores.Length)
+                    throw Contracts.Except("Unexpected columns {0} > {1}.", col, _scores.Length + _inputCursor.Schema.Count);
+                return GetBufferGetter(col) as ValueGetter<TValue>;
+            }
+
+            ValueGetter<VBuffer<TOutput>> GetBufferGetter(DataViewSchema.Column col)
+            {
+                int diff = col.Index - _inputCursor.Schema.Count;
+                return (ref VBuffer<TOutput> output) =>
+                {
+                    output = _collected[diff];
+                };
+            }
+
+            void FillChunk()
+            {
+                _chunkRows = 0;
+                _chunkPos = 0;
+                while (!_lookAheadDone && _chunkRows < _batchSize)
+                {
+                    if (!_lookAhead.MoveNext())
+                    {
+                        _lookAheadDone = true;
+                        break;
+                    }
+                    _idLookAhead(ref _chunkIds[_chunkRows]);
+                    _inputGetter(ref _inputValue);
+                    AddVariants(_chunkRows * _nbVariants);
+                    ++_chunkRows;
+                }
+                if (_chunkRows == 0)
+                    return;
+                Score(_chunkRows * _nbVariants);
+                for (int r = 0; r < _chunkRows; ++r)
+                    _chunk[r] = Aggregate(r * _nbVariants);
+            }
+
+            /// <summary>
+            /// Builds the shaken variants of the current row. As in the row by row cursor,
+            /// the shaking values replace the features one after another: variant (i, j)
+            /// keeps the last shaking value of the features shaken before feature i.
+            /// </summary>
+            void AddVariants(int start)
+            {
+                _inputValue.CopyTo(ref _current);
+                int v = start;
+                for (int i = 0; i < _shakingValues.Length; ++i)
+                {
+                    int pos = EnsureIndex(ref _current, _args.inputFeaturesInt[i]);
+                    for (int j = 0; j < _shakingValues[i].Length; ++j)
+                    {
+                        _current.Values[pos] = _shakingValues[i][j];
+                        _current.CopyTo(ref _variants[v++]);
+                    }
+                }
+            }
+
+            /// <summary>
+            /// Returns the position of a feature in the values of a vector,
+            /// the feature is inserted if the vector is sparse and does not contain it.
+            /// </summary>
+            static int EnsureIndex(ref VBuffer<TInput> vec, int index)
+            {
+                if (vec.IsDense)
+                    return index;
+                int pos = Array.BinarySearch(vec.Indices, 0, vec.Count, index);
+                if (pos >= 0)
+                    return pos;
+                pos = ~pos;
+                var values = new TInput[vec.Count + 1];
+                var indices = new int[vec.Count + 1];
+                Array.Copy(vec.Values, values, pos);
+                Array.Copy(vec.Indices, indices, pos);
+                indices[pos] = index;
+                Array.Copy(vec.Values, pos, values, pos + 1, vec.Count - pos);
+                Array.Copy(vec.Indices, pos, indices, pos + 1, vec.Count - pos);
+                vec = new VBuffer<TInput>(vec.Length, vec.Count + 1, values, indices);
+                return pos;
+            }
+
+            void Score(int total)
+            {
+                int nt = Math.Min(_numThreads, total);
+                int size = (total + nt - 1) / nt;
+                Action<int> work = t =>
+                {
+                    int end = Math.Min(total, (t + 1) * size);
+                    for (int k = 0; k < _scores.Length; ++k)
+                    {
+                        if (_scores[k] != null)
+                        {
+                            var mapper = _mappers[t][k];
+                            var scores = _scores[k];
+                            for (int v = t * size; v < end; ++v)
+                                mapper(in _variants[v], ref scores[v]);
+                        }
+                        else
+                        {
+                            var mapper = _mappersV[t][k];
+                            var scores = _scoresV[k];
+                            for (int v = t * size; v < end; ++v)
+                                mapper(in _variants[v], ref scores[v]);
+                        }
+                    }
+                };
+                if (nt <= 1)
+                    work(0);
+                else
+                    Parallel.For(0, nt, new ParallelOptions() { MaxDegreeOfParallelism = nt }, work);
+            }
+
+            VBuffer<TOutput>[] Aggregate(int start)
+            {
+                int end = start + _nbVariants;
+                var res = new VBuffer<TOutput>[_scores.Length];
+                for (int k = 0; k < res.Length; ++k)
+                {
+                    switch (_args.aggregation)
+                    {
+                        case ShakeAggregation.concatenate:
+                            if (_scores[k] != null)
+                            {
+                                var values = new TOutput[_nbVariants];
+                                Array.Copy(_scores[k], start, values, 0, _nbVariants);
+                                res[k] = new VBuffer<TOutput>(values.Length, values);
+                            }
+                            else
+                            {
+                                int length = 0;
+                                for (int v = start; v < end; ++v)
+                                    length += _scoresV[k][v].Length;
+                                var values = new TOutput[length];
+                                int pos = 0;
+                                for (int v = start; v < end; ++v)
+                                    foreach (var val in _scoresV[k][v].DenseValues())
+                                        values[pos++] = val;
+                                res[k] = new VBuffer<TOutput>(values.Length, values);
+                            }
+                            break;
+                        case ShakeAggregation.add:
+                            if (_scores[k] != null)
+                            {
+                                var acc = _scores[k][start];
+                                for (int v = start + 1; v < end; ++v)
+                                    acc = _aggregation(acc, _scores[k][v]);
+                                res[k] = new VBuffer<TOutput>(1, new[] { acc });
+                            }
+                            else
+                            {
+                                var acc = _scoresV[k][start].DenseValues().ToArray();
+                                for (int v = start + 1; v < end; ++v)
+                                {
+                                    int a = 0;
+                                    foreach (var val in _scoresV[k][v].DenseValues())
+                                    {
+                                        if (a >= acc.Length)
+                                            break;
+                                        acc[a] = _aggregation(acc[a], val);
+                                        ++a;
+                                    }
+                                }
+                                res[k] = new VBuffer<TOutput>(acc.Length, acc);
+                            }
+                            break;
+                        default:
+                            throw Contracts.Except("Unkown aggregation strategy {0}", _args.aggregation);
+                    }
+                }
+                return res;
+            }
+        }
     }
 
     #endregion
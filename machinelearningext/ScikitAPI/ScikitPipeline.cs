@@ -56,6 +56,7 @@ namespace Scikit.ML.ScikitAPI
         private bool _dispose;
         private ValueMapperDataFrameFromTransform _fastValueMapperObject;
         private ValueMapper<DataFrame, DataFrame> _fastValueMapper;
+        private PipelineProfiler _fastValueMapperProfiler;
 
         #endregion
 
@@ -205,13 +206,14 @@ namespace Scikit.ML.ScikitAPI
         /// </summary>
         /// <param name="filename">filename</param>
         /// <param name="removeFirstTransform">remove the first transform which is a PassThroughTransform</param>
-        public void Save(string filename, bool removeFirstTransform = false)
+        /// <param name="optimizeOnnx">simplifies the ONNX graph (only if the model is saved in ONNX format)</param>
+        public void Save(string filename, bool removeFirstTransform = false, bool optimizeOnnx = false)
         {
             using (var fs = File.Create(filename))
                 if (filename.EndsWith(".zip"))
                     Save(fs, removeFirstTransform);
                 else
-                    ToOnnx(removeFirstTransform ? 1 : 0).Save(fs);
+                    ToOnnx(removeFirstTransform ? 1 : 0).Save(fs, optimizeOnnx);
         }
 
         /// <summary>
@@ -403,10 +405,17 @@ namespace Scikit.ML.ScikitAPI
                 features = _transforms.Last().transform;
             }
 
+            IDataView res;
             if (_predictor == null || _predictor.predictor == null)
-                return features;
-            var roles = new RoleMappedData(features, _roles ?? new List<KeyValuePair<RoleMappedSchema.ColumnRole, string>>());
-            return PredictorHelper.Predict(_env, _predictor.predictor, roles);
+                res = features;
+            else
+            {
+                var roles = new RoleMappedData(features, _roles ?? new List<KeyValuePair<RoleMappedSchema.ColumnRole, string>>());
+                res = PredictorHelper.Predict(_env, _predictor.predictor, roles);
+            }
+
+            var profiler = Profiler;
+            return profiler == null ? res : profiler.Instrument(_env, res, data);
         }
 
         #endregion
@@ -424,7 +433,7 @@ namespace Scikit.ML.ScikitAPI
         /// <param name="conc">number of threads used to compute the predictions</param>
         public void Predict(DataFrame df, ref DataFrame view)
         {
-            if (_fastValueMapper == null)
+            if (_fastValueMapper == null || _fastValueMapperProfiler != Profiler)
                 CreateFastValueMapper();
             _fastValueMapper(in df, ref view);
         }
@@ -452,12 +461,76 @@ namespace Scikit.ML.ScikitAPI
                 tr = PredictorHelper.Predict(_env, _predictor.predictor, roles);
             }
 
+            var profiler = Profiler;
+            if (profiler != null)
+                tr = profiler.Instrument(_env, tr);
+            _fastValueMapperProfiler = profiler;
+
             _fastValueMapperObject = new ValueMapperDataFrameFromTransform(_env, tr);
             _fastValueMapper = _fastValueMapperObject.GetMapper<DataFrame, DataFrame>();
         }
 
         #endregion
 
+        #region profiling
+
+        /// <summary>
+        /// Returns the profiler if the environment is a <see cref="DelegateEnvironment"/>
+        /// with profiling enabled, null otherwise. Predictions are then computed
+        /// through instrumented views which measure every step of the pipeline.
+        /// </summary>
+        public PipelineProfiler Profiler => PipelineProfiler.GetProfiler(_env);
+
+        /// <summary>
+        /// Returns the profiling report as a dataframe, one row per step,
+        /// null if profiling is disabled (see <see cref="PipelineProfiler.Report"/>).
+        /// </summary>
+        public DataFrame GetProfilingReport()
+        {
+            var profiler = Profiler;
+            if (profiler == null)
+                return null;
+            var report = profiler.Report();
+            var df = new DataFrame();
+            df.AddColumn("index", report.Select(c => c.Index).ToArray());
+            df.AddColumn("name", report.Select(c => c.Name).ToArray());
+            df.AddColumn("rows", report.Select(c => c.Rows).ToArray());
+            df.AddColumn("cursor_creations", report.Select(c => c.CursorCreations).ToArray());
+            df.AddColumn("getter_calls", report.Select(c => c.GetterCalls).ToArray());
+            df.AddColumn("cursor_time", report.Select(c => c.CursorTime).ToArray());
+            df.AddColumn("movenext_time", report.Select(c => c.MoveNextTime).ToArray());
+            df.AddColumn("getter_time", report.Select(c => c.GetterTime).ToArray());
+            df.AddColumn("total_time", report.Select(c => c.TotalTime).ToArray());
+            df.AddColumn("self_time", report.Select(c => c.SelfTime).ToArray());
+            df.AddColumn("allocated_bytes", report.Select(c => c.AllocatedBytes).ToArray());
+            df.AddColumn("self_allocated_bytes", report.Select(c => c.SelfAllocatedBytes).ToArray());
+            return df;
+        }
+
+        /// <summary>
+        /// Compiles the trained pipeline into a single mapper which goes from
+        /// an input dataframe to the predictions without any cursor creation
+        /// (see <see cref="FusedValueMapperDataFrame"/>). The returned object
+        /// does not depend on the pipeline anymore, it must not be called from different threads.
+        /// </summary>
+        public FusedValueMapperDataFrame Compile()
+        {
+            IDataTransform tr = _transforms.Last().transform;
+            if (tr == null)
+                throw _env.Except("The pipeline must be trained before being compiled.");
+
+            if (_predictor != null && _predictor.predictor != null)
+            {
+                var roles = new RoleMappedData(tr, _roles ?? new List<KeyValuePair<RoleMappedSchema.ColumnRole, string>>());
+                tr = PredictorHelper.Predict(_env, _predictor.predictor, roles);
+            }
+
+            // The first transform is a PassThroughTransform, the compiled mapper starts after it.
+            return new FusedValueMapperDataFrame(_env, tr, _transforms.First().transform);
+        }
+
+        #endregion
+
         #region onnx
 
         /// <summary>
@@ -175,6 +175,55 @@ namespace TestMachineLearningExt
             }
         }
 
+        [TestMethod]
+        public void TestI_PolynomialTransformPlanSparseDense()
+        {
+            var sparse = new[] {
+                new VBuffer<float>(6, 3, new float[] { 1, 10, 100 }, new int[] { 0, 2, 5 }),
+                new VBuffer<float>(6, 2, new float[] { 2, 3 }, new int[] { 1, 4 }),
+                new VBuffer<float>(6, 0, new float[0], new int[0]),
+                // An empty sparse vector usually has null buffers.
+                new VBuffer<float>(6, 0, null, null)
+            };
+            for (int degree = 1; degree <= 3; ++degree)
+            {
+                var plan = new PolynomialTransform.PolynomialPlan<float>(6, degree, (a, b) => a * b);
+                var dense = sparse.Select(c => c.DenseValues().ToArray()).ToArray();
+                var matrix = dense.SelectMany(c => c).ToArray();
+                var expected = new float[dense.Length * plan.OutputLength];
+                plan.Apply(matrix, expected, dense.Length);
+
+                var outSparse = new VBuffer<float>[sparse.Length];
+                plan.Apply(sparse, outSparse);
+                // The buffers are reused on the second call.
+                plan.Apply(sparse, outSparse, 2);
+                for (int i = 0; i < sparse.Length; ++i)
+                {
+                    Assert.IsFalse(outSparse[i].IsDense);
+                    Assert.AreEqual(plan.OutputCount(sparse[i].Count), outSparse[i].Count);
+                    var got = outSparse[i].DenseValues().ToArray();
+                    Assert.AreEqual(plan.OutputLength, got.Length);
+                    for (int j = 0; j < got.Length; ++j)
+                        Assert.AreEqual(expected[i * plan.OutputLength + j], got[j]);
+                }
+
+                var buf = new VBuffer<float>();
+                var vec = new VBuffer<float>(6, dense[0]);
+                plan.Apply(in vec, ref buf);
+                Assert.IsTrue(buf.IsDense);
+                var row = buf.DenseValues().ToArray();
+                for (int j = 0; j < row.Length; ++j)
+                    Assert.AreEqual(expected[j], row[j]);
+
+                // No feature at all, the dense vector has no buffer.
+                var empty = new PolynomialTransform.PolynomialPlan<float>(0, degree, (a, b) => a * b);
+                var emptyVec = new VBuffer<float>(0, 0, null, null);
+                var emptyRes = new VBuffer<float>();
+                empty.Apply(in emptyVec, ref emptyRes);
+                Assert.AreEqual(0, emptyRes.Length);
+            }
+        }
+
         #endregion
 
         #region ScalerTransform
@@ -362,6 +411,137 @@ namespace TestMachineLearningExt
             }
         }
 
+        static List<float[]> ScaleWide(IHostEnvironment host, IDataView data, ScalerTransform.ScalerStrategy strategy, int numThreads)
+        {
+            var args = new ScalerTransform.Arguments
+            {
+                columns = new[] { new Column1x1() { Name = "X", Source = "X" } },
+                scaling = strategy,
+                numThreads = numThreads
+            };
+            var scaled = new ScalerTransform(host, args, data);
+            var outValues = new List<float[]>();
+            using (var cursor = scaled.GetRowCursor(scaled.Schema))
+            {
+                int index = SchemaHelper.GetColumnIndex(cursor.Schema, "X");
+                var colGetter = cursor.GetGetter<VBuffer<float>>(SchemaHelper._dc(index, cursor));
+                VBuffer<float> got = new VBuffer<float>();
+                while (cursor.MoveNext())
+                {
+                    colGetter(ref got);
+                    outValues.Add(got.DenseValues().ToArray());
+                }
+            }
+            return outValues;
+        }
+
+        [TestMethod]
+        public void TestI_ScalerTransformParallel()
+        {
+            var inputs = Enumerable.Range(0, 1000).Select(i =>
+                Enumerable.Range(0, 11).Select(j => (float)((i * (j + 3)) % 97 + 1000 * j)).ToArray()).ToArray();
+            /*using (*/
+            var host = EnvHelper.NewTestEnvironment();
+            {
+                // A dataframe splits into as many cursors as requested, the statistics are merged.
+                var raw = new DataFrame();
+                for (int j = 0; j < 11; ++j)
+                    raw.AddColumn(string.Format("C{0}", j), inputs.Select(c => c[j]).ToArray());
+                raw.SetShuffle(false);
+                var names = string.Join(",", Enumerable.Range(0, 11).Select(j => string.Format("C{0}", j)));
+                var data = host.CreateTransform(string.Format("concat{{col=X:{0}}}", names), raw);
+                var cursors = data.GetRowCursorSet(data.Schema, 4);
+                Assert.AreEqual(4, cursors.Length);
+                foreach (var c in cursors)
+                    c.Dispose();
+
+                var values1 = ScaleWide(host, data, ScalerTransform.ScalerStrategy.meanVar, 1);
+                var values4 = ScaleWide(host, data, ScalerTransform.ScalerStrategy.meanVar, 4);
+                Assert.AreEqual(inputs.Length, values1.Count);
+                Assert.AreEqual(inputs.Length, values4.Count);
+                for (int j = 0; j < 11; ++j)
+                {
+                    var col = inputs.Select(c => (double)c[j]).ToArray();
+                    double mean = col.Average();
+                    double std = Math.Sqrt(col.Select(c => (c - mean) * (c - mean)).Average());
+                    for (int i = 0; i < inputs.Length; ++i)
+                    {
+                        Assert.AreEqual((inputs[i][j] - mean) / std, values1[i][j], 1e-4);
+                        Assert.AreEqual((inputs[i][j] - mean) / std, values4[i][j], 1e-4);
+                    }
+                }
+
+                var minmax = ScaleWide(host, data, ScalerTransform.ScalerStrategy.minMax, 4);
+                for (int j = 0; j < 11; ++j)
+                {
+                    Assert.AreEqual(0f, minmax.Min(c => c[j]), 1e-6);
+                    Assert.AreEqual(1f, minmax.Max(c => c[j]), 1e-6);
+                }
+            }
+        }
+
+        [TestMethod]
+        public void TestI_SlotStatisticsMerge()
+        {
+            var all = new SlotStatistics();
+            var parts = new[] { new SlotStatistics(), new SlotStatistics(), new SlotStatistics() };
+            for (int i = 0; i < 1000; ++i)
+            {
+                var values = new float[] { i % 13, 1000 + (i * 7) % 31, -i };
+                var vector = new VBuffer<float>(values.Length, values);
+                all.Update(in vector);
+                // Uneven partitions, the last one only sees a few rows.
+                parts[i < 600 ? 0 : (i < 990 ? 1 : 2)].Update(in vector);
+            }
+            var merged = new SlotStatistics();
+            foreach (var part in parts)
+                merged.Merge(part);
+            Assert.AreEqual(all.Length, merged.Length);
+            for (int k = 0; k < all.Length; ++k)
+            {
+                Assert.AreEqual(all.Count(k), merged.Count(k));
+                Assert.AreEqual(all.Mean(k), merged.Mean(k), 1e-9);
+                Assert.AreEqual(all.Variance(k), merged.Variance(k), 1e-6 * Math.Max(1, all.Variance(k)));
+                Assert.AreEqual(all.Min(k), merged.Min(k));
+                Assert.AreEqual(all.Max(k), merged.Max(k));
+            }
+        }
+
+        [TestMethod]
+        public void TestI_ScalerTransformLargeMeanSmallVariance()
+        {
+            // sum2 / n - mean^2 would be 0 here.
+            var stats = new SlotStatistics();
+            for (int i = 0; i < 1000; ++i)
+                stats.Update(1e8 + (i % 2 == 0 ? 1 : -1));
+            Assert.AreEqual(1e8, stats.Mean(0), 1e-6);
+            Assert.AreEqual(1.0, stats.Variance(0), 1e-6);
+
+            var host = EnvHelper.NewTestEnvironment().Register("scaler");
+            var obs = new List<ColumnStatObs>()
+            {
+                stats.ToColumnStatObs(ColumnStatObs.StatKind.mean),
+                stats.ToColumnStatObs(ColumnStatObs.StatKind.m2),
+                stats.ToColumnStatObs(ColumnStatObs.StatKind.nb),
+            };
+            var factor = new ScalerTransform.ScalingFactor(host, 0, ScalerTransform.ScalerStrategy.meanVar, obs);
+            Assert.AreEqual(1e8f, factor.mean.Values[0]);
+            Assert.AreEqual(1f, factor.scale.Values[0], 1e-6f);
+        }
+
+        [TestMethod]
+        public void TestI_ScalerTransformApplyAffine()
+        {
+            var values = Enumerable.Range(0, 37).Select(i => (float)i).ToArray();
+            var offset = Enumerable.Range(0, 37).Select(i => 1f).ToArray();
+            var factor = Enumerable.Range(0, 37).Select(i => 0.5f).ToArray();
+            ScalerTransform.ApplyAffine(values, offset, factor, 35);
+            for (int i = 0; i < 35; ++i)
+                Assert.AreEqual((i - 1f) * 0.5f, values[i]);
+            Assert.AreEqual(35f, values[35]);
+            Assert.AreEqual(36f, values[36]);
+        }
+
         #endregion
     }
 }
@@ -38,6 +38,8 @@ namespace TestMachineLearningExt
                     var cacheFile = FileHelper.GetOutputFile("cacheFile.idv", methodName);
                     args.cacheFile = cacheFile;
                 }
+                else if (option == "mem")
+                    args.inMemory = true;
 
                 var transformedData = new SplitTrainTestTransform(host, args, data);
 
@@ -259,6 +261,91 @@ namespace TestMachineLearningExt
             TestSplitTrainTestTransform("2");
         }
 
+        [TestMethod]
+        public void TestTransSplitTrainTestTransformInMemory()
+        {
+            TestSplitTrainTestTransform("mem");
+        }
+
+        [TestMethod]
+        public void TestTransSplitTrainTestKFold()
+        {
+            /*using (*/
+            var host = EnvHelper.NewTestEnvironment(conc: 1);
+            {
+                var inputsl = new List<InputOutput>();
+                for (int i = 0; i < 102; ++i)
+                    inputsl.Add(new InputOutput { X = new float[] { 0, 1 }, Y = i });
+                var data = DataViewConstructionUtils.CreateFromEnumerable(host, inputsl.ToArray());
+
+                var args = new SplitTrainTestTransform.Arguments { newColumn = "Part", folds = 4 };
+                var transformedData = new SplitTrainTestTransform(host, args, data);
+                Assert.AreEqual(4, transformedData.NbParts);
+                Assert.AreEqual(102, transformedData.GetRowCount());
+
+                Func<IDataView, List<int>> readY = view =>
+                {
+                    var res = new List<int>();
+                    using (var cursor = view.GetRowCursor(view.Schema))
+                    {
+                        var getter = cursor.GetGetter<int>(SchemaHelper._dc(SchemaHelper.GetColumnIndex(cursor.Schema, "Y"), cursor));
+                        int y = 0;
+                        while (cursor.MoveNext())
+                        {
+                            getter(ref y);
+                            res.Add(y);
+                        }
+                    }
+                    return res;
+                };
+
+                var allTest = new List<int>();
+                int fold = 0;
+                foreach (var pair in transformedData.EnumerateFolds())
+                {
+                    var train = readY(pair.Item1);
+                    var test = readY(pair.Item2);
+                    Assert.AreEqual(102, train.Count + test.Count);
+                    Assert.IsTrue(test.Count == 25 || test.Count == 26);
+                    Assert.AreEqual(test.Count, pair.Item2.GetRowCount());
+                    Assert.IsFalse(train.Intersect(test).Any());
+                    CollectionAssert.AreEqual(test, readY(transformedData.GetPart(fold)));
+                    allTest.AddRange(test);
+                    ++fold;
+                }
+                Assert.AreEqual(4, fold);
+                CollectionAssert.AreEquivalent(Enumerable.Range(0, 102).ToList(), allTest);
+
+                // The added column agrees with the folds.
+                using (var cursor = transformedData.GetRowCursor(transformedData.OutputSchema))
+                {
+                    var getterY = cursor.GetGetter<int>(SchemaHelper._dc(SchemaHelper.GetColumnIndex(cursor.Schema, "Y"), cursor));
+                    var getterP = cursor.GetGetter<int>(SchemaHelper._dc(SchemaHelper.GetColumnIndex(cursor.Schema, "Part"), cursor));
+                    int y = 0, p = 0;
+                    var folds = transformedData.EnumerateFolds().Select(c => new HashSet<int>(readY(c.Item2))).ToArray();
+                    while (cursor.MoveNext())
+                    {
+                        getterY(ref y);
+                        getterP(ref p);
+                        Assert.IsTrue(folds[p].Contains(y));
+                    }
+                }
+
+                // The number of tags must be the number of folds.
+                var argsTags = new SplitTrainTestTransform.Arguments { newColumn = "Part", folds = 4, tag = new[] { "a", "b" } };
+                bool failed = false;
+                try
+                {
+                    new SplitTrainTestTransform(host, argsTags, data);
+                }
+                catch (InvalidOperationException)
+                {
+                    failed = true;
+                }
+                Assert.IsTrue(failed);
+            }
+        }
+
         [TestMethod]
         public void TestTransSplitTrainTestSerializationIrisBinary()
         {
@@ -457,9 +457,17 @@ namespace TestMachineLearningExt
             TrainMultiToBinaryPredictorIris(1, false, "iova", "U4");
         }
 
-        static void TrainMultiToBinaryPredictorIris(int th, bool singleColumn, string model, string type)
+        [TestMethod]
+        public void TestTrainMultiToBinaryPredictorIrisCached()
+        {
+            TrainMultiToBinaryPredictorIris(1, true, "iova", "R4", "ctd=+");
+            TrainMultiToBinaryPredictorIris(1, false, "iova", "U4", "ctd=+");
+        }
+
+        static void TrainMultiToBinaryPredictorIris(int th, bool singleColumn, string model, string type, string extra = null)
         {
-            var methodName = string.Format("{0}-T{1}-{2}-{3}-{4}", System.Reflection.MethodBase.GetCurrentMethod().Name, th, singleColumn ? "asvec" : "asR4", model, type);
+            var methodName = string.Format("{0}-T{1}-{2}-{3}-{4}{5}", System.Reflection.MethodBase.GetCurrentMethod().Name, th, singleColumn ? "asvec" : "asR4", model, type,
+                                           string.IsNullOrEmpty(extra) ? "" : "-" + extra.Replace(" ", "").Replace("=", ""));
             string trainFile, testFile;
             if (type == "R4")
             {
@@ -501,9 +509,9 @@ namespace TestMachineLearningExt
                 else
                 {
                     if (th > 0)
-                        trainer = env.CreateTrainer(string.Format("iova{{ p=ft{{t={0}}} sc={1} }}", th, singleColumn ? "+" : "-"));
+                        trainer = env.CreateTrainer(string.Format("iova{{ p=ft{{t={0}}} sc={1} {2} }}", th, singleColumn ? "+" : "-", extra ?? ""));
                     else
-                        trainer = env.CreateTrainer(string.Format("iova{{p=ft{{t=1}} sc={0} }}", singleColumn ? "+" : "-"));
+                        trainer = env.CreateTrainer(string.Format("iova{{p=ft{{t=1}} sc={0} {1} }}", singleColumn ? "+" : "-", extra ?? ""));
                 }
 
                 using (var ch = env.Start("Train"))
@@ -531,9 +539,17 @@ namespace TestMachineLearningExt
             OptimizedOVA(0.2f, "U4", "lr");
         }
 
-        static void OptimizedOVA(float downsampling, string type, string model)
+        [TestMethod]
+        public void TestOptimizedOVAParallel()
+        {
+            OptimizedOVA(0f, "R4", "lr", "nt=3 ctd=+");
+            OptimizedOVA(0.2f, "U4", "lr", "nt=3 ctd=-");
+        }
+
+        static void OptimizedOVA(float downsampling, string type, string model, string extra = null)
         {
-            var methodName = string.Format("{0}-D{1}-{2}-{3}", System.Reflection.MethodBase.GetCurrentMethod().Name, downsampling, type, model);
+            var methodName = string.Format("{0}-D{1}-{2}-{3}{4}", System.Reflection.MethodBase.GetCurrentMethod().Name, downsampling, type, model,
+                                           string.IsNullOrEmpty(extra) ? "" : "-" + extra.Replace(" ", "").Replace("=", ""));
             string trainFile, testFile;
             if (type == "R4")
             {
@@ -565,7 +581,7 @@ namespace TestMachineLearningExt
                 var loader = env.CreateLoader(loaderSettings, new MultiFileSource(trainFile));
                 var xf = env.CreateTransform("concat{col=Features:Slength,Swidth}", loader);
                 var roles = env.CreateExamples(xf, "Features", "Label");
-                var trainer = env.CreateTrainer(string.Format("oova{{p={1} ds={0}}}", downsampling, model));
+                var trainer = env.CreateTrainer(string.Format("oova{{p={1} ds={0} {2}}}", downsampling, model, extra ?? ""));
                 using (var ch = env.Start("Train"))
                 {
                     var pred = trainer.Train(env, ch, roles);
@@ -2,10 +2,13 @@
 
 using Microsoft.VisualStudio.TestTools.UnitTesting;
 using System.IO;
+using System.Linq;
 using Microsoft.ML.Data;
 using Scikit.ML.TestHelper;
 using Scikit.ML.ScikitAPI;
 using Scikit.ML.DataManipulation;
+using Scikit.ML.OnnxHelper;
+using OnnxCSharpToProtoWrapper = Microsoft.ML.Model.OnnxConverter.OnnxCSharpToProtoWrapper;
 
 
 namespace TestMachineLearningExt
@@ -47,5 +50,111 @@ namespace TestMachineLearningExt
             pred.AssertAlmostEqual(pred2);
             */
         }
+
+        [TestMethod]
+        public void TestOnnx_OptimizeIris()
+        {
+            var methodName = System.Reflection.MethodBase.GetCurrentMethod().Name;
+            var iris = FileHelper.GetTestFile("iris.txt");
+            var df = DataFrameIO.ReadCsv(iris, sep: '\t');
+            df.AddColumn("LabelI", df["Label"].AsType(NumberDataViewType.Single));
+            var pipe = new ScikitPipeline(new[] { $"Concat{{col=Features:{df.Columns[1]},{df.Columns[2]}}}" }, "mlr");
+            pipe.Train(df, "Features", "LabelI");
+
+            var ctx = pipe.ToOnnx(1);
+            var raw = ctx.MakeModel();
+            var model = ctx.MakeModel(true);
+            var report = ctx.OptimizationReport;
+            Assert.IsNotNull(report);
+            Assert.AreEqual(raw.Graph.Node.Count, report.NodesBefore);
+            Assert.AreEqual(model.Graph.Node.Count, report.NodesAfter);
+            Assert.IsTrue(report.NodesAfter < report.NodesBefore);
+            Assert.AreEqual(report.NodesBefore - report.NodesAfter, report.RemovedNodes.Count);
+            Assert.IsTrue(report.RemovedByPass.ContainsKey(OnnxOptimizer.PassIdentity));
+            Assert.AreEqual(string.Join(",", raw.Graph.Input.Select(c => c.Name)),
+                            string.Join(",", model.Graph.Input.Select(c => c.Name)));
+            Assert.AreEqual(string.Join(",", raw.Graph.Output.Select(c => c.Name)),
+                            string.Join(",", model.Graph.Output.Select(c => c.Name)));
+
+            var output = FileHelper.GetOutputFile("model_optimized.onnx", methodName);
+            ctx.Save(output, true);
+            Assert.IsTrue(File.Exists(output));
+        }
+
+        static OnnxCSharpToProtoWrapper.ValueInfoProto MakeFloatValue(string name)
+        {
+            return new OnnxCSharpToProtoWrapper.ValueInfoProto()
+            {
+                Name = name,
+                Type = new OnnxCSharpToProtoWrapper.TypeProto()
+                {
+                    TensorType = new OnnxCSharpToProtoWrapper.TypeProto.Types.Tensor() { ElemType = 1 }
+                }
+            };
+        }
+
+        static OnnxCSharpToProtoWrapper.NodeProto MakeNode(string opType, string name, string[] inputs, string output)
+        {
+            var node = new OnnxCSharpToProtoWrapper.NodeProto() { OpType = opType, Name = name, Domain = "" };
+            node.Input.Add(inputs);
+            node.Output.Add(output);
+            return node;
+        }
+
+        static OnnxCSharpToProtoWrapper.TensorProto MakeFloats(string name, params float[] values)
+        {
+            var tensor = new OnnxCSharpToProtoWrapper.TensorProto() { Name = name, DataType = 1 };
+            tensor.FloatData.Add(values);
+            tensor.Dims.Add(values.Length);
+            return tensor;
+        }
+
+        [TestMethod]
+        public void TestOnnx_OptimizeGraph()
+        {
+            var graph = new OnnxCSharpToProtoWrapper.GraphProto() { Name = "g" };
+            graph.Input.Add(MakeFloatValue("X"));
+            graph.Output.Add(MakeFloatValue("Y"));
+            graph.Initializer.Add(MakeFloats("c1", 2f, 3f));
+            graph.Initializer.Add(MakeFloats("c2", 0.5f, 2f));
+            graph.Initializer.Add(MakeFloats("c3", 1f, 1f));
+            graph.Node.Add(MakeNode("Identity", "id1", new[] { "X" }, "X1"));
+            var cast = MakeNode("Cast", "cast", new[] { "X1" }, "X2");
+            cast.Attribute.Add(new OnnxCSharpToProtoWrapper.AttributeProto()
+            {
+                Name = "to",
+                I = 1,
+                Type = OnnxCSharpToProtoWrapper.AttributeProto.Types.AttributeType.Int
+            });
+            graph.Node.Add(cast);
+            graph.Node.Add(MakeNode("Mul", "mul1", new[] { "X2", "c1" }, "X3"));
+            graph.Node.Add(MakeNode("Mul", "mul2", new[] { "X3", "c2" }, "X4"));
+            graph.Node.Add(MakeNode("Add", "add", new[] { "X4", "c3" }, "X5"));
+            graph.Node.Add(MakeNode("Mul", "cst", new[] { "c1", "c2" }, "C"));
+            graph.Node.Add(MakeNode("Identity", "id2", new[] { "X5" }, "Y"));
+
+            var report = OnnxOptimizer.Optimize(graph);
+            Assert.AreEqual(7, report.NodesBefore);
+            Assert.AreEqual(1, report.NodesAfter);
+            Assert.AreEqual(2, report.RemovedByPass[OnnxOptimizer.PassIdentity]);
+            Assert.AreEqual(1, report.RemovedByPass[OnnxOptimizer.PassCast]);
+            Assert.AreEqual(2, report.RemovedByPass[OnnxOptimizer.PassScaleOffset]);
+            Assert.AreEqual(1, report.RemovedByPass[OnnxOptimizer.PassConstantFolding]);
+            Assert.AreEqual(0, graph.Initializer.Count);
+            Assert.AreEqual(4, report.RemovedInitializers);
+
+            // Y = (X * c1 * c2 + c3) = (X - offset) * scale
+            var node = graph.Node[0];
+            Assert.AreEqual("Scaler", node.OpType);
+            Assert.AreEqual("X", node.Input[0]);
+            Assert.AreEqual("Y", node.Output[0]);
+            var offset = node.Attribute.First(c => c.Name == "offset").Floats.ToArray();
+            var scale = node.Attribute.First(c => c.Name == "scale").Floats.ToArray();
+            Assert.AreEqual(2, offset.Length);
+            Assert.AreEqual(-1f, offset[0], 1e-5);
+            Assert.AreEqual(-1f / 6, offset[1], 1e-5);
+            Assert.AreEqual(1f, scale[0], 1e-5);
+            Assert.AreEqual(6f, scale[1], 1e-5);
+        }
     }
 }
@@ -11,6 +11,7 @@ using Microsoft.ML.Model;
 using Microsoft.ML.Transforms;
 using Scikit.ML.PipelineHelper;
 using Scikit.ML.PipelineTransforms;
+using Scikit.ML.DataManipulation;
 using Scikit.ML.TestHelper;
 
 
@@ -77,6 +78,112 @@ namespace TestMachineLearningExt
             }
         }
 
+        [TestMethod]
+        public void TestI_DescribeTransformSketch()
+        {
+            /*using (*/var env = EnvHelper.NewTestEnvironment();
+            {
+                // A dataframe splits into as many cursors as requested, the sketches are merged.
+                var data = new DataFrame();
+                data.AddColumn("X", Enumerable.Range(0, 1000).Select(i => (float)i).ToArray());
+                data.AddColumn("I", Enumerable.Range(0, 1000).Select(i => i % 7).ToArray());
+                data.AddColumn("T", Enumerable.Range(0, 1000).Select(i => string.Format("t{0}", i % 10)).ToArray());
+                var cursors = data.GetRowCursorSet(data.Schema, 2);
+                Assert.AreEqual(2, cursors.Length);
+                foreach (var c in cursors)
+                    c.Dispose();
+
+                var args = new DescribeTransform.Arguments()
+                {
+                    columns = new[] { "X", "I", "T" },
+                    sketch = true,
+                    numThreads = 2,
+                    quantiles = "0.1,0.5,0.9",
+                };
+                var tr = new DescribeTransform(env, args, data);
+                Assert.IsNull(tr.GetSketchStatistics());
+
+                int nb = 0;
+                using (var cursor = tr.GetRowCursor(tr.Schema))
+                {
+                    while (cursor.MoveNext())
+                        ++nb;
+                }
+                Assert.AreEqual(1000, nb);
+
+                var df = tr.GetSketchStatistics();
+                Assert.IsNotNull(df);
+                Assert.AreEqual(3, df.Length);
+                var rows = Enumerable.Range(0, df.Length).ToDictionary(i => df.loc[i, "Column"].ToString(), i => i);
+
+                int x = rows["X"];
+                Assert.AreEqual(1000.0, (double)df.loc[x, "count"]);
+                Assert.AreEqual(499.5, (double)df.loc[x, "mean"], 1e-6);
+                Assert.AreEqual(0.0, (double)df.loc[x, "min"]);
+                Assert.AreEqual(999.0, (double)df.loc[x, "max"]);
+                Assert.AreEqual(Math.Sqrt(1000.0 * 1001 / 12), (double)df.loc[x, "std"], 1e-6);
+                Assert.AreEqual(0.0, (double)df.loc[x, "skewness"], 1e-6);
+                Assert.AreEqual(100.0, (double)df.loc[x, "q0.1"], 20);
+                Assert.AreEqual(500.0, (double)df.loc[x, "q0.5"], 20);
+                Assert.AreEqual(900.0, (double)df.loc[x, "q0.9"], 20);
+                Assert.AreEqual(1000.0, (double)df.loc[x, "distinct"], 50);
+
+                int ii = rows["I"];
+                Assert.AreEqual(7.0, (double)df.loc[ii, "distinct"]);
+                Assert.AreEqual(6.0, (double)df.loc[ii, "max"]);
+
+                int t = rows["T"];
+                Assert.AreEqual(1000.0, (double)df.loc[t, "count"]);
+                Assert.AreEqual(10.0, (double)df.loc[t, "distinct"]);
+                Assert.IsTrue(double.IsNaN((double)df.loc[t, "mean"]));
+            }
+        }
+
+        [TestMethod]
+        public void TestI_StreamingSketchesMerge()
+        {
+            var m1 = new MomentsSketch();
+            var m2 = new MomentsSketch();
+            var k1 = new KllQuantileSketch(64, 0);
+            var k2 = new KllQuantileSketch(64, 1);
+            var all = new MomentsSketch();
+            for (int i = 0; i < 10000; ++i)
+            {
+                double v = (i * 7919) % 10000;
+                all.Update(v);
+                if (i % 3 == 0)
+                {
+                    m1.Update(v);
+                    k1.Update(v);
+                }
+                else
+                {
+                    m2.Update(v);
+                    k2.Update(v);
+                }
+            }
+            m1.Merge(m2);
+            k1.Merge(k2);
+            Assert.AreEqual(all.Count, m1.Count);
+            Assert.AreEqual(all.Mean, m1.Mean, 1e-6);
+            Assert.AreEqual(all.Variance, m1.Variance, 1e-3);
+            Assert.AreEqual(all.Skewness, m1.Skewness, 1e-6);
+            Assert.AreEqual(all.Kurtosis, m1.Kurtosis, 1e-6);
+            Assert.AreEqual(10000, k1.Count);
+            Assert.IsTrue(k1.Size < 1000);
+            Assert.AreEqual(5000, k1.Quantile(0.5), 500);
+
+            var h1 = new HyperLogLogSketch(10);
+            var h2 = new HyperLogLogSketch(10);
+            for (int i = 0; i < 5000; ++i)
+            {
+                h1.Update((double)i);
+                h2.Update((double)(i + 2500));
+            }
+            h1.Merge(h2);
+            Assert.AreEqual(7500, h1.Estimate(), 7500 * 0.1);
+        }
+
         #endregion
 
         #region PassThroughTransform
@@ -418,6 +418,39 @@ namespace TestMachineLearningExt
             }
         }
 
+        [TestMethod]
+        public void TestPredictionEnginePool()
+        {
+            var name = FileHelper.GetTestFile("bc-lr.zip");
+            var env = EnvHelper.NewTestEnvironment(conc: 1);
+            float[] expected = new float[100];
+            using (var engine = new ValueMapperPredictionEngineFloat(env, name))
+            {
+                for (int i = 0; i < expected.Length; ++i)
+                    expected[i] = engine.Predict(new float[] { i, 1, 1, 1, 2, 1, 3, 1, 1 });
+            }
+
+            using (var pool = PredictionEnginePool.CreateFloat(env, name, maxSize: 3))
+            {
+                var got = new float[expected.Length];
+                System.Threading.Tasks.Parallel.For(0, got.Length, i =>
+                {
+                    got[i] = pool.Run(e => e.Predict(new float[] { i, 1, 1, 1, 2, 1, 3, 1, 1 }));
+                });
+                for (int i = 0; i < expected.Length; ++i)
+                    Assert.AreEqual(expected[i], got[i]);
+                Assert.IsTrue(pool.Count >= 1);
+                Assert.IsTrue(pool.Count <= 3);
+                Assert.AreEqual(0, pool.InUse);
+
+                // Only one engine is needed after this call.
+                pool.Trim();
+                pool.Run(e => e.Predict(new float[] { 5, 1, 1, 1, 2, 1, 3, 1, 1 }));
+                pool.Trim();
+                Assert.AreEqual(1, pool.Count);
+            }
+        }
+
         public class ValueMapperPredictionEngineExample : IDisposable
         {
             ValueMapperPredictionEngineFloat engine;
@@ -627,6 +660,54 @@ namespace TestMachineLearningExt
             }
         }
 
+        [TestMethod]
+        public void TestMicroBatchPredictionServer()
+        {
+            var df = DataFrameIO.ReadStr("Label,X1,X2\n" +
+                                "0,0.1,1.1\n1,1.1,1.2\n0,2.1,1.3\n1,3.1,1.4\n" +
+                                "0,4.1,1.5\n1,5.1,1.6\n0,6.1,1.7\n1,7.1,1.8");
+            var columns = Enumerable.Range(0, df.ColumnCount).ToArray();
+            var env = EnvHelper.NewTestEnvironment();
+            var tr = new PassThroughTransform(env, new PassThroughTransform.Arguments() { }, df);
+            var mapperTr = new ValueMapperDataFrameFromTransform(env, tr);
+            var mapper = mapperTr.GetMapper<DataFrame, DataFrame>();
+
+            using (var server = new MicroBatchPredictionServer(env, mapper, maxBatchSize: 4, maxDelay: 50))
+            {
+                var rows = Enumerable.Range(0, df.Length).Select(i => df.Copy(new[] { i }, columns)).ToArray();
+                var tasks = rows.Select(r => server.PredictAsync(r)).ToArray();
+                System.Threading.Tasks.Task.WaitAll(tasks);
+                for (int i = 0; i < rows.Length; ++i)
+                {
+                    Assert.AreEqual(1, tasks[i].Result.Length);
+                    Assert.AreEqual(0, rows[i].AssertAlmostEqual(tasks[i].Result));
+                }
+
+                var single = server.Predict(rows[3]);
+                Assert.AreEqual(0, rows[3].AssertAlmostEqual(single));
+
+                Assert.AreEqual(rows.Length + 1, server.QueueLatency.Count);
+                Assert.IsTrue(server.BatchSize.Count < rows.Length + 1);
+                Assert.IsTrue(server.BatchSize.Quantile(1.0) <= 4);
+                var stats = server.GetStatistics();
+                Assert.AreEqual(2, stats.ColumnCount);
+                Assert.IsTrue(stats.Length > 0);
+            }
+
+            // A stopped server rejects new requests.
+            var stopped = new MicroBatchPredictionServer(env, mapper, maxBatchSize: 4, maxDelay: 50);
+            stopped.Dispose();
+            try
+            {
+                stopped.PredictAsync(df);
+                Assert.Fail("The server was stopped.");
+            }
+            catch (InvalidOperationException e)
+            {
+                StringAssert.Contains(e.Message, "stopped");
+            }
+        }
+
         #endregion
     }
 }
@@ -7,7 +7,9 @@ using System.IO;
 using System.Collections.Generic;
 using Microsoft.ML;
 using Microsoft.ML.Data;
+using Microsoft.ML.Runtime;
 using Scikit.ML.PipelineHelper;
+using Scikit.ML.DataManipulation;
 using Scikit.ML.RandomTransforms;
 using Scikit.ML.TestHelper;
 
@@ -90,6 +92,67 @@ namespace TestMachineLearningExt
             }
         }
 
+        [TestMethod]
+        public void TestI_ResampleHashedReplicas()
+        {
+            /*using (*/var env = EnvHelper.NewTestEnvironment(conc: 1);
+            {
+                var inputs = Enumerable.Range(0, 200).Select(i => new InputOutput() { X = new float[] { i, 1 }, Y = i }).ToArray();
+                var data = DataViewConstructionUtils.CreateFromEnumerable(env, inputs);
+
+                // Hashed mode: two runs return the same rows without any cache.
+                var args = new ResampleTransform.Arguments { lambda = 1f, seed = 5, hashed = true };
+                var tr = new ResampleTransform(env, args, data);
+                var run1 = DataFrameIO.ReadView(tr);
+                var run2 = DataFrameIO.ReadView(tr);
+                Assert.AreEqual(run1.ToString(), run2.ToString());
+                Assert.IsNull(tr.GetRowCount());
+
+                // Replicas: one pass, one row per input row, a column with the number of copies per replica.
+                var argsw = new ResampleTransform.Arguments { lambda = 1f, seed = 5, replicas = 10 };
+                var trw = new ResampleTransform(env, argsw, data);
+                Assert.AreEqual(inputs.Length, trw.GetRowCount());
+                var copies = new Dictionary<int, int>();
+                var sum = new double[10];
+                using (var cursor = trw.GetRowCursor(trw.Schema))
+                {
+                    var getY = cursor.GetGetter<int>(SchemaHelper._dc(1, cursor));
+                    var getW = cursor.GetGetter<VBuffer<float>>(SchemaHelper._dc(2, cursor));
+                    int y = 0;
+                    var w = new VBuffer<float>();
+                    while (cursor.MoveNext())
+                    {
+                        getY(ref y);
+                        getW(ref w);
+                        var dense = w.DenseValues().ToArray();
+                        Assert.AreEqual(10, dense.Length);
+                        for (int i = 0; i < dense.Length; ++i)
+                            sum[i] += dense[i];
+                        copies[y] = (int)dense[0];
+                    }
+                }
+                Assert.AreEqual(inputs.Length, copies.Count);
+                // Every replica has about as many rows as the input.
+                foreach (var s in sum)
+                    Assert.IsTrue(s > 100 && s < 300, $"Unexpected replica size {s}");
+
+                // The first replica gives the same copies as the hashed mode.
+                var ys = new Dictionary<int, int>();
+                using (var cursor = tr.GetRowCursor(tr.Schema))
+                {
+                    var getY = cursor.GetGetter<int>(SchemaHelper._dc(1, cursor));
+                    int y = 0;
+                    while (cursor.MoveNext())
+                    {
+                        getY(ref y);
+                        ys[y] = ys.ContainsKey(y) ? ys[y] + 1 : 1;
+                    }
+                }
+                foreach (var pair in copies)
+                    Assert.AreEqual(pair.Value, ys.ContainsKey(pair.Key) ? ys[pair.Key] : 0);
+            }
+        }
+
         #endregion
 
         #region Shake Input Transform
@@ -260,6 +323,68 @@ namespace TestMachineLearningExt
             }
         }
 
+        static List<float[]> ShakeInputTransformOutputs(IHostEnvironment host, IDataView data, IValueMapper mapper,
+                                                        ShakeInputTransform.ShakeAggregation aggregation, int batchSize, int? numThreads)
+        {
+            var args = new ShakeInputTransform.Arguments
+            {
+                inputColumn = "X",
+                inputFeaturesInt = new[] { 0, 1 },
+                outputColumns = new[] { "yo" },
+                values = "-10,10;-100,100",
+                aggregation = aggregation,
+                batchSize = batchSize,
+                numThreads = numThreads
+            };
+            var shake = new ShakeInputTransform(host, args, data, new IValueMapper[] { mapper });
+            var res = new List<float[]>();
+            using (var cursor = shake.GetRowCursor(shake.Schema))
+            {
+                var colGetter = cursor.GetGetter<VBuffer<float>>(SchemaHelper._dc(1, cursor));
+                while (cursor.MoveNext())
+                {
+                    VBuffer<float> got = new VBuffer<float>();
+                    colGetter(ref got);
+                    res.Add(got.DenseValues().ToArray());
+                }
+            }
+            return res;
+        }
+
+        [TestMethod]
+        public void Testl_ShakeInputTransformBatch()
+        {
+            /*using (*/var host = EnvHelper.NewTestEnvironment();
+            {
+                var inputs = Enumerable.Range(0, 7).Select(i => new SHExampleA() { X = new float[] { i, i * 2 + 1 } }).ToArray();
+                var data = DataViewConstructionUtils.CreateFromEnumerable(host, inputs);
+
+                foreach (var aggregation in new[] { ShakeInputTransform.ShakeAggregation.concatenate, ShakeInputTransform.ShakeAggregation.add })
+                {
+                    foreach (var mapper in new IValueMapper[] { new SHExampleValueMapper(), new ExampleValueMapperVector() })
+                    {
+                        var expected = ShakeInputTransformOutputs(host, data, mapper, aggregation, 0, null);
+                        Assert.AreEqual(inputs.Length, expected.Count);
+                        foreach (var batch in new[] { 2, 3, 10 })
+                        {
+                            foreach (var nt in new int?[] { null, 1, 3 })
+                            {
+                                var got = ShakeInputTransformOutputs(host, data, mapper, aggregation, batch, nt);
+                                Assert.AreEqual(expected.Count, got.Count);
+                                for (int i = 0; i < expected.Count; ++i)
+                                    CollectionAssert.AreEqual(expected[i], got[i]);
+                            }
+                        }
+                        // numThreads alone keeps the row by row cursor.
+                        var got2 = ShakeInputTransformOutputs(host, data, mapper, aggregation, 0, 2);
+                        Assert.AreEqual(expected.Count, got2.Count);
+                        for (int i = 0; i < expected.Count; ++i)
+                            CollectionAssert.AreEqual(expected[i], got2[i]);
+                    }
+                }
+            }
+        }
+
         #endregion
     }
 }
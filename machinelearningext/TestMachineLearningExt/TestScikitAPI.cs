@@ -292,6 +292,58 @@ namespace TestMachineLearningExt
             Assert.AreEqual(stderr.Count, 0);
         }
 
+        [TestMethod]
+        public void TestScikitAPI_DelegateEnvironmentProfiling()
+        {
+            var inputs = new[] {
+                new ExampleA() { X = new float[] { 1, 10, 100 } },
+                new ExampleA() { X = new float[] { 2, 3, 5 } }
+            };
+
+            var host = new DelegateEnvironment(seed: 0, outWriter: new LogWriter(s => { }), errWriter: new LogWriter(s => { }), verbose: 0);
+            ComponentHelper.AddStandardComponents(host);
+            var data = DataViewConstructionUtils.CreateFromEnumerable(host, inputs);
+            using (var pipe = new ScikitPipeline(new[] { "poly{col=X}" }, "km{k=2}", host: host))
+            {
+                pipe.Train(data, feature: "X");
+                Assert.IsNull(pipe.GetProfilingReport());
+
+                var profiler = host.EnableProfiling();
+                var predictions = pipe.Predict(data);
+                var df = DataFrameIO.ReadView(predictions);
+                Assert.AreEqual(2, df.Length);
+
+                var steps = profiler.Report();
+                Assert.IsTrue(steps.Length >= 3);
+                Assert.AreEqual(0, steps[0].Index);
+                foreach (var step in steps)
+                {
+                    Assert.AreEqual(2, step.Rows);
+                    Assert.IsTrue(step.CursorCreations > 0);
+                    Assert.IsTrue(step.SelfTime >= 0);
+                }
+                Assert.IsTrue(steps.Last().GetterCalls > 0);
+
+                var report = pipe.GetProfilingReport();
+                Assert.AreEqual(steps.Length, report.Length);
+                var json = profiler.ToJson();
+                Assert.IsTrue(json.StartsWith("[{\"index\":0,"));
+
+                // The fast mapper is rebuilt with instrumented views.
+                profiler.Reset();
+                var dfin = DataFrameIO.ReadView(data);
+                DataFrame pred = null;
+                pipe.Predict(dfin, ref pred);
+                Assert.AreEqual(2, pred.Length);
+                Assert.IsTrue(profiler.Report().All(c => c.Rows > 0));
+
+                host.DisableProfiling();
+                Assert.IsNull(pipe.Profiler);
+                pipe.Predict(dfin, ref pred);
+                Assert.AreEqual(2, pred.Length);
+            }
+        }
+
         [TestMethod]
         public void TestScikitAPI_SimplePredictor_FastValueMapper()
         {
@@ -341,6 +393,57 @@ namespace TestMachineLearningExt
             }
         }
 
+        [TestMethod]
+        public void TestScikitAPI_SimplePredictor_Compile()
+        {
+            var inputs = new[] {
+                new ExampleA() { X = new float[] { 1, 10, 100 } },
+                new ExampleA() { X = new float[] { 2, 3, 5 } },
+                new ExampleA() { X = new float[] { 2, 4, 5 } },
+                new ExampleA() { X = new float[] { 2, 4, 7 } },
+            };
+
+            var host = EnvHelper.NewTestEnvironment(conc: 1);
+            var data = DataViewConstructionUtils.CreateFromEnumerable(host, inputs);
+            var df = DataFrameIO.ReadView(data, env: host, keepVectors: true);
+
+            using (var pipe = new ScikitPipeline(new[] { "poly{col=X}" }, "km{k=2}", host))
+            {
+                DataFrame pred = null, pred2 = null, pred3 = null;
+                pipe.Train(df, feature: "X");
+                pipe.Predict(df, ref pred);
+
+                using (var compiled = pipe.Compile())
+                {
+                    // PolynomialTransform needs a cursor, the scorer does not.
+                    Assert.AreEqual(1, compiled.BridgedSteps);
+                    Assert.AreEqual(1, compiled.FusedSteps);
+                    compiled.Predict(df, ref pred2);
+                    Assert.AreEqual(pred.Shape, pred2.Shape);
+                    pred.AssertAlmostEqual(pred2);
+
+                    // The output is reused.
+                    compiled.Predict(df, ref pred3);
+                    compiled.Predict(df, ref pred3);
+                    pred.AssertAlmostEqual(pred3);
+                }
+            }
+
+            var iris = FileHelper.GetTestFile("iris.txt");
+            var dfi = DataFrameIO.ReadCsv(iris, sep: '\t');
+            dfi.AddColumn("LabelI", dfi["Label"].AsType(NumberDataViewType.Single));
+            var pipei = new ScikitPipeline(new[] { $"Concat{{col=Features:{dfi.Columns[1]},{dfi.Columns[2]}}}" }, "mlr");
+            pipei.Train(dfi, "Features", "LabelI");
+            DataFrame predi = null, predi2 = null;
+            pipei.Predict(dfi, ref predi);
+            using (var compiled = pipei.Compile())
+            {
+                Assert.AreEqual(0, compiled.BridgedSteps);
+                compiled.Predict(dfi, ref predi2);
+                predi.AssertAlmostEqual(predi2);
+            }
+        }
+
         [TestMethod]
         public void TestScikitAPI_TrainingWithIris()
         {
@@ -3,8 +3,10 @@
 using Microsoft.VisualStudio.TestTools.UnitTesting;
 using System;
 using System.Collections.Generic;
+using System.IO;
 using Microsoft.ML;
 using Microsoft.ML.Data;
+using Microsoft.ML.Model;
 using Scikit.ML.PipelineHelper;
 using Scikit.ML.TestHelper;
 using Scikit.ML.DataManipulation;
@@ -239,6 +241,138 @@ namespace TestMachineLearningExt
             }
         }
 
+        class InputOutputGroup
+        {
+            public float X;
+            public float time;
+            public int group;
+        }
+
+        static List<float> ReadDeTrended(IDataView view)
+        {
+            var outValues = new List<float>();
+            using (var cursor = view.GetRowCursor(view.Schema))
+            {
+                int pos = SchemaHelper.GetColumnIndex(cursor.Schema, "Y");
+                var colGetter = cursor.GetGetter<float>(SchemaHelper._dc(pos, cursor));
+                float got = -1f;
+                while (cursor.MoveNext())
+                {
+                    colGetter(ref got);
+                    outValues.Add(got);
+                }
+            }
+            return outValues;
+        }
+
+        [TestMethod]
+        public void TestTimeSeriesDeTrendStreaming()
+        {
+            // Two interleaved series, 2t+1 and 5-t.
+            var inputs = new List<InputOutputGroup>();
+            for (int t = 0; t < 6; ++t)
+            {
+                inputs.Add(new InputOutputGroup() { X = 2f * t + 1, time = t, group = 0 });
+                inputs.Add(new InputOutputGroup() { X = 5f - t, time = t, group = 1 });
+            }
+            var next = new[] {
+                new InputOutputGroup() { X = 13f, time = 6f, group = 0 },
+                new InputOutputGroup() { X = -1f, time = 6f, group = 1 },
+            };
+
+            /*using (*/var host = EnvHelper.NewTestEnvironment();
+            {
+                var data = DataViewConstructionUtils.CreateFromEnumerable(host, inputs.ToArray());
+                var args = new DeTrendTransform.Arguments
+                {
+                    columns = new[] { new Scikit.ML.PipelineHelper.Column1x1() { Source = "X", Name = "Y" } },
+                    timeColumn = "time",
+                    streaming = true,
+                    groupColumn = "group"
+                };
+                var detrend = new DeTrendTransform(host, args, data);
+
+                var values = ReadDeTrended(detrend);
+                Assert.AreEqual(inputs.Count, values.Count);
+                foreach (var v in values)
+                    Assert.AreEqual(0f, v, 1e-4f);
+
+                // A second pass starts from the same statistics.
+                var values2 = ReadDeTrended(detrend);
+                CollectionAssert.AreEqual(values, values2);
+
+                var stats = detrend.GetTrendStatistics();
+                Assert.AreEqual(2, stats.Count);
+                Assert.AreEqual(6, stats["0"].Count);
+                Assert.AreEqual(21f, stats["0"].Trend(10f), 1e-3f);
+                Assert.AreEqual(-5f, stats["1"].Trend(10f), 1e-3f);
+
+                // Saves the statistics and continues the series with the restored model.
+                var methodName = System.Reflection.MethodBase.GetCurrentMethod().Name;
+                var outModelFilePath = FileHelper.GetOutputFile("outModelFilePath.zip", methodName);
+                StreamHelper.SaveModel(host, detrend, outModelFilePath);
+
+                var nextData = DataViewConstructionUtils.CreateFromEnumerable(host, next);
+                using (var fs = File.OpenRead(outModelFilePath))
+                {
+                    var restored = ModelFileUtils.LoadTransforms(host, nextData, fs) as DeTrendTransform;
+                    Assert.IsNotNull(restored);
+                    var restoredStats = restored.GetTrendStatistics();
+                    Assert.AreEqual(6, restoredStats["1"].Count);
+                    Assert.AreEqual(-5f, restoredStats["1"].Trend(10f), 1e-3f);
+
+                    var nextValues = ReadDeTrended(restored);
+                    Assert.AreEqual(2, nextValues.Count);
+                    foreach (var v in nextValues)
+                        Assert.AreEqual(0f, v, 1e-4f);
+                    Assert.AreEqual(7, restored.GetTrendStatistics()["0"].Count);
+                }
+            }
+        }
+
+        [TestMethod]
+        public void TestTimeSeriesTrendStatisticsWindow()
+        {
+            // The window only keeps the last line.
+            var stats = new TrendStatistics(1, 3);
+            for (int t = 0; t < 5; ++t)
+                stats.Add(t, t * t);
+            var expected = new TrendStatistics(1);
+            for (int t = 2; t < 5; ++t)
+                expected.Add(t, t * t);
+            Assert.AreEqual(3, stats.Count);
+            Assert.AreEqual(expected.Trend(7f), stats.Trend(7f), 1e-3f);
+
+            var copy = stats.Clone();
+            Assert.AreEqual(stats.Update(5f, 1f), copy.Update(5f, 1f), 1e-5f);
+
+            var degree2 = new TrendStatistics(2);
+            for (int t = 0; t < 5; ++t)
+                degree2.Add(t + 1000, t * t - 3 * t + 2);
+            Assert.AreEqual(49f - 21f + 2f, degree2.Trend(1007f), 1e-2f);
+        }
+
+        [TestMethod]
+        public void TestTimeSeriesTrendStatisticsLongWindow()
+        {
+            // A moving mean would lag behind the line by half the window.
+            var linear = new TrendStatistics(1, 50);
+            int t;
+            for (t = 0; t <= 200000; ++t)
+                linear.Add(t, 3 + 0.5f * t);
+            --t;
+            Assert.AreEqual(50, linear.Count);
+            Assert.AreEqual(3 + 0.5f * t, linear.Trend(t), 0.05f);
+            Assert.AreEqual(0.5f, (linear.Trend(t) - linear.Trend(t - 40)) / 40, 1e-3f);
+
+            var quadratic = new TrendStatistics(2, 50);
+            for (t = 0; t <= 20000; ++t)
+                quadratic.Add(t, 1e-5f * t * t);
+            --t;
+            Assert.AreEqual(1e-5f * t * t, quadratic.Trend(t), 0.05f);
+            Assert.AreEqual(2e-5f * t, (quadratic.Trend(t) - quadratic.Trend(t - 10)) / 10, 2e-5f * t * 0.02f);
+        }
+
         [TestMethod]
         public void TestTimeSeriesDeTrendSerialize()
         {
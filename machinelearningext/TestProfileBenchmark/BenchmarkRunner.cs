@@ -0,0 +1,170 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using Newtonsoft.Json;
+
+
+namespace TestProfileBenchmark
+{
+    /// <summary>
+    /// Measures of one scenario.
+    /// </summary>
+    public class BenchmarkResult
+    {
+        [JsonProperty("name")]
+        public string Name;
+        [JsonProperty("size")]
+        public int Size;
+        [JsonProperty("repeat")]
+        public int Repeat;
+        [JsonProperty("items")]
+        public long Items;
+        [JsonProperty("time_min")]
+        public double TimeMin;
+        [JsonProperty("time_median")]
+        public double TimeMedian;
+        [JsonProperty("time_mean")]
+        public double TimeMean;
+        [JsonProperty("time_max")]
+        public double TimeMax;
+        [JsonProperty("allocated_bytes")]
+        public long AllocatedBytes;
+        [JsonProperty("gen0_collections")]
+        public double Gen0Collections;
+        [JsonProperty("throughput")]
+        public double Throughput;
+        [JsonProperty("error", NullValueHandling = NullValueHandling.Ignore)]
+        public string Error;
+    }
+
+    /// <summary>
+    /// Results of a benchmark run.
+    /// </summary>
+    public class BenchmarkReport
+    {
+        [JsonProperty("date")]
+        public string Date;
+        [JsonProperty("machine")]
+        public Dictionary<string, string> Machine;
+        [JsonProperty("configuration")]
+        public string Configuration;
+        [JsonProperty("size")]
+        public int Size;
+        [JsonProperty("seed")]
+        public int Seed;
+        [JsonProperty("results")]
+        public List<BenchmarkResult> Results;
+    }
+
+    /// <summary>
+    /// Runs scenarios and collects wall time, allocations and throughput.
+    /// Every scenario is run <i>warmup</i> times without measuring (JIT, caches)
+    /// then <i>repeat</i> times. Times are expressed in seconds,
+    /// allocations in bytes (mean per run, allocations made by the current thread only),
+    /// throughput in items per second based on the median time.
+    /// </summary>
+    public static class BenchmarkRunner
+    {
+        public static BenchmarkResult Run(BenchmarkScenario scenario, int size, int repeat = 5, int warmup = 1, int seed = 0)
+        {
+            if (repeat <= 0)
+                throw new ArgumentException("repeat must be > 0");
+            using (var bench = scenario.Setup(size, seed))
+            {
+                for (int i = 0; i < warmup; ++i)
+                {
+                    bench.Prepare?.Invoke();
+                    bench.Run();
+                }
+
+                var times = new double[repeat];
+                long allocated = 0;
+                long gen0 = 0;
+                long items = 0;
+                var sw = new Stopwatch();
+                for (int i = 0; i < repeat; ++i)
+                {
+                    bench.Prepare?.Invoke();
+                    GC.Collect();
+                    GC.WaitForPendingFinalizers();
+                    long bytes = GC.GetAllocatedBytesForCurrentThread();
+                    int collections = GC.CollectionCount(0);
+                    sw.Restart();
+                    items = bench.Run();
+                    sw.Stop();
+                    allocated += GC.GetAllocatedBytesForCurrentThread() - bytes;
+                    gen0 += GC.CollectionCount(0) - collections;
+                    times[i] = sw.Elapsed.TotalSeconds;
+                }
+
+                Array.Sort(times);
+                double median = repeat % 2 == 1 ? times[repeat / 2] : (times[repeat / 2 - 1] + times[repeat / 2]) / 2;
+                return new BenchmarkResult()
+                {
+                    Name = scenario.Name,
+                    Size = size,
+                    Repeat = repeat,
+                    Items = items,
+                    TimeMin = times[0],
+                    TimeMedian = median,
+                    TimeMean = times.Average(),
+                    TimeMax = times[repeat - 1],
+                    AllocatedBytes = allocated / repeat,
+                    Gen0Collections = (double)gen0 / repeat,
+                    Throughput = median > 0 ? items / median : 0
+                };
+            }
+        }
+
+        public static BenchmarkReport RunAll(IEnumerable<BenchmarkScenario> scenarios, int size, int repeat = 5,
+                                             int warmup = 1, int seed = 0, Action<string> log = null)
+        {
+            var report = new BenchmarkReport()
+            {
+                Date = DateTime.UtcNow.ToString("o"),
+                Machine = new Dictionary<string, string>()
+                {
+                    ["machine"] = Environment.MachineName,
+                    ["os"] = Environment.OSVersion.ToString(),
+                    ["processors"] = Environment.ProcessorCount.ToString(),
+                    ["runtime"] = Environment.Version.ToString(),
+                    ["is64bits"] = Environment.Is64BitProcess.ToString()
+                },
+#if (DEBUG)
+                Configuration = "Debug",
+#else
+                Configuration = "Release",
+#endif
+                Size = size,
+                Seed = seed,
+                Results = new List<BenchmarkResult>()
+            };
+
+            foreach (var scenario in scenarios)
+            {
+                log?.Invoke($"[benchmark] {scenario.Name} size={size} repeat={repeat}");
+                BenchmarkResult res;
+                try
+                {
+                    res = Run(scenario, size, repeat, warmup, seed);
+                }
+                catch (Exception e)
+                {
+                    // A failing scenario must not prevent the others from being measured.
+                    res = new BenchmarkResult() { Name = scenario.Name, Size = size, Repeat = repeat, Error = e.Message };
+                }
+                log?.Invoke($"[benchmark] {scenario.Name} median={res.TimeMedian:G4}s throughput={res.Throughput:G4}/s allocated={res.AllocatedBytes}");
+                report.Results.Add(res);
+            }
+            return report;
+        }
+
+        public static string ToJson(BenchmarkReport report)
+        {
+            return JsonConvert.SerializeObject(report, Formatting.Indented);
+        }
+    }
+}
@@ -0,0 +1,215 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using Scikit.ML.TestHelper;
+using Scikit.ML.DataManipulation;
+using Scikit.ML.NearestNeighbors;
+using Scikit.ML.Clustering;
+using Scikit.ML.ScikitAPI;
+
+
+namespace TestProfileBenchmark
+{
+    /// <summary>
+    /// One measured case of a scenario. <i>Prepare</i> is called before every run
+    /// and is not measured, <i>Run</i> returns the number of processed items
+    /// used to compute the throughput.
+    /// </summary>
+    public class BenchmarkCase : IDisposable
+    {
+        public Action Prepare;
+        public Func<long> Run;
+        public Action Cleanup;
+
+        public void Dispose()
+        {
+            Cleanup?.Invoke();
+        }
+    }
+
+    /// <summary>
+    /// A named scenario. <i>Setup</i> receives the size of the data and a seed,
+    /// generates the data and returns the case to measure.
+    /// </summary>
+    public class BenchmarkScenario
+    {
+        public string Name;
+        public string Description;
+        public Func<int, int, BenchmarkCase> Setup;
+    }
+
+    /// <summary>
+    /// Scenarios covering the main subsystems of the library.
+    /// </summary>
+    public static class BenchmarkScenarios
+    {
+        /// <summary>
+        /// Maximum number of calls for scenarios calling a function on a single observation.
+        /// </summary>
+        public const int MaxSingleCalls = 1000;
+
+        public static readonly BenchmarkScenario[] All = new[]
+        {
+            new BenchmarkScenario() { Name = "csv_read", Description = "DataFrameIO.ReadCsv on a file with 10 float columns", Setup = CsvRead },
+            new BenchmarkScenario() { Name = "dataframe_sort", Description = "DataFrame.Sort on an integer and a float column", Setup = DataFrameSort },
+            new BenchmarkScenario() { Name = "dataframe_groupby", Description = "DataFrame.GroupBy on 100 keys followed by Sum", Setup = DataFrameGroupBy },
+            new BenchmarkScenario() { Name = "dataframe_join", Description = "DataFrame.Join (inner) with a table of 100 keys", Setup = DataFrameJoin },
+            new BenchmarkScenario() { Name = "kdtree_build", Description = "KdTree construction on 3D points", Setup = KdTreeBuild },
+            new BenchmarkScenario() { Name = "kdtree_query", Description = $"KdTree 5 nearest neighbors for at most {MaxSingleCalls} points", Setup = KdTreeQuery },
+            new BenchmarkScenario() { Name = "dbscan", Description = "DBScan clustering on 3D points", Setup = DBScanCluster },
+            new BenchmarkScenario() { Name = "engine_single", Description = $"ScikitPipeline.Predict on one row, at most {MaxSingleCalls} calls", Setup = EngineSingle },
+            new BenchmarkScenario() { Name = "engine_batch", Description = "ScikitPipeline.Predict on all rows", Setup = EngineBatch },
+        };
+
+        /// <summary>
+        /// Returns the scenarios matching the given names, all of them if names is null or empty.
+        /// </summary>
+        public static BenchmarkScenario[] Select(IEnumerable<string> names)
+        {
+            if (names == null || !names.Any())
+                return All;
+            var map = All.ToDictionary(c => c.Name);
+            return names.Select(name =>
+            {
+                if (!map.ContainsKey(name))
+                    throw new ArgumentException($"Unknown scenario '{name}', expected one of {string.Join(", ", map.Keys)}.");
+                return map[name];
+            }).ToArray();
+        }
+
+        static BenchmarkCase CsvRead(int size, int seed)
+        {
+            var df = SyntheticData.Regression(size, seed: seed);
+            var filename = Path.GetTempFileName();
+            df.ToCsv(filename, silent: true);
+            return new BenchmarkCase()
+            {
+                Run = () => DataFrameIO.ReadCsv(filename).Length,
+                Cleanup = () => File.Delete(filename)
+            };
+        }
+
+        static BenchmarkCase DataFrameSort(int size, int seed)
+        {
+            var df = SyntheticData.Regression(size, seed: seed);
+            DataFrame copy = null;
+            return new BenchmarkCase()
+            {
+                // Sorting is inplace, every run starts from the unsorted data.
+                Prepare = () => copy = df.Copy(),
+                Run = () =>
+                {
+                    copy.Sort(new[] { "Key", "F0" });
+                    return copy.Length;
+                }
+            };
+        }
+
+        static BenchmarkCase DataFrameGroupBy(int size, int seed)
+        {
+            var df = SyntheticData.Regression(size, seed: seed);
+            return new BenchmarkCase()
+            {
+                Run = () =>
+                {
+                    df.GroupBy(new[] { "Key" }).Sum();
+                    return df.Length;
+                }
+            };
+        }
+
+        static BenchmarkCase DataFrameJoin(int size, int seed)
+        {
+            var left = SyntheticData.Regression(size, seed: seed);
+            var right = SyntheticData.Keys(100, seed: seed);
+            return new BenchmarkCase()
+            {
+                Run = () => left.Join(right, new[] { "Key" }, new[] { "Key" }, rightSuffix: "_r").Length
+            };
+        }
+
+        static BenchmarkCase KdTreeBuild(int size, int seed)
+        {
+            var points = SyntheticData.Points(size, seed: seed);
+            return new BenchmarkCase()
+            {
+                Run = () => new KdTree(points, seed: seed).Count()
+            };
+        }
+
+        static BenchmarkCase KdTreeQuery(int size, int seed)
+        {
+            var points = SyntheticData.Points(size, seed: seed);
+            var tree = new KdTree(points, seed: seed);
+            var queries = SyntheticData.Points(Math.Min(size, MaxSingleCalls), seed: seed + 1);
+            return new BenchmarkCase()
+            {
+                Run = () =>
+                {
+                    foreach (var q in queries)
+                        tree.NearestNNeighbors(q, 5);
+                    return queries.Count;
+                }
+            };
+        }
+
+        static BenchmarkCase DBScanCluster(int size, int seed)
+        {
+            var points = SyntheticData.Points(size, seed: seed);
+            return new BenchmarkCase()
+            {
+                Run = () => new DBScan(points, seed).Cluster(0.3f, 5, seed: seed).Count
+            };
+        }
+
+        static ScikitPipeline TrainPipeline(DataFrame df, int seed, out Action cleanup)
+        {
+            var env = EnvHelper.NewTestEnvironment(seed: seed, conc: 1);
+            var features = string.Join(",", Enumerable.Range(0, 10).Select(i => $"F{i}"));
+            var pipe = new ScikitPipeline(new[] { $"Concat{{col=Features:{features}}}" }, "sasdcar{iter=10}", env);
+            pipe.Train(df, "Features", "Label");
+            cleanup = () => pipe.Dispose();
+            return pipe;
+        }
+
+        static BenchmarkCase EngineSingle(int size, int seed)
+        {
+            var df = SyntheticData.Regression(size, seed: seed);
+            Action cleanup;
+            var pipe = TrainPipeline(df, seed, out cleanup);
+            int nb = Math.Min(size, MaxSingleCalls);
+            var rows = Enumerable.Range(0, nb).Select(i => df.Copy(new[] { i }, Enumerable.Range(0, df.ColumnCount))).ToArray();
+            DataFrame pred = null;
+            return new BenchmarkCase()
+            {
+                Run = () =>
+                {
+                    foreach (var row in rows)
+                        pipe.Predict(row, ref pred);
+                    return nb;
+                },
+                Cleanup = cleanup
+            };
+        }
+
+        static BenchmarkCase EngineBatch(int size, int seed)
+        {
+            var df = SyntheticData.Regression(size, seed: seed);
+            Action cleanup;
+            var pipe = TrainPipeline(df, seed, out cleanup);
+            DataFrame pred = null;
+            return new BenchmarkCase()
+            {
+                Run = () =>
+                {
+                    pipe.Predict(df, ref pred);
+                    return pred.Length;
+                },
+                Cleanup = cleanup
+            };
+        }
+    }
+}
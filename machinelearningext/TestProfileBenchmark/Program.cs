@@ -1,48 +1,84 @@
 ﻿using System;
+using System.IO;
+using System.Linq;
 
 namespace TestProfileBenchmark
 {
+    /// <summary>
+    /// Runs the benchmark scenarios, usually called by <tt>benchmark.py</tt>.
+    /// <code>
+    /// TestProfileBenchmark --list
+    /// TestProfileBenchmark [--scenarios name1,name2] [--size 10000] [--repeat 5] [--warmup 1] [--seed 0] [--output results.json]
+    /// </code>
+    /// </summary>
     class Program
     {
-        static void Main(string[] args)
+        static void Usage()
         {
-            var cl = DynamicCSFunctions_example_diabetes.ReturnMLClassRF(@"C:\xavierdupre\__home_\GitHub\jupytalk\_doc\notebooks\2018\msexp\diabetes.csv");
-            cl.Train();
-            cl.Predict(new double[] { 0, 1, 2, 3, 4, 5, 6, 7, 8, 9 });
-            cl.PredictBatch(10, new double[] { 0, 1, 2, 3, 4, 5, 6, 7, 8, 9});
-            cl.Save("f.zip");
+            Console.WriteLine("usage: TestProfileBenchmark [--list] [--scenarios name1,name2] [--size N] [--repeat R] [--warmup W] [--seed S] [--output filename.json]");
+        }
 
-#if(DEBUG)
-            int N = 10;
-#else
-            int N = 2000;
-#endif
-            Console.WriteLine("Test scikit...");
-            for (int ncall = 1; ncall <= 2; ++ncall)
-            {
-                for (int th = 1; th <= 4; ++th)
-                {
-                    foreach (var cache in new[] { true, false })
-                    {
-                        var df1 = Benchmark_PredictionEngine.TestScikitAPI_EngineSimpleTrainAndPredict("scikit", th, N, ncall, cache);
-                        Console.WriteLine(df1.ToString());
-                    }
-                }
-            }
+        static int Main(string[] args)
+        {
+            string[] names = null;
+            string output = null;
+            int size = 10000;
+            int repeat = 5;
+            int warmup = 1;
+            int seed = 0;
 
-            Console.WriteLine("");
-            Console.WriteLine("Test mlnet...");
-            for (int ncall = 1; ncall <= 2; ++ncall)
+            for (int i = 0; i < args.Length; ++i)
             {
-                for (int th = 1; th <= 4; ++th)
+                string value = i + 1 < args.Length ? args[i + 1] : null;
+                switch (args[i])
                 {
-                    foreach (var cache in new[] { true, false })
-                    {
-                        var df2 = Benchmark_PredictionEngine.TestScikitAPI_EngineSimpleTrainAndPredict("mlnet", th, N, ncall, cache);
-                        Console.WriteLine(df2.ToString());
-                    }
+                    case "--list":
+                        foreach (var sc in BenchmarkScenarios.All)
+                            Console.WriteLine($"{sc.Name}\t{sc.Description}");
+                        return 0;
+                    case "--scenarios":
+                        names = value.Split(new[] { ',' }, StringSplitOptions.RemoveEmptyEntries).Select(c => c.Trim()).ToArray();
+                        ++i;
+                        break;
+                    case "--size":
+                        size = int.Parse(value);
+                        ++i;
+                        break;
+                    case "--repeat":
+                        repeat = int.Parse(value);
+                        ++i;
+                        break;
+                    case "--warmup":
+                        warmup = int.Parse(value);
+                        ++i;
+                        break;
+                    case "--seed":
+                        seed = int.Parse(value);
+                        ++i;
+                        break;
+                    case "--output":
+                        output = value;
+                        ++i;
+                        break;
+                    case "--help":
+                    case "-h":
+                        Usage();
+                        return 0;
+                    default:
+                        Console.Error.WriteLine($"Unknown argument '{args[i]}'.");
+                        Usage();
+                        return 2;
                 }
             }
+
+            var scenarios = BenchmarkScenarios.Select(names);
+            var report = BenchmarkRunner.RunAll(scenarios, size, repeat, warmup, seed, s => Console.Error.WriteLine(s));
+            var json = BenchmarkRunner.ToJson(report);
+            if (output == null)
+                Console.WriteLine(json);
+            else
+                File.WriteAllText(output, json);
+            return report.Results.Any(c => c.Error != null) ? 1 : 0;
         }
     }
 }
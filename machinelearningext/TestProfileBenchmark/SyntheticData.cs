@@ -0,0 +1,82 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using Scikit.ML.DataManipulation;
+using Scikit.ML.NearestNeighbors;
+
+
+namespace TestProfileBenchmark
+{
+    /// <summary>
+    /// Generates reproducible synthetic datasets for the benchmarks.
+    /// </summary>
+    public static class SyntheticData
+    {
+        /// <summary>
+        /// Creates a dataframe with <i>nbFeatures</i> float columns F0, F1, ...,
+        /// an integer column Key with <i>nbKeys</i> distinct values and a float column Label
+        /// which is a noisy linear combination of the features.
+        /// </summary>
+        public static DataFrame Regression(int nbRows, int nbFeatures = 10, int nbKeys = 100, int seed = 0)
+        {
+            var rnd = new Random(seed);
+            var coef = Enumerable.Range(0, nbFeatures).Select(i => (float)(rnd.NextDouble() * 2 - 1)).ToArray();
+            var features = new float[nbFeatures][];
+            for (int j = 0; j < nbFeatures; ++j)
+                features[j] = new float[nbRows];
+            var keys = new int[nbRows];
+            var label = new float[nbRows];
+            for (int i = 0; i < nbRows; ++i)
+            {
+                float y = (float)(rnd.NextDouble() * 0.1);
+                for (int j = 0; j < nbFeatures; ++j)
+                {
+                    features[j][i] = (float)rnd.NextDouble();
+                    y += coef[j] * features[j][i];
+                }
+                keys[i] = rnd.Next(nbKeys);
+                label[i] = y;
+            }
+
+            var df = new DataFrame();
+            df.AddColumn("Label", label);
+            df.AddColumn("Key", keys);
+            for (int j = 0; j < nbFeatures; ++j)
+                df.AddColumn($"F{j}", features[j]);
+            return df;
+        }
+
+        /// <summary>
+        /// Creates a dataframe with one row per key, columns Key and Weight.
+        /// </summary>
+        public static DataFrame Keys(int nbKeys, int seed = 0)
+        {
+            var rnd = new Random(seed);
+            var df = new DataFrame();
+            df.AddColumn("Key", Enumerable.Range(0, nbKeys).ToArray());
+            df.AddColumn("Weight", Enumerable.Range(0, nbKeys).Select(i => (float)rnd.NextDouble()).ToArray());
+            return df;
+        }
+
+        /// <summary>
+        /// Creates points around <i>nbClusters</i> centers.
+        /// </summary>
+        public static List<IPointIdFloat> Points(int nbPoints, int dimension = 3, int nbClusters = 5, int seed = 0)
+        {
+            var rnd = new Random(seed);
+            var centers = Enumerable.Range(0, nbClusters)
+                                    .Select(c => Enumerable.Range(0, dimension).Select(d => (float)(rnd.NextDouble() * 10)).ToArray())
+                                    .ToArray();
+            var points = new List<IPointIdFloat>(nbPoints);
+            for (int i = 0; i < nbPoints; ++i)
+            {
+                var center = centers[rnd.Next(nbClusters)];
+                var coord = center.Select(c => c + (float)(rnd.NextDouble() - 0.5)).ToArray();
+                points.Add(new PointIdFloat(i, coord));
+            }
+            return points;
+        }
+    }
+}
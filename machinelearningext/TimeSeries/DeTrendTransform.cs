@@ -2,6 +2,8 @@
 
 using System;
 using System.Collections.Generic;
+using System.Globalization;
+using System.Linq;
 using Microsoft.ML;
 using Microsoft.ML.Data;
 using Microsoft.ML.CommandLine;
@@ -31,6 +33,14 @@ namespace Scikit.ML.TimeSeries
 
     /// <summary>
     /// Remove the trends of a timeseries.
+    /// By default, the trend is a regressor trained on the whole series.
+    /// With <tt>streaming</tt>, the trend is a polynomial whose sufficient statistics
+    /// (see <see cref="TrendStatistics"/>) are updated with every new observation,
+    /// one per group if a group column is specified. The output of a row only
+    /// depends on the previous rows and the cost per row does not depend on the history.
+    /// Every pass starts from the same initial statistics, empty or restored
+    /// from a model, so that two passes produce the same outputs. The statistics obtained
+    /// at the end of the last complete pass are saved with the model.
     /// </summary>
     public class DeTrendTransform : TransformBase
     {
@@ -44,8 +54,8 @@ namespace Scikit.ML.TimeSeries
         {
             return new VersionInfo(
                 modelSignature: "DETRNDTS",
-                verWrittenCur: 0x00010001,
-                verReadableCur: 0x00010001,
+                verWrittenCur: 0x00010002,
+                verReadableCur: 0x00010002,
                 verWeCanReadBack: 0x00010001,
                 loaderSignature: LoaderSignature,
                 loaderAssemblyName: typeof(DeTrendTransform).Assembly.FullName);
@@ -68,11 +78,27 @@ namespace Scikit.ML.TimeSeries
             public IComponentFactory<ITrainer> optim =
                 new ScikitSubComponent<ITrainer, SignatureRegressorTrainer>("sasdcar");
 
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Updates a polynomial trend with every new observation instead of training a regressor (optim is ignored).", ShortName = "stream")]
+            public bool streaming = false;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Degree of the polynomial trend (streaming only).", ShortName = "d")]
+            public int degree = 1;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Number of last observations the trend is fitted on, 0 for all (streaming only).", ShortName = "w")]
+            public int windowSize = 0;
+
+            [Argument(ArgumentType.AtMostOnce, HelpText = "Column which contains the series identifier, one trend per value (streaming only).", ShortName = "g")]
+            public string groupColumn;
+
             public void Write(ModelSaveContext ctx, IHost host)
             {
                 ctx.Writer.Write(Column1x1.ArrayToLine(columns));
                 ctx.Writer.Write(timeColumn);
                 ctx.Writer.Write(optim.ToString());
+                ctx.Writer.Write(streaming);
+                ctx.Writer.Write(degree);
+                ctx.Writer.Write(windowSize);
+                ctx.Writer.Write(groupColumn ?? string.Empty);
             }
 
             public void Read(ModelLoadContext ctx, IHost host)
@@ -82,6 +108,16 @@ namespace Scikit.ML.TimeSeries
                 timeColumn = ctx.Reader.ReadString();
                 var opt = ctx.Reader.ReadString();
                 optim = new ScikitSubComponent<ITrainer, SignatureRegressorTrainer>(opt);
+                if (ctx.Header.ModelVerWritten >= 0x00010002)
+                {
+                    streaming = ctx.Reader.ReadBoolean();
+                    degree = ctx.Reader.ReadInt32();
+                    windowSize = ctx.Reader.ReadInt32();
+                    groupColumn = ctx.Reader.ReadString();
+                    if (string.IsNullOrEmpty(groupColumn))
+                        groupColumn = null;
+                    host.CheckDecode(degree >= 0 && windowSize >= 0);
+                }
             }
         }
 
@@ -94,6 +130,8 @@ namespace Scikit.ML.TimeSeries
         Arguments _args;                // parameters
         DataViewSchema _schema;                 // We need the schema the transform outputs.
         object _lock;
+        Dictionary<string, TrendStatistics> _initialStatistics;    // streaming: statistics every pass starts from
+        Dictionary<string, TrendStatistics> _trendStatistics;      // streaming: statistics after the last complete pass
 
         public override DataViewSchema OutputSchema { get { return _schema; } }
 
@@ -116,6 +154,15 @@ namespace Scikit.ML.TimeSeries
             _trend = null;
             _transform = null;
             _lock = new object();
+            if (_args.streaming)
+            {
+                Host.CheckUserArg(_args.degree >= 0, nameof(_args.degree), "must be >= 0");
+                Host.CheckUserArg(_args.windowSize >= 0, nameof(_args.windowSize), "must be >= 0");
+                if (!string.IsNullOrEmpty(_args.groupColumn))
+                    SchemaHelper.GetColumnIndex(input.Schema, _args.groupColumn);
+                _initialStatistics = new Dictionary<string, TrendStatistics>();
+                _trendStatistics = _initialStatistics;
+            }
         }
 
         public static DeTrendTransform Create(IHostEnvironment env, ModelLoadContext ctx, IDataView input)
@@ -130,12 +177,24 @@ namespace Scikit.ML.TimeSeries
 
         private protected override void SaveModel(ModelSaveContext ctx)
         {
-            Host.CheckValue(_trend, "No trend predictor was ever trained. The model cannot be saved.");
+            if (!_args.streaming)
+                Host.CheckValue(_trend, "No trend predictor was ever trained. The model cannot be saved.");
             Host.CheckValue(ctx, "ctx");
             ctx.CheckAtModel();
             ctx.SetVersionInfo(GetVersionInfo());
             _args.Write(ctx, Host);
-            ctx.SaveModel(_trend, "trend");
+            if (_args.streaming)
+            {
+                var stats = GetTrendStatistics();
+                ctx.Writer.Write(stats.Count);
+                foreach (var pair in stats.OrderBy(c => c.Key, StringComparer.Ordinal))
+                {
+                    ctx.Writer.Write(pair.Key);
+                    pair.Value.Write(ctx.Writer);
+                }
+            }
+            else
+                ctx.SaveModel(_trend, "trend");
         }
 
         private DeTrendTransform(IHost host, ModelLoadContext ctx, IDataView input) :
@@ -146,7 +205,20 @@ namespace Scikit.ML.TimeSeries
             _args = new Arguments();
             _args.Read(ctx, Host);
 
-            ctx.LoadModel<IPredictor, SignatureLoadModel>(host, out _trend, "trend");
+            if (_args.streaming)
+            {
+                int nb = ctx.Reader.ReadInt32();
+                Host.CheckDecode(nb >= 0);
+                _initialStatistics = new Dictionary<string, TrendStatistics>();
+                for (int i = 0; i < nb; ++i)
+                {
+                    var key = ctx.Reader.ReadString();
+                    _initialStatistics[key] = TrendStatistics.Read(ctx.Reader);
+                }
+                _trendStatistics = _initialStatistics;
+            }
+            else
+                ctx.LoadModel<IPredictor, SignatureLoadModel>(host, out _trend, "trend");
 
             if (_args.columns == null || _args.columns.Length != 1)
                 Host.ExceptUserArg(nameof(_args.columns), "One column must be specified.");
@@ -156,7 +228,26 @@ namespace Scikit.ML.TimeSeries
                                             new[] { _args.columns[0].Name },
                                             new[] { NumberDataViewType.Single /*input.Schema.GetColumnType(index)*/ }));
             _lock = new object();
-            _transform = BuildTransform(_trend);
+            if (!_args.streaming)
+                _transform = BuildTransform(_trend);
+        }
+
+        /// <summary>
+        /// Returns a copy of the statistics per group obtained at the end of the last
+        /// complete pass (streaming only), the key is the group value converted
+        /// into a string (empty without group).
+        /// </summary>
+        public Dictionary<string, TrendStatistics> GetTrendStatistics()
+        {
+            if (!_args.streaming)
+                throw Host.Except("Statistics are only available in streaming mode.");
+            lock (_lock)
+                return Clone(_trendStatistics);
+        }
+
+        static Dictionary<string, TrendStatistics> Clone(Dictionary<string, TrendStatistics> stats)
+        {
+            return stats.ToDictionary(c => c.Key, c => c.Value.Clone());
         }
 
         #endregion
@@ -165,7 +256,8 @@ namespace Scikit.ML.TimeSeries
 
         public override bool CanShuffle
         {
-            get { return Source.CanShuffle; }
+            // The streaming mode depends on the order.
+            get { return !_args.streaming && Source.CanShuffle; }
         }
 
         public override long? GetRowCount()
@@ -181,6 +273,8 @@ namespace Scikit.ML.TimeSeries
 
         protected override DataViewRowCursor GetRowCursorCore(IEnumerable<DataViewSchema.Column> columnsNeeded, Random rand = null)
         {
+            if (_args.streaming)
+                return GetStreamingCursor(columnsNeeded);
             if (_transform == null)
                 lock (_lock)
                     if (_transform == null)
@@ -192,6 +286,9 @@ namespace Scikit.ML.TimeSeries
 
         public override DataViewRowCursor[] GetRowCursorSet(IEnumerable<DataViewSchema.Column> columnsNeeded, int n, Random rand = null)
         {
+            // Observations must be processed in order.
+            if (_args.streaming)
+                return new[] { GetStreamingCursor(columnsNeeded) };
             if (_transform == null)
                 lock (_lock)
                     if (_transform == null)
@@ -319,7 +416,181 @@ namespace Scikit.ML.TimeSeries
                 throw Contracts.ExceptNotSupp("ML.net changed its design.");
             return trans;
         }
-    }
 
-    #endregion
+        #endregion
+
+        #region streaming
+
+        DataViewRowCursor GetStreamingCursor(IEnumerable<DataViewSchema.Column> columnsNeeded)
+        {
+            int index, indexTime;
+            DataViewType type, typeTime;
+            ValidateInputs(out index, out indexTime, out type, out typeTime);
+            int indexGroup = string.IsNullOrEmpty(_args.groupColumn)
+                                ? -1
+                                : SchemaHelper.GetColumnIndex(Source.Schema, _args.groupColumn);
+            var cols = SchemaHelper.ColumnsNeeded(columnsNeeded, Source.Schema,
+                            indexGroup == -1 ? new[] { index, indexTime } : new[] { index, indexTime, indexGroup });
+            var cursor = Source.GetRowCursor(cols);
+            return new StreamingDeTrendCursor(this, cursor, Clone(_initialStatistics), index, indexTime, indexGroup);
+        }
+
+        /// <summary>
+        /// Keeps the statistics obtained at the end of a complete pass.
+        /// </summary>
+        void UpdateTrendStatistics(Dictionary<string, TrendStatistics> stats)
+        {
+            lock (_lock)
+                _trendStatistics = stats;
+        }
+
+        static ValueGetter<string> GetGroupGetter(DataViewRowCursor cursor, DataViewSchema.Column col)
+        {
+            switch (col.Type.RawKind())
+            {
+                case DataKind.String:
+                    {
+                        var getter = cursor.GetGetter<ReadOnlyMemory<char>>(col);
+                        var value = default(ReadOnlyMemory<char>);
+                        return (ref string dst) => { getter(ref value); dst = value.ToString(); };
+                    }
+                case DataKind.Single:
+                    {
+                        var getter = cursor.GetGetter<float>(col);
+                        float value = 0;
+                        return (ref string dst) => { getter(ref value); dst = value.ToString(CultureInfo.InvariantCulture); };
+                    }
+                case DataKind.Int32:
+                    {
+                        var getter = cursor.GetGetter<int>(col);
+                        int value = 0;
+                        return (ref string dst) => { getter(ref value); dst = value.ToString(CultureInfo.InvariantCulture); };
+                    }
+                case DataKind.UInt32:
+                    {
+                        var getter = cursor.GetGetter<uint>(col);
+                        uint value = 0;
+                        return (ref string dst) => { getter(ref value); dst = value.ToString(CultureInfo.InvariantCulture); };
+                    }
+                case DataKind.Int64:
+                    {
+                        var getter = cursor.GetGetter<long>(col);
+                        long value = 0;
+                        return (ref string dst) => { getter(ref value); dst = value.ToString(CultureInfo.InvariantCulture); };
+                    }
+                default:
+                    throw Contracts.ExceptNotImpl("Group column type {0} is not supported.", col.Type);
+            }
+        }
+
+        class StreamingDeTrendCursor : DataViewRowCursor
+        {
+            readonly DeTrendTransform _view;
+            readonly DataViewRowCursor _inputCursor;
+            readonly Dictionary<string, TrendStatistics> _stats;
+            readonly ValueGetter<float> _valueGetter;
+            readonly ValueGetter<float> _timeGetter;
+            readonly ValueGetter<string> _groupGetter;
+            readonly int _outputColumn;
+
+            TrendStatistics _current;
+            string _currentGroup;
+            string _group;
+            float _value;
+            float _time;
+            float _output;
+            bool _computed;
+
+            public StreamingDeTrendCursor(DeTrendTransform view, DataViewRowCursor cursor,
+                                          Dictionary<string, TrendStatistics> stats,
+                                          int index, int indexTime, int indexGroup)
+            {
+                _view = view;
+                _inputCursor = cursor;
+                _stats = stats;
+                _outputColumn = cursor.Schema.Count;
+                _timeGetter = cursor.GetGetter<float>(SchemaHelper._dc(indexTime, cursor));
+                if (cursor.Schema[index].Type.IsVector())
+                {
+                    var getter = cursor.GetGetter<VBuffer<float>>(SchemaHelper._dc(index, cursor));
+                    var buffer = new VBuffer<float>();
+                    _valueGetter = (ref float dst) => { getter(ref buffer); dst = buffer.GetItemOrDefault(0); };
+                }
+                else
+                    _valueGetter = cursor.GetGetter<float>(SchemaHelper._dc(index, cursor));
+                _groupGetter = indexGroup == -1 ? null : GetGroupGetter(cursor, SchemaHelper._dc(indexGroup, cursor));
+                _currentGroup = null;
+                _group = string.Empty;
+            }
+
+            public override ValueGetter<DataViewRowId> GetIdGetter() { return _inputCursor.GetIdGetter(); }
+            public override bool IsColumnActive(DataViewSchema.Column col)
+            {
+                return col.Index >= _inputCursor.Schema.Count || _inputCursor.IsColumnActive(col);
+            }
+
+            public override long Batch { get { return _inputCursor.Batch; } }
+            public override long Position { get { return _inputCursor.Position; } }
+            public override DataViewSchema Schema { get { return _view.Schema; } }
+
+            /// <summary>
+            /// Every observation updates the statistics even if the output is never requested.
+            /// </summary>
+            public override bool MoveNext()
+            {
+                if (!_inputCursor.MoveNext())
+                {
+                    _view.UpdateTrendStatistics(_stats);
+                    return false;
+                }
+                if (_groupGetter != null)
+                    _groupGetter(ref _group);
+                if (_current == null || _group != _currentGroup)
+                {
+                    if (!_stats.TryGetValue(_group, out _current))
+                    {
+                        _current = new TrendStatistics(_view._args.degree, _view._args.windowSize);
+                        _stats[_group] = _current;
+                    }
+                    _currentGroup = _group;
+                }
+                _valueGetter(ref _value);
+                _timeGetter(ref _time);
+                _current.Add(_time, _value);
+                _computed = false;
+                return true;
+            }
+
+            protected override void Dispose(bool disposing)
+            {
+                if (disposing)
+                    _inputCursor.Dispose();
+                GC.SuppressFinalize(this);
+            }
+
+            public override ValueGetter<TValue> GetGetter<TValue>(DataViewSchema.Column col)
+            {
+                if (col.Index < _outputColumn)
+                    return _inputCursor.GetGetter<TValue>(col);
+                if (col.Index > _outputColumn)
+                    throw Contracts.Except("Unexpected columns {0} > {1}.", col, _outputColumn);
+                ValueGetter<float> getter = (ref float dst) =>
+                {
+                    if (!_computed)
+                    {
+                        // Same sign as the regressor based trend.
+                        _output = _current.Trend(_time) - _value;
+                        _computed = true;
+                    }
+                    dst = _output;
+                };
+                var res = getter as ValueGetter<TValue>;
+                if (res == null)
+                    throw Contracts.Except("Column '{0}' is float not {1}.", col.Name, typeof(TValue));
+                return res;
+            }
+        }
+
+        #endregion
+    }
 }
@@ -0,0 +1,302 @@
+﻿// See the LICENSE file in the project root for more information.
+
+using System;
+using System.IO;
+using Microsoft.ML.Runtime;
+
+
+namespace Scikit.ML.TimeSeries
+{
+    /// <summary>
+    /// Sufficient statistics of a polynomial trend fitted with least squares,
+    /// <pre>sum t^k</pre> for k in [0, 2d] and <pre>sum t^k y</pre> for k in [0, d].
+    /// Adding an observation costs O(d), computing the trend O(d^3) and
+    /// only when an observation was added since the last computation.
+    /// If <i>windowSize</i> &gt; 0, only the last observations are kept,
+    /// the oldest one is removed from the statistics when a new one comes.
+    /// Time is shifted by the first observed time to keep powers small.
+    /// In windowed mode, the origin moves to the oldest kept time every time
+    /// the circular buffer wraps and the sums are recomputed from the buffer,
+    /// which keeps them well conditioned on long streams (amortized O(d)).
+    /// </summary>
+    public class TrendStatistics
+    {
+        readonly int _degree;
+        readonly int _windowSize;
+        double _origin;
+        bool _hasOrigin;
+        readonly double[] _sumPowers;
+        readonly double[] _sumPowersY;
+
+        // Last observations if windowSize > 0 (circular buffer).
+        readonly double[] _windowTime;
+        readonly double[] _windowValue;
+        int _windowStart;
+        long _count;
+
+        // Coefficients of the trend, computed when needed.
+        readonly double[] _coefficients;
+        readonly double[] _matrix;
+        bool _dirty;
+
+        /// <summary>
+        /// Degree of the polynomial trend.
+        /// </summary>
+        public int Degree => _degree;
+
+        /// <summary>
+        /// Number of observations kept, 0 for all.
+        /// </summary>
+        public int WindowSize => _windowSize;
+
+        /// <summary>
+        /// Number of observations the trend is fitted on.
+        /// </summary>
+        public long Count => _count;
+
+        public TrendStatistics(int degree, int windowSize = 0)
+        {
+            Contracts.CheckParam(degree >= 0, nameof(degree), "must be >= 0");
+            Contracts.CheckParam(windowSize >= 0, nameof(windowSize), "must be >= 0");
+            _degree = degree;
+            _windowSize = windowSize;
+            _sumPowers = new double[2 * degree + 1];
+            _sumPowersY = new double[degree + 1];
+            _coefficients = new double[degree + 1];
+            _matrix = new double[(degree + 1) * (degree + 2)];
+            if (windowSize > 0)
+            {
+                _windowTime = new double[windowSize];
+                _windowValue = new double[windowSize];
+            }
+            _dirty = true;
+        }
+
+        /// <summary>
+        /// Returns a copy.
+        /// </summary>
+        public TrendStatistics Clone()
+        {
+            var res = new TrendStatistics(_degree, _windowSize);
+            res._origin = _origin;
+            res._hasOrigin = _hasOrigin;
+            Array.Copy(_sumPowers, res._sumPowers, _sumPowers.Length);
+            Array.Copy(_sumPowersY, res._sumPowersY, _sumPowersY.Length);
+            if (_windowSize > 0)
+            {
+                Array.Copy(_windowTime, res._windowTime, _windowSize);
+                Array.Copy(_windowValue, res._windowValue, _windowSize);
+            }
+            res._windowStart = _windowStart;
+            res._count = _count;
+            return res;
+        }
+
+        /// <summary>
+        /// Adds an observation to the statistics.
+        /// </summary>
+        public void Add(float time, float value)
+        {
+            if (!_hasOrigin)
+            {
+                _origin = time;
+                _hasOrigin = true;
+            }
+            double x = time - _origin;
+            if (_windowSize > 0)
+            {
+                int pos;
+                if (_count == _windowSize)
+                {
+                    pos = _windowStart;
+                    Accumulate(_windowTime[pos], _windowValue[pos], -1);
+                    _windowStart = (_windowStart + 1) % _windowSize;
+                }
+                else
+                {
+                    pos = (int)((_windowStart + _count) % _windowSize);
+                    ++_count;
+                }
+                _windowTime[pos] = x;
+                _windowValue[pos] = value;
+            }
+            else
+                ++_count;
+            Accumulate(x, value, 1);
+            if (_windowSize > 0 && _count == _windowSize && _windowStart == 0)
+                Reanchor();
+            _dirty = true;
+        }
+
+        /// <summary>
+        /// Moves the origin to the oldest kept time and recomputes the sums
+        /// from the window, it also removes the rounding errors accumulated
+        /// by the removals.
+        /// </summary>
+        void Reanchor()
+        {
+            double shift = _windowTime[_windowStart];
+            _origin += shift;
+            Array.Clear(_sumPowers, 0, _sumPowers.Length);
+            Array.Clear(_sumPowersY, 0, _sumPowersY.Length);
+            for (int i = 0; i < _count; ++i)
+            {
+                int pos = (int)((_windowStart + i) % _windowSize);
+                _windowTime[pos] -= shift;
+                Accumulate(_windowTime[pos], _windowValue[pos], 1);
+            }
+        }
+
+        /// <summary>
+        /// Adds an observation and returns the trend at the same time.
+        /// </summary>
+        public float Update(float time, float value)
+        {
+            Add(time, value);
+            return Trend(time);
+        }
+
+        void Accumulate(double x, double y, double sign)
+        {
+            double p = sign;
+            for (int k = 0; k < _sumPowers.Length; ++k)
+            {
+                _sumPowers[k] += p;
+                if (k < _sumPowersY.Length)
+                    _sumPowersY[k] += p * y;
+                p *= x;
+            }
+        }
+
+        /// <summary>
+        /// Returns the value of the trend at a given time, 0 if there is no observation.
+        /// </summary>
+        public float Trend(float time)
+        {
+            if (_count == 0)
+                return 0f;
+            if (_dirty)
+                ComputeCoefficients();
+            double x = time - _origin;
+            double res = 0;
+            for (int k = _coefficients.Length - 1; k >= 0; --k)
+                res = res * x + _coefficients[k];
+            return (float)res;
+        }
+
+        /// <summary>
+        /// Solves the normal equations. The degree is reduced until the system
+        /// is not singular (not enough distinct times), degree 0 is the mean.
+        /// </summary>
+        void ComputeCoefficients()
+        {
+            Array.Clear(_coefficients, 0, _coefficients.Length);
+            int degree = (int)Math.Min(_degree, _count - 1);
+            while (degree > 0 && !Solve(degree))
+                --degree;
+            if (degree == 0)
+            {
+                Array.Clear(_coefficients, 0, _coefficients.Length);
+                _coefficients[0] = _sumPowersY[0] / _sumPowers[0];
+            }
+            _dirty = false;
+        }
+
+        bool Solve(int degree)
+        {
+            // Gaussian elimination with partial pivoting on the augmented matrix.
+            int n = degree + 1;
+            int w = n + 1;
+            for (int i = 0; i < n; ++i)
+            {
+                for (int j = 0; j < n; ++j)
+                    _matrix[i * w + j] = _sumPowers[i + j];
+                _matrix[i * w + n] = _sumPowersY[i];
+            }
+            for (int c = 0; c < n; ++c)
+            {
+                int pivot = c;
+                for (int i = c + 1; i < n; ++i)
+                    if (Math.Abs(_matrix[i * w + c]) > Math.Abs(_matrix[pivot * w + c]))
+                        pivot = i;
+                // Relative to sum t^2c, what remains after the elimination is rounding errors.
+                if (Math.Abs(_matrix[pivot * w + c]) <= 1e-10 * Math.Abs(_sumPowers[2 * c]))
+                    return false;
+                if (pivot != c)
+                {
+                    for (int j = c; j < w; ++j)
+                    {
+                        var t = _matrix[c * w + j];
+                        _matrix[c * w + j] = _matrix[pivot * w + j];
+                        _matrix[pivot * w + j] = t;
+                    }
+                }
+                for (int i = c + 1; i < n; ++i)
+                {
+                    double f = _matrix[i * w + c] / _matrix[c * w + c];
+                    if (f == 0)
+                        continue;
+                    for (int j = c; j < w; ++j)
+                        _matrix[i * w + j] -= f * _matrix[c * w + j];
+                }
+            }
+            for (int i = n - 1; i >= 0; --i)
+            {
+                double s = _matrix[i * w + n];
+                for (int j = i + 1; j < n; ++j)
+                    s -= _matrix[i * w + j] * _coefficients[j];
+                _coefficients[i] = s / _matrix[i * w + i];
+            }
+            for (int i = n; i < _coefficients.Length; ++i)
+                _coefficients[i] = 0;
+            return true;
+        }
+
+        #region serialization
+
+        public void Write(BinaryWriter writer)
+        {
+            writer.Write(_degree);
+            writer.Write(_windowSize);
+            writer.Write(_hasOrigin);
+            writer.Write(_origin);
+            writer.Write(_count);
+            writer.Write(_windowStart);
+            foreach (var v in _sumPowers)
+                writer.Write(v);
+            foreach (var v in _sumPowersY)
+                writer.Write(v);
+            for (int i = 0; i < _windowSize; ++i)
+            {
+                writer.Write(_windowTime[i]);
+                writer.Write(_windowValue[i]);
+            }
+        }
+
+        public static TrendStatistics Read(BinaryReader reader)
+        {
+            int degree = reader.ReadInt32();
+            int windowSize = reader.ReadInt32();
+            Contracts.CheckDecode(degree >= 0 && windowSize >= 0);
+            var res = new TrendStatistics(degree, windowSize);
+            res._hasOrigin = reader.ReadBoolean();
+            res._origin = reader.ReadDouble();
+            res._count = reader.ReadInt64();
+            res._windowStart = reader.ReadInt32();
+            Contracts.CheckDecode(res._count >= 0 && (windowSize == 0 || res._count <= windowSize));
+            Contracts.CheckDecode(res._windowStart >= 0 && (windowSize == 0 || res._windowStart < windowSize));
+            for (int i = 0; i < res._sumPowers.Length; ++i)
+                res._sumPowers[i] = reader.ReadDouble();
+            for (int i = 0; i < res._sumPowersY.Length; ++i)
+                res._sumPowersY[i] = reader.ReadDouble();
+            for (int i = 0; i < windowSize; ++i)
+            {
+                res._windowTime[i] = reader.ReadDouble();
+                res._windowValue[i] = reader.ReadDouble();
+            }
+            return res;
+        }
+
+        #endregion
+    }
+}